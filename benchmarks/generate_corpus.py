@@ -0,0 +1,116 @@
+# regenerates the checked-in benchmark corpus in benchmarks/corpus/.
+# the output is deterministic, so rerunning it only changes files when this script changes.
+import json
+import os
+import random
+import shutil
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+CORPUS_DIR = os.path.join(HERE, "corpus")
+REPO_ROOT = os.path.dirname(HERE)
+
+WORDS = (
+    "macro plugin server zone raid buff heal tank pull camp loot quest merchant spell "
+    "group guild mana xp level target assist follow navigation mesh script lua config"
+).split()
+
+
+def _sentence(rng, words=12):
+    text = " ".join(rng.choice(WORDS) for _ in range(words))
+    return text[0].upper() + text[1:] + "."
+
+
+def short_posts(rng, count=200):
+    posts = []
+    for i in range(count):
+        parts = [_sentence(rng, rng.randint(5, 20))]
+        if i % 3 == 0:
+            parts.append(f"Try `/{rng.choice(WORDS)} on` and **{rng.choice(WORDS)}** first.")
+        if i % 5 == 0:
+            parts.append(f"See [the wiki](https://www.redguides.com/wiki/{rng.choice(WORDS)}).")
+        if i % 7 == 0:
+            parts.append(f"* {_sentence(rng, 4)}\n* {_sentence(rng, 4)}")
+        if i % 11 == 0:
+            parts.append(f"> {_sentence(rng, 8)}")
+        posts.append("\n\n".join(parts) + "\n")
+    return posts
+
+
+def huge_table(rng, rows=2000, cols=6):
+    header = "| " + " | ".join(f"Column {c}" for c in range(cols)) + " |"
+    align = "| " + " | ".join((":--", ":-:", "--:")[c % 3] for c in range(cols)) + " |"
+    lines = [header, align]
+    for r in range(rows):
+        cells = []
+        for c in range(cols):
+            word = rng.choice(WORDS)
+            cells.append(f"**{word}**" if (r + c) % 7 == 0 else f"`{word}`" if (r + c) % 5 == 0 else word)
+        lines.append("| " + " | ".join(cells) + " |")
+    return "# Item table\n\n" + "\n".join(lines) + "\n"
+
+
+def nested_lists(rng, depth=12, breadth=3, repeat=40):
+    lines = []
+    for _ in range(repeat):
+        for level in range(depth):
+            indent = "  " * level
+            for b in range(breadth):
+                marker = "1." if level % 2 else "-"
+                lines.append(f"{indent}{marker} {_sentence(rng, 5)}")
+        lines.append("")
+        lines.append("> " + _sentence(rng, 10))
+        lines.append("> - " + _sentence(rng, 6))
+        lines.append(">   - " + _sentence(rng, 6))
+        lines.append("")
+    return "\n".join(lines) + "\n"
+
+
+def html_heavy(rng, sections=150):
+    parts = ["# Plugin README\n"]
+    for i in range(sections):
+        badge = f"https://img.shields.io/badge/{rng.choice(WORDS)}-{i}-green.svg"
+        parts.append(f"[![badge]({badge})](https://github.com/example/repo{i})\n")
+        parts.append(f'<p align="center"><img src="images/shot{i}.png" alt="shot {i}"></p>\n')
+        parts.append(
+            "<details>\n<summary>Section {0}</summary>\n\n"
+            '<font color="red" size="3" face="Arial">{1}</font>\n\n'
+            '<span style="color: #27F573; font-weight: bold; text-decoration: underline;">{2}</span>\n'
+            '<div align="right"><b>{3}</b> <i>{4}</i><br><kbd>Ctrl</kbd></div>\n\n'
+            "</details>\n".format(i, _sentence(rng), _sentence(rng), _sentence(rng, 4), _sentence(rng, 4))
+        )
+        parts.append(_sentence(rng, 20) + "\n")
+    return "\n".join(parts)
+
+
+def large_code_blocks(rng, blocks=30, lines=120):
+    parts = ["# Scripts\n"]
+    for b in range(blocks):
+        lang = ("lua", "python", "ini", "")[b % 4]
+        body = "\n".join(
+            f"local {rng.choice(WORDS)}_{n} = mq.TLO.{rng.choice(WORDS).title()}('<{rng.choice(WORDS)}>') -- & more"
+            for n in range(lines)
+        )
+        parts.append(f"Step {b}: {_sentence(rng, 8)}\n\n```{lang}\n{body}\n```\n")
+    return "\n".join(parts)
+
+
+def main():
+    rng = random.Random(20240601)
+    os.makedirs(CORPUS_DIR, exist_ok=True)
+    with open(os.path.join(CORPUS_DIR, "short_posts.json"), "w", encoding="utf-8") as file:
+        json.dump(short_posts(rng), file, indent=1)
+    documents = {
+        "huge_table.md": huge_table(rng),
+        "nested_lists.md": nested_lists(rng),
+        "html_heavy.md": html_heavy(rng),
+        "large_code_blocks.md": large_code_blocks(rng),
+    }
+    for name, text in documents.items():
+        with open(os.path.join(CORPUS_DIR, name), "w", encoding="utf-8", newline="\n") as file:
+            file.write(text)
+    # A snapshot of the project README, so README edits don't move the baseline.
+    shutil.copyfile(os.path.join(REPO_ROOT, "README.md"), os.path.join(CORPUS_DIR, "readme.md"))
+
+
+if __name__ == "__main__":
+    main()
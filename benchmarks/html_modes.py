@@ -0,0 +1,72 @@
+# compares the HtmlToBbCodeConverter modes on deeply nested and on corpus HTML.
+#   python benchmarks/html_modes.py [--repeat N]
+# times the tree walk alone (a fresh soup is built before each run, since <details>
+# removes its <summary> while converting) and checks that every mode produces the same output. A mode that hits the recursion limit is reported as such.
+import argparse
+import os
+import time
+from typing import Callable, Dict
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+CORPUS_DIR = os.path.join(HERE, "corpus")
+
+
+def nested_elements(depth: int = 60, paragraph_words: int = 300) -> str:
+    """Styled divs, each holding a large bold paragraph and the next level in a span."""
+    words = " ".join(f"word{i}" for i in range(paragraph_words))
+    opening = "".join(f'<div style="color: red; text-align: center"><b>{words}</b><span>' for _ in range(depth))
+    return opening + "</span></div>" * depth
+
+
+def documents() -> Dict[str, str]:
+    from md2bbcode.main import Converter
+
+    docs = {"nested_elements": nested_elements()}
+    path = os.path.join(CORPUS_DIR, "html_heavy.md")
+    if os.path.exists(path):
+        with open(path, "r", encoding="utf-8") as file:
+            docs["html_heavy"] = Converter().render_markdown(file.read())
+    return docs
+
+
+def best_walk_time(walk: Callable[[object], str], make_soup: Callable[[], object], repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        soup = make_soup()
+        start = time.perf_counter()
+        walk(soup)
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main(argv=None):
+    from bs4 import BeautifulSoup
+
+    from md2bbcode.html2bbcode import HTML_CONVERT_MODES, HtmlToBbCodeConverter
+
+    parser = argparse.ArgumentParser(description="Compare HtmlToBbCodeConverter modes on nested HTML.")
+    parser.add_argument("--repeat", type=int, default=5, help="Timed runs per document and mode (best is reported)")
+    args = parser.parse_args(argv)
+
+    converters = {mode: HtmlToBbCodeConverter(mode=mode) for mode in HTML_CONVERT_MODES}
+    print(f"{'document':<20} {'mode':<10} {'walk ms':>9} {'vs recursive':>13}")
+    for name, html in documents().items():
+        make_soup = lambda: BeautifulSoup(html, "html.parser")  # noqa: E731
+        outputs = {}
+        base = None
+        for mode, converter in converters.items():
+            walk = converter._convert_children
+            try:
+                outputs[mode] = walk(make_soup())
+            except RecursionError:
+                print(f"{name:<20} {mode:<10} {'RecursionError':>23}")
+                continue
+            seconds = best_walk_time(walk, make_soup, args.repeat)
+            base = base or seconds
+            print(f"{name:<20} {mode:<10} {seconds * 1000:>9.2f} {seconds / base:>12.2f}x")
+        if len(set(outputs.values())) > 1:
+            raise SystemExit(f"{name}: modes disagree")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+# runs the benchmark corpus and this README through every installed BeautifulSoup tree
+# builder and reports where the output differs from the default html.parser.
+#   python benchmarks/parser_parity.py [--parser lxml] [--repeat N]
+# exits non-zero when any backend disagrees, so a faster builder can be switched on
+# (Converter(html_parser="auto")) only once it converts the corpus identically.
+import argparse
+import difflib
+import json
+import os
+import sys
+import time
+from typing import Dict, List
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+CORPUS_DIR = os.path.join(HERE, "corpus")
+README_PATH = os.path.join(HERE, "..", "README.md")
+
+
+def documents() -> Dict[str, str]:
+    docs = {}
+    for name in sorted(os.listdir(CORPUS_DIR)):
+        path = os.path.join(CORPUS_DIR, name)
+        with open(path, "r", encoding="utf-8") as file:
+            if name.endswith(".json"):
+                for index, post in enumerate(json.load(file)):
+                    docs[f"{os.path.splitext(name)[0]}[{index}]"] = post
+            elif name.endswith(".md"):
+                docs[os.path.splitext(name)[0]] = file.read()
+    with open(README_PATH, "r", encoding="utf-8") as file:
+        docs["README"] = file.read()
+    return docs
+
+
+def first_difference(expected: str, actual: str, context: int = 2) -> str:
+    diff = difflib.unified_diff(
+        expected.splitlines(), actual.splitlines(), "html.parser", "backend", n=context, lineterm=""
+    )
+    lines = list(diff)
+    return "\n".join(lines[:20] + (["..."] if len(lines) > 20 else []))
+
+
+def html_pass_seconds(converter, first_passes: List[str], repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for text in first_passes:
+            converter.convert(text)
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main(argv=None) -> int:
+    from md2bbcode.html2bbcode import HtmlToBbCodeConverter, available_html_parsers
+    from md2bbcode.main import Converter
+
+    parser = argparse.ArgumentParser(description="Compare md2bbcode output across BeautifulSoup tree builders.")
+    parser.add_argument("--parser", action="append", help="Backend to check (repeatable; default: every installed one)")
+    parser.add_argument("--domain", default="https://example.com/repo/", help="Domain passed to every conversion")
+    parser.add_argument("--repeat", type=int, default=3, help="Timed runs of the HTML pass per backend (best is reported)")
+    args = parser.parse_args(argv)
+
+    docs = documents()
+    reference = Converter(html_fast_path=False)
+    expected = {name: reference.convert(text, args.domain) for name, text in docs.items()}
+    first_passes = [reference.render_markdown(text, args.domain) for text in docs.values()]
+
+    failed = False
+    print(f"{'parser':<12} {'documents':>9} {'differ':>7} {'html pass ms':>13}")
+    for name in args.parser or available_html_parsers():
+        converter = Converter(html_fast_path=False, html_parser=name)
+        differing = {doc: converter.convert(text, args.domain) for doc, text in docs.items()}
+        differing = {doc: output for doc, output in differing.items() if output != expected[doc]}
+        html_converter = HtmlToBbCodeConverter(domain=args.domain, parser=name)
+        seconds = html_pass_seconds(html_converter, first_passes, args.repeat)
+        print(f"{name:<12} {len(docs):>9} {len(differing):>7} {seconds * 1000:>13.2f}")
+        for doc, output in differing.items():
+            failed = True
+            print(f"\n{name}: {doc}\n{first_difference(expected[doc], output)}\n")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
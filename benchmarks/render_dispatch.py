@@ -0,0 +1,69 @@
+# compares BBCodeRenderer's precompiled token dispatch with the generic render_token path
+# on token-dense documents (big tables, long task lists), rendering pre-parsed tokens.
+#   python benchmarks/render_dispatch.py [--repeat N]
+import argparse
+import os
+from typing import Dict
+
+from render_modes import best_time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+CORPUS_DIR = os.path.join(HERE, "corpus")
+
+
+def task_list(items: int = 5000) -> str:
+    return "".join(f"- [{'x' if i % 3 else ' '}] task **{i}** with `code` and a [link](page{i}.md)\n" for i in range(items))
+
+
+def documents() -> Dict[str, str]:
+    docs = {"task_list": task_list()}
+    for name in ("huge_table", "short_posts"):
+        path = os.path.join(CORPUS_DIR, name + (".md" if name != "short_posts" else ".json"))
+        if not os.path.exists(path):
+            continue
+        with open(path, "r", encoding="utf-8") as file:
+            if path.endswith(".json"):
+                import json
+
+                docs[name] = "\n\n".join(json.load(file))
+            else:
+                docs[name] = file.read()
+    return docs
+
+
+def main(argv=None):
+    import mistune
+    from mistune.core import BlockState
+
+    from md2bbcode.main import default_plugins
+    from md2bbcode.renderers.bbcode import RENDER_MODES, BBCodeRenderer
+
+    class GenericRenderer(BBCodeRenderer):
+        render_token = BBCodeRenderer._render_token_generic
+
+    parser = argparse.ArgumentParser(description="Compare precompiled and generic token dispatch.")
+    parser.add_argument("--repeat", type=int, default=7, help="Timed runs per document (best is reported)")
+    args = parser.parse_args(argv)
+
+    parse = mistune.create_markdown(renderer=None, plugins=default_plugins())
+    print(f"{'document':<14} {'mode':<10} {'tokens':>8} {'generic ms':>11} {'compiled ms':>12} {'speedup':>8}")
+    for name, text in documents().items():
+        tokens = parse(text)
+        count = sum(1 for _ in _walk(tokens))
+        for mode in RENDER_MODES:
+            generic, compiled = GenericRenderer(mode=mode), BBCodeRenderer(mode=mode)
+            if generic(tokens, BlockState()) != compiled(tokens, BlockState()):
+                raise SystemExit(f"{name}: dispatch paths disagree")
+            slow = best_time(lambda: generic(tokens, BlockState()), args.repeat)
+            fast = best_time(lambda: compiled(tokens, BlockState()), args.repeat)
+            print(f"{name:<14} {mode:<10} {count:>8} {slow * 1000:>11.2f} {fast * 1000:>12.2f} {slow / fast:>7.2f}x")
+
+
+def _walk(tokens):
+    for token in tokens:
+        yield token
+        yield from _walk(token.get("children", ()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+# compares the BBCodeRenderer render modes on deeply nested documents.
+#   python benchmarks/render_modes.py [--repeat N]
+# reports the whole first pass and the rendering step alone (on pre-parsed tokens), with
+# the peak traced memory of rendering, and checks that every mode produces the same output.
+import argparse
+import os
+import time
+import tracemalloc
+from typing import Callable, Dict
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+CORPUS_DIR = os.path.join(HERE, "corpus")
+
+
+def nested_containers(depth: int = 40, paragraph_words: int = 400, items: int = 3) -> str:
+    """Lists inside blockquotes, each level carrying a large paragraph."""
+    lines = []
+    words = " ".join(f"word{i}" for i in range(paragraph_words))
+    for level in range(depth):
+        quote = "> " * (level + 1)
+        lines.append(f"{quote}**Level {level}** {words}")
+        lines.append(quote)
+        for item in range(items):
+            lines.append(f"{quote}- item {item} at level {level}, *{words[:200]}*")
+        lines.append(quote)
+    return "\n".join(lines) + "\n"
+
+
+def documents() -> Dict[str, str]:
+    docs = {"nested_containers": nested_containers()}
+    path = os.path.join(CORPUS_DIR, "nested_lists.md")
+    if os.path.exists(path):
+        with open(path, "r", encoding="utf-8") as file:
+            docs["nested_lists"] = file.read()
+    return docs
+
+
+def make_markdown(mode: str) -> Callable[[str], str]:
+    import mistune
+
+    from md2bbcode.main import default_plugins
+    from md2bbcode.renderers.bbcode import BBCodeRenderer
+
+    return mistune.create_markdown(renderer=BBCodeRenderer(mode=mode), plugins=default_plugins())
+
+
+def make_render_only(mode: str, text: str) -> Callable[[], str]:
+    import mistune
+    from mistune.core import BlockState
+
+    from md2bbcode.main import default_plugins
+    from md2bbcode.renderers.bbcode import BBCodeRenderer
+
+    tokens = mistune.create_markdown(renderer=None, plugins=default_plugins())(text)
+    renderer = BBCodeRenderer(mode=mode)
+    return lambda: renderer(tokens, BlockState())
+
+
+def best_time(func: Callable[[], object], repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def peak_memory(func: Callable[[], object]) -> int:
+    tracemalloc.start()
+    func()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return peak
+
+
+def main(argv=None):
+    from md2bbcode.renderers.bbcode import RENDER_MODES
+
+    parser = argparse.ArgumentParser(description="Compare BBCodeRenderer render modes on nested documents.")
+    parser.add_argument("--repeat", type=int, default=5, help="Timed runs per document and mode (best is reported)")
+    args = parser.parse_args(argv)
+
+    renderers = {mode: make_markdown(mode) for mode in RENDER_MODES}
+    print(f"{'document':<20} {'mode':<10} {'total ms':>9} {'render ms':>10} {'render peak KiB':>16} {'render vs recursive':>20}")
+    for name, text in documents().items():
+        outputs = {mode: md(text) for mode, md in renderers.items()}
+        if len(set(outputs.values())) != 1:
+            raise SystemExit(f"{name}: render modes disagree")
+        base = None
+        for mode, md in renderers.items():
+            total = best_time(lambda: md(text), args.repeat)
+            render = make_render_only(mode, text)
+            render_seconds = best_time(render, args.repeat)
+            base = base or render_seconds
+            print(
+                f"{name:<20} {mode:<10} {total * 1000:>9.2f} {render_seconds * 1000:>10.2f} "
+                f"{peak_memory(render) / 1024:>16.0f} {render_seconds / base:>19.2f}x"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+# times the conversion stages over the benchmark corpus and compares them with baseline.json.
+#   python benchmarks/run.py                     compare against the stored baseline
+#   python benchmarks/run.py --update-baseline   record a new baseline
+# times are divided by a pure-Python calibration loop measured in the same run, so a
+# baseline recorded on one machine is roughly comparable on another.
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+from typing import Callable, Dict, List
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+CORPUS_DIR = os.path.join(HERE, "corpus")
+BASELINE_PATH = os.path.join(HERE, "baseline.json")
+DEFAULT_THRESHOLD = 0.25
+
+
+def load_corpus() -> Dict[str, List[str]]:
+    """Map each benchmark name to the documents it converts (one each, except short posts)."""
+    corpus: Dict[str, List[str]] = {}
+    for name in sorted(os.listdir(CORPUS_DIR)):
+        path = os.path.join(CORPUS_DIR, name)
+        with open(path, "r", encoding="utf-8") as file:
+            if name.endswith(".json"):
+                corpus[os.path.splitext(name)[0]] = json.load(file)
+            elif name.endswith(".md"):
+                corpus[os.path.splitext(name)[0]] = [file.read()]
+    return corpus
+
+
+def _best_time(func: Callable[[], object], repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    # The minimum is the least noisy estimate of the real cost.
+    return min(timings)
+
+
+def calibrate(repeat: int = 5) -> float:
+    def loop():
+        total = 0
+        parts = []
+        for i in range(200_000):
+            total += i % 7
+            parts.append("x")
+        return total, "".join(parts)
+
+    return _best_time(loop, repeat)
+
+
+def run_benchmarks(repeat: int) -> Dict[str, Dict[str, float]]:
+    from md2bbcode.html2bbcode import process_html
+    from md2bbcode.main import convert_markdown_to_bbcode, process_readme
+
+    results: Dict[str, Dict[str, float]] = {}
+    for name, documents in load_corpus().items():
+        # Warm up the shared converter and compute first-pass inputs for the HTML stage.
+        first_pass = [convert_markdown_to_bbcode(doc, None) for doc in documents]
+        process_readme(documents[0])
+        results[name] = {
+            "convert_markdown_to_bbcode": _best_time(lambda: [convert_markdown_to_bbcode(d, None) for d in documents], repeat),
+            "process_html": _best_time(lambda: [process_html(b) for b in first_pass], repeat),
+            "process_readme": _best_time(lambda: [process_readme(d) for d in documents], repeat),
+        }
+    return results
+
+
+def normalize(results: Dict[str, Dict[str, float]], calibration: float) -> Dict[str, Dict[str, float]]:
+    return {name: {stage: t / calibration for stage, t in stages.items()} for name, stages in results.items()}
+
+
+def compare(current: Dict[str, Dict[str, float]], baseline: Dict[str, Dict[str, float]], threshold: float) -> List[str]:
+    regressions = []
+    print(f"{'benchmark':<20} {'stage':<28} {'baseline':>10} {'current':>10} {'change':>8}")
+    for name, stages in current.items():
+        for stage, value in stages.items():
+            old = baseline.get(name, {}).get(stage)
+            if old is None:
+                print(f"{name:<20} {stage:<28} {'-':>10} {value:>10.3f} {'new':>8}")
+                continue
+            change = value / old - 1
+            flag = ""
+            if change > threshold:
+                flag = "  REGRESSION"
+                regressions.append(f"{name}/{stage}: {change:+.0%}")
+            print(f"{name:<20} {stage:<28} {old:>10.3f} {value:>10.3f} {change:>+8.0%}{flag}")
+    return regressions
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark md2bbcode conversion stages against a stored baseline.")
+    parser.add_argument("--repeat", type=int, default=5, help="Timing repetitions per stage; the fastest is kept (default: 5)")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD, help="Allowed slowdown before failing, as a fraction (default: 0.25)")
+    parser.add_argument("--baseline", default=BASELINE_PATH, help="Baseline JSON path")
+    parser.add_argument("--update-baseline", action="store_true", help="Write the results as the new baseline instead of comparing")
+    args = parser.parse_args(argv)
+
+    calibration = calibrate()
+    current = normalize(run_benchmarks(args.repeat), calibration)
+
+    if args.update_baseline or not os.path.exists(args.baseline):
+        with open(args.baseline, "w", encoding="utf-8") as file:
+            json.dump({"unit": "calibration loops", "results": current}, file, indent=2, sort_keys=True)
+            file.write("\n")
+        print(f"baseline written to {args.baseline}")
+        return 0
+
+    with open(args.baseline, "r", encoding="utf-8") as file:
+        baseline = json.load(file)["results"]
+    regressions = compare(current, baseline, args.threshold)
+    total_now = statistics.fmean(v for s in current.values() for v in s.values())
+    print(f"\ncalibration loop: {calibration * 1000:.2f} ms, mean normalized time: {total_now:.3f}")
+    if regressions:
+        print("regressions beyond threshold: " + ", ".join(regressions), file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,3 +1,23 @@
-from md2bbcode.main import process_readme
+# Public names are resolved lazily so that `import md2bbcode` doesn't pull in
+# mistune and BeautifulSoup until a conversion actually needs them.
+_EXPORTS = {
+    "Converter": "md2bbcode.main",
+    "process_readme": "md2bbcode.main",
+    "aprocess_readme": "md2bbcode.aio",
+    "amap": "md2bbcode.aio",
+}
 
-__all__ = ["process_readme"]
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    module_name = _EXPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    import importlib
+
+    return getattr(importlib.import_module(module_name), name)
+
+
+def __dir__():
+    return sorted(list(globals()) + __all__)
@@ -0,0 +1,50 @@
+import hashlib
+import json
+import os
+from functools import lru_cache
+
+
+def _source_digest() -> str:
+    # Hash of the package's Python sources, so a checkout without distribution metadata
+    # still gets a version that changes whenever the code does.
+    package_dir = os.path.dirname(os.path.abspath(__file__))
+    digest = hashlib.sha256()
+    for root, dirs, files in os.walk(package_dir):
+        dirs[:] = sorted(d for d in dirs if d != "__pycache__")
+        for name in sorted(files):
+            if name.endswith(".py"):
+                path = os.path.join(root, name)
+                digest.update(os.path.relpath(path, package_dir).replace(os.sep, "/").encode("utf-8"))
+                digest.update(b"\0")
+                with open(path, "rb") as file:
+                    digest.update(file.read())
+                digest.update(b"\0")
+    return digest.hexdigest()[:12]
+
+
+def _is_editable(dist) -> bool:
+    try:
+        direct_url = json.loads(dist.read_text("direct_url.json") or "{}")
+    except ValueError:
+        return False
+    dir_info = direct_url.get("dir_info") if isinstance(direct_url, dict) else None
+    return isinstance(dir_info, dict) and bool(dir_info.get("editable"))
+
+
+@lru_cache(maxsize=None)
+def get_version() -> str:
+    # Version comes from the installed distribution metadata (hatch-vcs at build time).
+    # A source checkout, or an editable install whose metadata was written when the
+    # checkout was installed, also carries a hash of the current sources.
+    try:
+        from importlib.metadata import PackageNotFoundError, distribution
+    except ImportError:  # pragma: no cover
+        return f"0+src.{_source_digest()}"
+    try:
+        dist = distribution("md2bbcode")
+    except PackageNotFoundError:
+        return f"0+src.{_source_digest()}"
+    if not _is_editable(dist):
+        return dist.version
+    separator = "." if "+" in dist.version else "+"
+    return f"{dist.version}{separator}src.{_source_digest()}"
@@ -0,0 +1,126 @@
+# asyncio entry points: conversions are CPU-bound, so they run in a thread or process
+# pool and the event loop only awaits the result.
+import asyncio
+import os
+import threading
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Iterable, List, Optional, Tuple, Union
+
+MapItem = Union[str, Tuple[str, Optional[str]]]
+
+
+_worker_state = threading.local()
+
+
+def _convert(markdown_text: str, domain: Optional[str]) -> str:
+    # Each worker thread (or process) converts with its own Converter, so workers
+    # don't queue on the shared default converter's lock.
+    converter = getattr(_worker_state, "converter", None)
+    if converter is None:
+        from md2bbcode.main import Converter
+
+        converter = _worker_state.converter = Converter()
+    return converter.convert(markdown_text, domain=domain)
+
+
+class AsyncConverter:
+    """
+    Runs conversions off the event loop.
+
+    By default a private thread pool is used; pass `processes=True` for a process
+    pool or hand in your own `executor`. Every worker converts with its own
+    Converter, but conversions are pure Python, so threads still take turns on the
+    GIL: they keep the loop free and stop a short document from waiting for a long
+    one, while only `processes=True` spreads the CPU work over several cores.
+    `max_concurrency` caps how many conversions are submitted at once across all
+    callers; further requests wait without blocking the loop. Cancelling an
+    awaiting task drops conversions that haven't started yet.
+    """
+
+    def __init__(
+        self,
+        max_concurrency: Optional[int] = None,
+        processes: bool = False,
+        executor: Optional[Executor] = None,
+    ) -> None:
+        if max_concurrency is None:
+            max_concurrency = os.cpu_count() or 1
+        self.max_concurrency = max(1, max_concurrency)
+        self._owns_executor = executor is None
+        if executor is None:
+            pool = ProcessPoolExecutor if processes else ThreadPoolExecutor
+            executor = pool(max_workers=self.max_concurrency)
+        self.executor = executor
+        self._semaphores: dict = {}
+        self._lock = threading.Lock()
+
+    def _semaphore(self) -> asyncio.Semaphore:
+        # asyncio primitives belong to one loop; keep one per loop that uses us.
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            semaphore = self._semaphores.get(loop)
+            if semaphore is None:
+                for other in [l for l in self._semaphores if l.is_closed()]:
+                    del self._semaphores[other]
+                semaphore = self._semaphores[loop] = asyncio.Semaphore(self.max_concurrency)
+        return semaphore
+
+    async def convert(self, markdown_text: str, domain: Optional[str] = None) -> str:
+        async with self._semaphore():
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self.executor, _convert, markdown_text, domain)
+
+    async def map(self, items: Iterable[MapItem], domain: Optional[str] = None) -> List[str]:
+        """
+        Convert many documents concurrently and return the results in input order.
+        Items are Markdown strings or (markdown, domain) pairs. If one conversion
+        fails or the caller is cancelled, the remaining conversions are cancelled.
+        """
+        tasks = []
+        for item in items:
+            if isinstance(item, str):
+                markdown_text, item_domain = item, domain
+            else:
+                markdown_text, item_domain = item
+            tasks.append(asyncio.ensure_future(self.convert(markdown_text, item_domain)))
+        try:
+            return list(await asyncio.gather(*tasks))
+        except BaseException:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            raise
+
+    def close(self, wait: bool = True) -> None:
+        if self._owns_executor:
+            self.executor.shutdown(wait=wait, cancel_futures=True)
+
+    async def __aenter__(self) -> "AsyncConverter":
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        # Shutting down waits for running work, so do it off the loop.
+        await asyncio.get_running_loop().run_in_executor(None, self.close)
+
+
+_default_async_converter: Optional[AsyncConverter] = None
+_default_async_converter_lock = threading.Lock()
+
+
+def get_default_async_converter() -> AsyncConverter:
+    global _default_async_converter
+    if _default_async_converter is None:
+        with _default_async_converter_lock:
+            if _default_async_converter is None:
+                _default_async_converter = AsyncConverter()
+    return _default_async_converter
+
+
+async def aprocess_readme(markdown_text: str, domain: Optional[str] = None) -> str:
+    """Async counterpart of process_readme, run on the shared AsyncConverter."""
+    return await get_default_async_converter().convert(markdown_text, domain)
+
+
+async def amap(items: Iterable[MapItem], domain: Optional[str] = None) -> List[str]:
+    """Async batch conversion on the shared AsyncConverter; see AsyncConverter.map."""
+    return await get_default_async_converter().map(items, domain)
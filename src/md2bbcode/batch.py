@@ -0,0 +1,172 @@
+# converts a whole directory tree of Markdown files, mirroring it into an output directory.
+# a manifest of input hashes lets reruns skip files that haven't changed.
+import hashlib
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterator, List, NamedTuple, Optional, Tuple
+
+from md2bbcode._version import get_version
+
+MANIFEST_NAME = ".md2bbcode-manifest.json"
+MANIFEST_VERSION = 1
+MARKDOWN_SUFFIXES = (".md", ".markdown")
+OUTPUT_SUFFIX = ".bbcode"
+
+
+class BatchResult(NamedTuple):
+    converted: List[str]
+    skipped: List[str]
+    removed: List[str]
+    failed: Dict[str, str]
+
+
+def _hash_file(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as file:
+        for block in iter(lambda: file.read(1 << 16), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _output_relpath(relpath: str) -> str:
+    return os.path.splitext(relpath)[0] + OUTPUT_SUFFIX
+
+
+def _iter_markdown_files(input_dir: str, output_dir: str) -> Iterator[str]:
+    # Yields paths relative to input_dir using "/" separators so manifests are portable.
+    output_dir = os.path.abspath(output_dir)
+    for root, dirs, files in os.walk(input_dir):
+        dirs[:] = sorted(d for d in dirs if os.path.abspath(os.path.join(root, d)) != output_dir)
+        for name in sorted(files):
+            if name.lower().endswith(MARKDOWN_SUFFIXES):
+                relpath = os.path.relpath(os.path.join(root, name), input_dir)
+                yield relpath.replace(os.sep, "/")
+
+
+def _load_manifest(path: str) -> dict:
+    try:
+        with open(path, "r", encoding="utf-8") as file:
+            manifest = json.load(file)
+    except (OSError, ValueError):
+        return {}
+    return manifest if isinstance(manifest, dict) else {}
+
+
+def _write_manifest(path: str, manifest: dict) -> None:
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as file:
+        json.dump(manifest, file, indent=2, sort_keys=True)
+    os.replace(tmp_path, path)
+
+
+def _convert_file(job: Tuple[str, str, Optional[str]]) -> Optional[str]:
+    # Runs in a worker process; returns an error message instead of raising so one
+    # bad file doesn't abort the batch.
+    input_path, output_path, domain = job
+    from md2bbcode.main import process_readme
+
+    try:
+        with open(input_path, "r", encoding="utf-8") as md_file:
+            markdown_text = md_file.read()
+        final_bbcode = process_readme(markdown_text, domain)
+        os.makedirs(os.path.dirname(output_path) or ".", exist_ok=True)
+        with open(output_path, "w", encoding="utf-8", newline="") as out_file:
+            out_file.write(final_bbcode)
+            if not final_bbcode.endswith("\n"):
+                out_file.write("\n")
+    except Exception as exc:
+        return f"{type(exc).__name__}: {exc}"
+    return None
+
+
+def convert_tree(
+    input_dir: str,
+    output_dir: str,
+    domain: Optional[str] = None,
+    jobs: Optional[int] = None,
+    force: bool = False,
+) -> BatchResult:
+    """
+    Convert every Markdown file below input_dir into a .bbcode file at the same
+    relative path below output_dir, using up to `jobs` worker processes.
+
+    Files whose content hash, tool version and options match the manifest from the
+    previous run (and whose output still exists) are skipped unless `force` is set.
+    """
+    manifest_path = os.path.join(output_dir, MANIFEST_NAME)
+    options = {"domain": domain}
+    previous = {} if force else _load_manifest(manifest_path)
+    if (
+        previous.get("manifest_version") != MANIFEST_VERSION
+        or previous.get("tool_version") != get_version()
+        or previous.get("options") != options
+    ):
+        # Anything that could change the output invalidates the whole manifest.
+        previous = {}
+    previous_files: Dict[str, str] = previous.get("files", {})
+
+    files: Dict[str, str] = {}
+    skipped: List[str] = []
+    pending: List[str] = []
+    owners: Dict[str, str] = {}
+    failed: Dict[str, str] = {}
+    for relpath in _iter_markdown_files(input_dir, output_dir):
+        # a.md and a.markdown both map to a.bbcode; the first one (in walk order) wins.
+        owner = owners.setdefault(_output_relpath(relpath), relpath)
+        if owner != relpath:
+            failed[relpath] = f"output {_output_relpath(relpath)} is already written by {owner}"
+            continue
+        digest = _hash_file(os.path.join(input_dir, relpath))
+        files[relpath] = digest
+        output_path = os.path.join(output_dir, _output_relpath(relpath))
+        if previous_files.get(relpath) == digest and os.path.exists(output_path):
+            skipped.append(relpath)
+        else:
+            pending.append(relpath)
+
+    # Drop outputs whose source file has disappeared since the last run.
+    removed: List[str] = []
+    for relpath in sorted(set(previous_files) - set(files)):
+        if relpath in failed or _output_relpath(relpath) in owners:
+            # Still present (but colliding), or its output now belongs to another file.
+            continue
+        try:
+            os.remove(os.path.join(output_dir, _output_relpath(relpath)))
+        except FileNotFoundError:
+            pass
+        removed.append(relpath)
+
+    job_args = [
+        (os.path.join(input_dir, relpath), os.path.join(output_dir, _output_relpath(relpath)), domain)
+        for relpath in pending
+    ]
+    if jobs is None:
+        jobs = os.cpu_count() or 1
+    if jobs <= 1 or len(job_args) <= 1:
+        errors = [_convert_file(job) for job in job_args]
+    else:
+        chunksize = max(1, len(job_args) // (jobs * 4))
+        with ProcessPoolExecutor(max_workers=jobs) as executor:
+            errors = list(executor.map(_convert_file, job_args, chunksize=chunksize))
+
+    converted: List[str] = []
+    for relpath, error in zip(pending, errors):
+        if error is None:
+            converted.append(relpath)
+        else:
+            failed[relpath] = error
+            # Leave failures out of the manifest so the next run retries them.
+            files.pop(relpath, None)
+
+    os.makedirs(output_dir, exist_ok=True)
+    _write_manifest(
+        manifest_path,
+        {
+            "manifest_version": MANIFEST_VERSION,
+            "tool_version": get_version(),
+            "options": options,
+            "files": files,
+        },
+    )
+    return BatchResult(converted, skipped, removed, failed)
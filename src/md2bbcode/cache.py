@@ -0,0 +1,222 @@
+# content-addressed result cache for conversions: an in-memory LRU tier in front of an
+# optional on-disk tier with a size cap. Keys hash the Markdown, the domain, the enabled
+# plugins and the package version, so stale results are never served after an upgrade.
+import hashlib
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from md2bbcode._version import get_version
+
+DEFAULT_MEMORY_ITEMS = 1024
+DEFAULT_MAX_DISK_BYTES = 256 * 1024 * 1024
+# Evict down to this fraction of the cap so we don't rescan on every write.
+_EVICT_TARGET = 0.9
+_ENTRY_SUFFIX = ".bbcode"
+
+
+def plugin_names(plugins: Iterable) -> List[str]:
+    return [f"{getattr(p, '__module__', '')}.{getattr(p, '__qualname__', repr(p))}" for p in plugins]
+
+
+def cache_key(markdown_text: str, domain: Optional[str], plugins: Iterable[str], version: Optional[str] = None) -> str:
+    digest = hashlib.sha256()
+    for part in (version or get_version(), domain or "", "\0".join(plugins)):
+        digest.update(part.encode("utf-8"))
+        digest.update(b"\0")
+    digest.update(markdown_text.encode("utf-8", "surrogatepass"))
+    return digest.hexdigest()
+
+
+class ResultCache:
+    """
+    Two-tier LRU cache of converted BBCode.
+
+    The memory tier holds up to `memory_items` results. When `directory` is given,
+    results are also stored there as one file per key, written atomically so several
+    processes can share the directory. Disk entries are touched on every hit and the
+    least recently used ones are removed once the directory grows past `max_bytes`.
+    """
+
+    def __init__(
+        self,
+        directory: Optional[str] = None,
+        memory_items: int = DEFAULT_MEMORY_ITEMS,
+        max_bytes: int = DEFAULT_MAX_DISK_BYTES,
+    ) -> None:
+        self.directory = directory
+        self.memory_items = memory_items
+        self.max_bytes = max_bytes
+        self._memory: "OrderedDict[str, str]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._disk_bytes: Optional[int] = None
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.writes = 0
+        self.write_errors = 0
+        self.evictions = 0
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key[:2], key + _ENTRY_SUFFIX)
+
+    def _remember(self, key: str, value: str) -> None:
+        if self.memory_items <= 0:
+            return
+        with self._lock:
+            self._memory[key] = value
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.memory_items:
+                self._memory.popitem(last=False)
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            value = self._memory.get(key)
+            if value is not None:
+                self._memory.move_to_end(key)
+                self.memory_hits += 1
+                return value
+
+        if self.directory:
+            path = self._path(key)
+            try:
+                with open(path, "r", encoding="utf-8", newline="") as file:
+                    value = file.read()
+            except FileNotFoundError:
+                value = None
+            except (OSError, ValueError):
+                # An entry that can't be read back (corrupt, or not written by us) is
+                # a miss; remove it so the next put() replaces it.
+                value = None
+                self._discard(path)
+            if value is not None:
+                try:
+                    os.utime(path)
+                except OSError:
+                    pass
+                with self._lock:
+                    self.disk_hits += 1
+                self._remember(key, value)
+                return value
+
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def put(self, key: str, value: str) -> None:
+        self._remember(key, value)
+        if not self.directory:
+            return
+
+        try:
+            self._write(self._path(key), value)
+        except OSError:
+            # The disk tier is best-effort: a full, read-only or inaccessible directory
+            # leaves the result in the memory tier only.
+            with self._lock:
+                self.write_errors += 1
+
+    def _write(self, path: str, value: str) -> None:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8", newline="") as file:
+                file.write(value)
+            size = os.path.getsize(tmp_path)
+            # The entry being replaced no longer counts towards the budget.
+            try:
+                size -= os.path.getsize(path)
+            except FileNotFoundError:
+                pass
+            os.replace(tmp_path, path)
+        except BaseException:
+            try:
+                os.unlink(tmp_path)
+            except OSError:
+                pass
+            raise
+
+        with self._lock:
+            self.writes += 1
+            if self._disk_bytes is None:
+                self._disk_bytes = self._scan_disk()[1]
+            else:
+                self._disk_bytes += size
+            over_budget = self._disk_bytes > self.max_bytes
+        if over_budget:
+            self._evict()
+
+    def _discard(self, path: str) -> None:
+        try:
+            size = os.path.getsize(path)
+            os.unlink(path)
+        except OSError:
+            return
+        with self._lock:
+            if self._disk_bytes is not None:
+                self._disk_bytes -= size
+
+    def _scan_disk(self) -> Tuple[List[Tuple[float, int, str]], int]:
+        entries: List[Tuple[float, int, str]] = []
+        total = 0
+        for shard in os.scandir(self.directory):
+            if not shard.is_dir():
+                continue
+            for entry in os.scandir(shard.path):
+                if not entry.name.endswith(_ENTRY_SUFFIX):
+                    continue
+                try:
+                    stat = entry.stat()
+                except FileNotFoundError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+                total += stat.st_size
+        return entries, total
+
+    def _evict(self) -> None:
+        # Other processes may be evicting at the same time; losing a race on a file is fine.
+        entries, total = self._scan_disk()
+        target = int(self.max_bytes * _EVICT_TARGET)
+        evicted = 0
+        for _, size, path in sorted(entries):
+            if total <= target:
+                break
+            try:
+                os.unlink(path)
+            except FileNotFoundError:
+                pass
+            except OSError:
+                continue
+            total -= size
+            evicted += 1
+        with self._lock:
+            self._disk_bytes = total
+            self.evictions += evicted
+
+    def clear(self) -> None:
+        with self._lock:
+            self._memory.clear()
+        if self.directory:
+            for _, _, path in self._scan_disk()[0]:
+                try:
+                    os.unlink(path)
+                except FileNotFoundError:
+                    pass
+            with self._lock:
+                self._disk_bytes = 0
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "memory_hits": self.memory_hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "writes": self.writes,
+                "write_errors": self.write_errors,
+                "evictions": self.evictions,
+                "memory_items": len(self._memory),
+            }
@@ -1,14 +1,32 @@
 # converts some HTML tags to BBCode
 # pass --debug to save the output to readme.finalpass
+from __future__ import annotations
+
 import argparse
 import re
 import sys
-from typing import Dict, List, Optional, Set, Tuple
-from urllib.parse import urljoin, urlparse
+import threading
+from collections import OrderedDict
+from functools import lru_cache
+from types import MethodType
+from typing import TYPE_CHECKING, Dict, FrozenSet, List, NamedTuple, Optional, Sequence, Set, Tuple
+
+from md2bbcode.urls import image_url, resolve_url
+
+if TYPE_CHECKING:
+    from bs4 import BeautifulSoup, Comment, NavigableString, Tag
+
+    from md2bbcode.profiling import ConversionProfile
+else:
+    # bs4 is imported by _import_bs4() when the first converter is created, so the
+    # html2bbcode CLI (and md2bbcode, which imports this module) start quickly.
+    BeautifulSoup = Comment = NavigableString = Tag = None
 
-from bs4 import BeautifulSoup, Comment, NavigableString, Tag
 
-from md2bbcode.image_rewrite import rewrite_svg_url
+def _import_bs4() -> None:
+    global BeautifulSoup, Comment, NavigableString, Tag
+    if BeautifulSoup is None:
+        from bs4 import BeautifulSoup, Comment, NavigableString, Tag
 
 # XenForo (2.3.x) built-in BBCode option validation (see XF\BbCode\RuleSet::addDefaultTags()).
 _XF_COLOR_OPTION_RE = re.compile(
@@ -17,8 +35,175 @@ _XF_COLOR_OPTION_RE = re.compile(
 )
 _XF_FONT_OPTION_RE = re.compile(r"^[a-z0-9 \-]+$", re.IGNORECASE)
 _XF_SIZE_OPTION_RE = re.compile(r"^[0-9]+(px)?$", re.IGNORECASE)
+_FONT_DISALLOWED_RE = re.compile(r"[^a-z0-9 \-]+", re.IGNORECASE)
+_WHITESPACE_RUN_RE = re.compile(r"\s+")
+
+# Editor-exported HTML repeats a few dozen distinct style attributes thousands of
+# times, so resolve_style() memoizes each one (see style_cache_stats()).
+STYLE_CACHE_SIZE = 1024
 
 _TOKEN_RE = re.compile("\x1A(\\d+)\x1A")
+# Characters the HTML pass can change in otherwise plain text: tags, entities and stash tokens.
+_HTML_PASS_TRIGGER_RE = re.compile("[<&\x1A]")
+
+# "soup" builds a BeautifulSoup tree; "events" converts straight from html.parser
+# events with only a stack of open elements (see md2bbcode.html_events).
+HTML_ENGINES = ("soup", "events")
+
+# How the "soup" engine walks the tree. "recursive" returns a string per element and
+# wraps it again at every level; "buffered" writes each element's opening and closing
+# BBCode around its children in one shared list that is joined once; "iterative" does
+# the same with an explicit stack, so nesting depth is only limited by memory.
+HTML_CONVERT_MODES = ("recursive", "buffered", "iterative")
+
+# BeautifulSoup tree builders the "soup" engine can use, with the module each needs.
+# "auto" picks lxml when it is installed and html.parser otherwise.
+HTML_PARSERS = ("html.parser", "lxml", "html5lib")
+_PARSER_MODULES = {"html.parser": "html.parser", "lxml": "lxml", "html5lib": "html5lib"}
+
+
+@lru_cache(maxsize=None)
+def available_html_parsers() -> Tuple[str, ...]:
+    """
+    Return the HTML_PARSERS whose modules are installed, html.parser first. Looked up
+    once per process; call available_html_parsers.cache_clear() after installing one.
+    """
+    import importlib.util
+
+    return tuple(name for name in HTML_PARSERS if importlib.util.find_spec(_PARSER_MODULES[name]) is not None)
+
+
+def resolve_html_parser(parser: str) -> str:
+    """
+    Turn a parser option into a tree builder name. Raises ValueError for an unknown
+    name or one whose module is not installed.
+    """
+    if parser == "html.parser":
+        # Part of the standard library, so there is nothing to look up.
+        return parser
+    available = available_html_parsers()
+    if parser == "auto":
+        return "lxml" if "lxml" in available else "html.parser"
+    if parser not in HTML_PARSERS:
+        raise ValueError(f"unknown parser {parser!r}, expected 'auto' or one of {HTML_PARSERS}")
+    if parser not in available:
+        raise ValueError(f"parser {parser!r} is not installed")
+    return parser
+
+
+def needs_html_pass(text: str) -> bool:
+    """
+    Return False when converting `text` with HtmlToBbCodeConverter would return it
+    unchanged, so the BeautifulSoup pass can be skipped. BeautifulSoup collapses a
+    whitespace-only document to a single newline, so blank output still takes the full pass.
+    """
+    if _HTML_PASS_TRIGGER_RE.search(text):
+        return True
+    return bool(text) and not text.strip()
+
+
+# Markup that html.parser turns into a node: comments, declarations and processing
+# instructions, end tags and start tags (attribute values may contain ">").
+_ISLAND_MARKUP_RE = re.compile(
+    r"""<!--(?!-?>).*?-->
+    |<!(?!--)[^>]*>
+    |<\?[^>]*>
+    |</(?P<end>[a-zA-Z][^\t\n\r\f />\x00]*)[^>]*>
+    |<(?P<start>[a-zA-Z][^\t\n\r\f />\x00]*)(?:"[^"]*"|'[^']*'|[^'">])*>""",
+    re.DOTALL | re.VERBOSE,
+)
+# "<" that looks like markup but wasn't matched above (bogus comments, unterminated tags).
+_ISLAND_STRAY_RE = re.compile(r"<[a-zA-Z/!?]")
+_VOID_TAGS = frozenset({
+    "area", "base", "basefont", "bgsound", "br", "col", "command", "embed", "frame", "hr", "image",
+    "img", "input", "isindex", "keygen", "link", "menuitem", "meta", "nextid", "param", "source",
+    "spacer", "track", "wbr",
+})
+# Raw-text elements, whose content isn't parsed as markup.
+_ISLAND_TO_END_TAGS = frozenset({"script", "style"})
+# Document-level elements change which part of the whole document is output.
+_ISLAND_FULL_PASS_RE = re.compile(r"<(?:html|head|body)[\t\n\r\f />]", re.IGNORECASE)
+# Plain text shorter than this between two islands is converted along with them.
+_ISLAND_MIN_GAP = 256
+
+
+def ends_with_markup(text: str) -> bool:
+    """
+    Return True when `text` ends with a tag, comment or declaration that the HTML pass
+    parses as markup, rather than with a literal ">" in text (an arrow, "x > y").
+    """
+    if not text.endswith(">"):
+        return False
+    last = None
+    for last in _ISLAND_MARKUP_RE.finditer(text):
+        pass
+    return last is not None and last.end() == len(text)
+
+
+def _is_plain_text(text: str) -> bool:
+    # Text html.parser hands back unchanged as its own node: no markup or entities, and
+    # not whitespace-only (BeautifulSoup collapses that to a single character).
+    return not text or ("<" not in text and "&" not in text and not text.isspace())
+
+
+def find_html_islands(text: str) -> Optional[List[Tuple[int, int]]]:
+    """
+    Return the (start, end) spans of `text` that need HtmlToBbCodeConverter, such that
+    converting each span on its own and copying everything between them unchanged
+    gives the same result as converting the whole text. Spans cover HTML elements
+    from their start tag to the point where no element is open any more, plus any
+    entities or whitespace-only text around them. Returns None when the whole text
+    has to be converted at once (e.g. it contains a <body> element).
+    """
+    if _ISLAND_FULL_PASS_RE.search(text):
+        return None
+    islands: List[Tuple[int, int]] = []
+    depth: List[str] = []
+    island_start: Optional[int] = None
+    run_start = 0
+    end = len(text)
+    for match in _ISLAND_MARKUP_RE.finditer(text):
+        run = text[run_start:match.start()]
+        if _ISLAND_STRAY_RE.search(run):
+            # html.parser may read this differently; keep the rest in one island.
+            islands.append((run_start if island_start is None else island_start, end))
+            return islands
+        if not depth:
+            if island_start is None:
+                island_start = match.start() if _is_plain_text(run) else run_start
+            elif len(run) >= _ISLAND_MIN_GAP and _is_plain_text(run):
+                # Shorter plain gaps stay inside the island; each island costs a parse.
+                islands.append((island_start, run_start))
+                island_start = match.start()
+
+        name = match.group("start")
+        if name is not None:
+            name = name.lower()
+            if name in _ISLAND_TO_END_TAGS:
+                islands.append((island_start, end))
+                return islands
+            if name not in _VOID_TAGS and not match.group(0).endswith("/>"):
+                depth.append(name)
+        else:
+            name = match.group("end")
+            if name is not None:
+                name = name.lower()
+                if name in _VOID_TAGS:
+                    # BeautifulSoup tracks these across the document; don't guess.
+                    islands.append((island_start, end))
+                    return islands
+                if name in depth:
+                    del depth[len(depth) - 1 - depth[::-1].index(name):]
+        run_start = match.end()
+
+    run = text[run_start:]
+    if island_start is not None and len(run) < _ISLAND_MIN_GAP:
+        islands.append((island_start, end))
+    elif _ISLAND_STRAY_RE.search(run) or depth or not _is_plain_text(run):
+        islands.append((run_start if island_start is None else island_start, end))
+    elif island_start is not None:
+        islands.append((island_start, run_start))
+    return islands
 
 
 def _strip_important(value: str) -> str:
@@ -43,18 +228,111 @@ def _sanitize_font(value: str) -> Optional[str]:
         value = value.split(",", 1)[0]
     value = value.strip().strip('"').strip("'")
     # XF allows letters/numbers/spaces/hyphens. Drop other characters safely.
-    value = re.sub(r"[^a-z0-9 \-]+", " ", value, flags=re.IGNORECASE)
-    value = re.sub(r"\s+", " ", value).strip()
+    value = _FONT_DISALLOWED_RE.sub(" ", value)
+    value = _WHITESPACE_RUN_RE.sub(" ", value).strip()
     return value if value and _XF_FONT_OPTION_RE.match(value) else None
 
 
-def _safe_url(url: str, domain: Optional[str]) -> str:
-    # Simple URL sanitization matching BBCodeRenderer.safe_url.
-    if url.startswith(("javascript:", "vbscript:", "data:")):
-        return "#harmful-link"
-    if domain and not urlparse(url).netloc:
-        return urljoin(domain, url)
-    return url
+class ResolvedStyle(NamedTuple):
+    # BBCode (tag, option) pairs to wrap the content in, outermost first.
+    wrappers: Tuple[Tuple[str, Optional[str]], ...]
+    # The text-align value, lowercased, or None.
+    alignment: Optional[str]
+
+
+_NO_SKIPS: FrozenSet[str] = frozenset()
+
+
+def _parse_style(style: str) -> Dict[str, str]:
+    css_properties: Dict[str, str] = {}
+    for item in style.split(";"):
+        if ":" not in item:
+            continue
+        key, value = item.split(":", 1)
+        key = key.strip().lower()
+        value = value.strip()
+        if key:
+            css_properties[key] = value
+    return css_properties
+
+
+def resolve_style(
+    style: str,
+    skip_tags: Optional[Set[str]] = None,
+    skip_props: Optional[Set[str]] = None,
+) -> ResolvedStyle:
+    """
+    Turn an inline style attribute into BBCode wrappers and an alignment, memoized
+    per (style, skip_tags, skip_props). skip_tags holds BBCode tags the element
+    already produces; skip_props holds "color", "size" or "font" when the element's
+    own attributes already set them.
+    """
+    return _resolve_style(
+        style,
+        frozenset(t.upper() for t in skip_tags) if skip_tags else _NO_SKIPS,
+        frozenset(skip_props) if skip_props else _NO_SKIPS,
+    )
+
+
+@lru_cache(maxsize=STYLE_CACHE_SIZE)
+def _resolve_style(style: str, skip_tags: FrozenSet[str], skip_props: FrozenSet[str]) -> ResolvedStyle:
+    css_properties = _parse_style(style)
+    wrappers: List[Tuple[str, Optional[str]]] = []
+
+    if "color" in css_properties and "color" not in skip_props:
+        color = _sanitize_color(css_properties["color"])
+        if color:
+            wrappers.append(("COLOR", color))
+    if "font-size" in css_properties and "size" not in skip_props:
+        size = _sanitize_size(css_properties["font-size"])
+        if size:
+            wrappers.append(("SIZE", size))
+    if "font-family" in css_properties and "font" not in skip_props:
+        face = _sanitize_font(css_properties["font-family"])
+        if face:
+            wrappers.append(("FONT", face))
+    if "text-decoration" in css_properties:
+        decoration = css_properties["text-decoration"].lower()
+        if "line-through" in decoration and "S" not in skip_tags:
+            wrappers.append(("S", None))
+        if "underline" in decoration and "U" not in skip_tags:
+            wrappers.append(("U", None))
+    if "font-weight" in css_properties and "B" not in skip_tags:
+        weight = css_properties["font-weight"].lower()
+        if weight == "bold" or (weight.isdigit() and int(weight) >= 700):
+            wrappers.append(("B", None))
+    if "font-style" in css_properties and "I" not in skip_tags:
+        style_val = css_properties["font-style"].lower()
+        if style_val in {"italic", "oblique"}:
+            wrappers.append(("I", None))
+
+    alignment = css_properties.get("text-align")
+    return ResolvedStyle(tuple(wrappers), alignment.strip().lower() if alignment is not None else None)
+
+
+@lru_cache(maxsize=STYLE_CACHE_SIZE)
+def _wrapper_pair(wrappers: Tuple[Tuple[str, Optional[str]], ...]) -> Tuple[str, str]:
+    # The opening and closing BBCode for (tag, option) wrappers, outermost first.
+    opening = "".join(f"[{tag}]" if value is None else f"[{tag}={value}]" for tag, value in wrappers)
+    closing = "".join(f"[/{tag}]" for tag, _ in reversed(wrappers))
+    return opening, closing
+
+
+_EMPTY_PAIR = ("", "")
+_ALIGNMENT_PAIRS = {
+    "center": ("[CENTER]", "[/CENTER]"),
+    "right": ("[RIGHT]", "[/RIGHT]"),
+    "left": ("[LEFT]", "[/LEFT]"),
+}
+
+
+def style_cache_stats() -> Dict[str, int]:
+    info = _resolve_style.cache_info()
+    return {"hits": info.hits, "misses": info.misses, "size": info.currsize, "maxsize": info.maxsize}
+
+
+def clear_style_cache() -> None:
+    _resolve_style.cache_clear()
 
 
 def _add_token(tokens: List[str], original: str) -> str:
@@ -64,27 +342,126 @@ def _add_token(tokens: List[str], original: str) -> str:
     return token
 
 
-def _stash_bbcode_plain_items(text: str) -> Tuple[str, List[str]]:
+# Tags that XF treats as plain or that should not be HTML-parsed in our pipeline.
+BBCODE_PLAIN_TAGS = ("code", "icode", "php", "html", "plain", "media", "img", "user", "attach")
+
+
+def _tag_key(name: str) -> str:
+    # Lowercases one character at a time, as re compares backreferences with IGNORECASE.
+    return name.replace("\u0130", "i").lower()
+
+
+class PlainTagScanner:
+    """
+    Finds BBCode plain-tag segments ([TAG ...]...[/TAG]) in one linear pass.
+
+    An opener is "[" plus a tag name (case-insensitive, anything may follow the name)
+    up to the next "]"; its content runs to the first matching closing tag. Anything in
+    between, including other openers of any plain tag, is content, so nesting never
+    pairs up. An opener without a closing tag is left as text and scanning resumes
+    right after its "[". When tags share a prefix, the earlier one in `tags` is tried
+    first. This is the same matching as the old lazy regex, without rescanning the
+    rest of the document for every unclosed opener.
+
+    stash() still runs that regex while every opener it meets is closed, which is
+    faster than the scanner's loop over openers, and hands the rest of the text to
+    the scanner at the first opener that isn't.
+    """
+
+    def __init__(self, tags: Sequence[str] = BBCODE_PLAIN_TAGS) -> None:
+        self.tags = tuple(tags)
+        if not self.tags:
+            raise ValueError("at least one plain tag is required")
+        names = "|".join(re.escape(tag) for tag in self.tags)
+        self._opener_re = re.compile(rf"\[(?:{names})", re.IGNORECASE)
+        self._closer_re = re.compile(rf"\[/({names})\]", re.IGNORECASE)
+        self._tag_res = [re.compile(re.escape(tag), re.IGNORECASE) for tag in self.tags]
+        # The old regex, except that an opener without "]" or without a closing tag
+        # matches to the end of the text (with no "closed" group) instead of failing
+        # after a rescan, so every match costs no more than the text it covers. The
+        # content skips ahead to each "[" rather than trying the closing tag at every
+        # character as the lazy ".*?" did.
+        self._segment_re = re.compile(
+            rf"\[({names})(?:[^\]]*\](?:[^\[]*(?:\[(?!/\1\])[^\[]*)*(?P<closed>\[/\1\])|.*)|[^\]]*)",
+            re.IGNORECASE | re.DOTALL,
+        )
+
+    def spans(self, text: str, position: int = 0) -> List[Tuple[int, int]]:
+        """Return the (start, end) offsets of every plain segment from position on, in order."""
+        closers = self._closers(text, position)
+        # Index of the next unused closing tag per name; openers only move forward.
+        next_closer: Dict[str, int] = {}
+        spans: List[Tuple[int, int]] = []
+        bracket = -1
+        for opener in self._opener_re.finditer(text, position):
+            start = opener.start()
+            if start < position:
+                continue
+            if bracket < start:
+                bracket = text.find("]", start)
+                if bracket < 0:
+                    break
+            for tag, tag_re in zip(self.tags, self._tag_res):
+                if not tag_re.match(text, start + 1):
+                    continue
+                # The closing tag must repeat the opener's name, ignoring case.
+                key = _tag_key(text[start + 1:start + 1 + len(tag)])
+                positions = closers.get(key, ())
+                cursor = next_closer.get(key, 0)
+                while cursor < len(positions) and positions[cursor][0] <= bracket:
+                    cursor += 1
+                next_closer[key] = cursor
+                if cursor < len(positions):
+                    position = positions[cursor][1]
+                    spans.append((start, position))
+                    break
+        return spans
+
+    def _closers(self, text: str, position: int) -> Dict[str, List[Tuple[int, int]]]:
+        closers: Dict[str, List[Tuple[int, int]]] = {}
+        for match in self._closer_re.finditer(text, position):
+            closers.setdefault(_tag_key(match.group(1)), []).append(match.span())
+        return closers
+
+    def stash(self, text: str) -> Tuple[str, List[str]]:
+        """Replace each plain segment with a token; _restore_tokens() puts them back."""
+        tokens: List[str] = []
+        parts = []
+        position = 0
+        spans: Sequence[Tuple[int, int]] = ()
+        for match in self._segment_re.finditer(text):
+            if match.group("closed") is None:
+                spans = self.spans(text, match.start())
+                break
+            parts.append(text[position:match.start()])
+            parts.append(_add_token(tokens, match.group(0)))
+            position = match.end()
+        for start, end in spans:
+            parts.append(text[position:start])
+            parts.append(_add_token(tokens, text[start:end]))
+            position = end
+        if not tokens:
+            return text, tokens
+        parts.append(text[position:])
+        return "".join(parts), tokens
+
+
+_default_plain_scanner: Optional[PlainTagScanner] = None
+
+
+def _stash_bbcode_plain_items(text: str, scanner: Optional[PlainTagScanner] = None) -> Tuple[str, List[str]]:
     """
     Stash BBCode segments that must be treated as "plain" so we don't accidentally
     parse/convert HTML inside them (e.g. inline code that contains <font>...).
 
     Mirrors the spirit of XF's own Markdown stashing of plain tags.
     """
-    tokens: List[str] = []
-    # Tags that XF treats as plain or that should not be HTML-parsed in our pipeline.
-    plain_tags = ("code", "icode", "php", "html", "plain", "media", "img", "user", "attach")
-    plain_tags_regex = "|".join(plain_tags)
-
-    pattern = re.compile(
-        rf"\[(?P<tag>{plain_tags_regex})(?:[^\]]*)\](?P<content>.*?)\[/\1\]",
-        re.IGNORECASE | re.DOTALL,
-    )
-
-    def repl(match: "re.Match") -> str:
-        return _add_token(tokens, match.group(0))
-
-    return pattern.sub(repl, text), tokens
+    global _default_plain_scanner
+    if scanner is None:
+        if _default_plain_scanner is None:
+            _default_plain_scanner = PlainTagScanner()
+        scanner = _default_plain_scanner
+    return scanner.stash(text)
 
 
 def _restore_tokens(text: str, tokens: List[str]) -> str:
@@ -95,58 +472,298 @@ def _restore_tokens(text: str, tokens: List[str]) -> str:
     return _TOKEN_RE.sub(repl, text)
 
 
+def _simple_wrap(bbcode_tag: str):
+    return lambda converter, tag: converter._wrap_simple(tag, bbcode_tag)
+
+
+def _children_handler(wrap):
+    def handle(converter: HtmlToBbCodeConverter, tag: Tag) -> str:
+        opening, closing = wrap(converter, tag)
+        return opening + converter._convert_children(tag) + closing
+
+    return handle
+
+
 class HtmlToBbCodeConverter:
-    def __init__(self, domain: Optional[str] = None) -> None:
+    """
+    Converts the HTML left in first-pass output to BBCode. With islands=True only
+    the spans found by find_html_islands() are parsed; the rest is copied through.
+
+    parser picks the BeautifulSoup tree builder for the "soup" engine (see
+    HTML_PARSERS; "auto" prefers lxml). Island detection follows html.parser, so
+    other builders always parse the whole document. The "events" engine is built on
+    html.parser and accepts only "html.parser" or "auto".
+
+    plain_tags replaces BBCODE_PLAIN_TAGS, the BBCode tags whose content is never
+    parsed as HTML.
+
+    mode picks how the "soup" engine walks the tree (see HTML_CONVERT_MODES); every
+    mode gives the same output.
+    """
+
+    def __init__(
+        self,
+        domain: Optional[str] = None,
+        islands: bool = False,
+        engine: str = "soup",
+        parser: str = "html.parser",
+        plain_tags: Optional[Sequence[str]] = None,
+        mode: str = "recursive",
+    ) -> None:
+        if engine not in HTML_ENGINES:
+            raise ValueError(f"unknown engine {engine!r}, expected one of {HTML_ENGINES}")
+        if mode not in HTML_CONVERT_MODES:
+            raise ValueError(f"unknown mode {mode!r}, expected one of {HTML_CONVERT_MODES}")
+        if engine == "events":
+            if parser not in ("html.parser", "auto"):
+                raise ValueError(f"the events engine only supports html.parser, not {parser!r}")
+            parser = "html.parser"
+        _import_bs4()
         self.domain = domain or ""
-        self.handlers = {
-            "details": self._handle_details,
-            "font": self._handle_font,
-            "span": self._handle_span,
-            "div": self._handle_div,
-            "sup": lambda tag: self._wrap_simple(tag, "SUP"),
-            "sub": lambda tag: self._wrap_simple(tag, "SUB"),
-            "b": lambda tag: self._wrap_simple(tag, "B"),
-            "strong": lambda tag: self._wrap_simple(tag, "B"),
-            "i": lambda tag: self._wrap_simple(tag, "I"),
-            "em": lambda tag: self._wrap_simple(tag, "I"),
-            "u": lambda tag: self._wrap_simple(tag, "U"),
-            "s": lambda tag: self._wrap_simple(tag, "S"),
-            "del": lambda tag: self._wrap_simple(tag, "S"),
-            "strike": lambda tag: self._wrap_simple(tag, "S"),
-            "ins": lambda tag: self._wrap_simple(tag, "U"),
-            "mark": lambda tag: self._wrap_simple(tag, "MARK"),
-            "kbd": self._handle_kbd,
-            "br": lambda tag: "\n",
-            "hr": lambda tag: "[HR][/HR]\n",
-            "a": self._handle_link,
-            "img": self._handle_image,
-            "p": self._handle_paragraph,
-            "blockquote": self._handle_blockquote,
-            "pre": self._handle_pre,
-            "code": self._handle_code,
-            "ul": lambda tag: self._handle_list(tag, ordered=False),
-            "ol": lambda tag: self._handle_list(tag, ordered=True),
-            "li": self._handle_list_item,
-            "table": self._handle_table,
-            "thead": self._handle_passthrough_children,
-            "tbody": self._handle_passthrough_children,
-            "tfoot": self._handle_passthrough_children,
-            "tr": self._handle_table_row,
-            "th": lambda tag: self._handle_table_cell(tag, head=True),
-            "td": lambda tag: self._handle_table_cell(tag, head=False),
-            "abbr": self._handle_abbr,
-        }
-
-    def convert(self, html: str) -> str:
+        self.islands = islands
+        self.engine = engine
+        self.parser = resolve_html_parser(parser)
+        self.plain_scanner = PlainTagScanner(plain_tags) if plain_tags is not None else None
+        self.mode = mode
+        self._events = None
+        # The class tables bound to this converter, so a handler can be replaced per
+        # instance; every mode calls a replaced handler as is.
+        self.handlers = {name: MethodType(handler, self) for name, handler in self._HANDLERS.items()}
+
+    def convert(self, html: str, profile: Optional[ConversionProfile] = None) -> str:
+        if profile is not None:
+            return self._convert_profiled(html, profile)
         # Avoid parsing HTML inside BBCode plain-ish tags like [ICODE]...[/ICODE].
-        stashed, tokens = _stash_bbcode_plain_items(html)
-        soup = BeautifulSoup(stashed, "html.parser")
-        root = soup.body or soup
-        converted = self._convert_children(root)
+        stashed, tokens = _stash_bbcode_plain_items(html, self.plain_scanner)
+        islands = find_html_islands(stashed) if self._use_islands() else None
+        if islands is None:
+            converted = self._convert_document(stashed)
+        else:
+            converted = self._convert_islands(stashed, islands)
         return _restore_tokens(converted, tokens)
 
+    def _convert_document(self, html: str) -> str:
+        if self.engine == "events":
+            return self._event_converter().convert(html)
+        soup = BeautifulSoup(html, self.parser)
+        return self._convert_children(soup.body or soup)
+
+    def _use_islands(self) -> bool:
+        return self.islands and self.parser == "html.parser"
+
+    def _event_converter(self):
+        if self._events is None:
+            from md2bbcode.html_events import HtmlEventConverter
+
+            self._events = HtmlEventConverter(self)
+        return self._events
+
+    def _convert_islands(self, html: str, islands: List[Tuple[int, int]]) -> str:
+        parts = []
+        position = 0
+        for start, end in islands:
+            parts.append(html[position:start])
+            parts.append(self._convert_document(html[start:end]))
+            position = end
+        parts.append(html[position:])
+        return "".join(parts)
+
+    def _convert_profiled(self, html: str, profile: ConversionProfile) -> str:
+        import time
+
+        from md2bbcode.profiling import StageStats
+
+        with profile.stage("stash", len(html)) as stage:
+            stashed, tokens = _stash_bbcode_plain_items(html, self.plain_scanner)
+            stage.output_size, stage.count, stage.unit = len(stashed), len(tokens), "stashed"
+        islands = None
+        if self._use_islands():
+            with profile.stage("find_islands", len(stashed)) as stage:
+                islands = find_html_islands(stashed)
+                if islands is not None:
+                    stage.output_size = sum(end - start for start, end in islands)
+                    stage.count, stage.unit = len(islands), "islands"
+        if islands is None:
+            islands = [(0, len(stashed))]
+
+        # Soup building and conversion are timed separately and summed over the islands.
+        build_seconds = convert_seconds = 0.0
+        parsed_size = nodes = 0
+        parts = []
+        position = 0
+        for island_start, island_end in islands:
+            parts.append(stashed[position:island_start])
+            fragment = stashed[island_start:island_end]
+            parsed_size += len(fragment)
+            position = island_end
+            if self.engine == "events":
+                # Parsing and conversion happen together, with no tree to count.
+                start = time.perf_counter()
+                parts.append(self._convert_document(fragment))
+                convert_seconds += time.perf_counter() - start
+                continue
+            start = time.perf_counter()
+            soup = BeautifulSoup(fragment, self.parser)
+            root = soup.body or soup
+            middle = time.perf_counter()
+            parts.append(self._convert_children(root))
+            convert_seconds += time.perf_counter() - middle
+            build_seconds += middle - start
+            # Counting nodes walks the tree, so it stays outside the timed sections.
+            nodes += sum(1 for _ in root.descendants)
+        parts.append(stashed[position:])
+        converted = "".join(parts)
+        if self.engine == "events":
+            profile.add(StageStats("html_events", convert_seconds, parsed_size, len(converted)))
+        else:
+            profile.add(StageStats("soup_build", build_seconds, parsed_size, None, nodes, "nodes"))
+            profile.add(StageStats("html_convert", convert_seconds, None, len(converted)))
+        with profile.stage("restore", len(converted)) as stage:
+            restored = _restore_tokens(converted, tokens)
+            stage.output_size = len(restored)
+        return restored
+
     def _convert_children(self, tag: Tag) -> str:
-        return "".join(self._convert_node(child) for child in tag.contents)
+        if self.mode == "recursive":
+            return "".join(self._convert_node(child) for child in tag.contents)
+        out: List[str] = []
+        if self.mode == "iterative":
+            self._convert_iterative(tag, out)
+        else:
+            self._convert_into(tag, out)
+        return "".join(out)
+
+    def _convert_iterative(self, tag: Tag, out: List[str]) -> None:
+        # Iterative mode: the same output as _convert_into, walking the tree with an
+        # explicit stack. Each entry is (children iterator, closing BBCode, details):
+        # details is set while a <details> element's summary is being converted, as
+        # (details tag, summary tag, index of the summary's first part in out).
+        handlers = self.handlers
+        default_handlers = self._HANDLERS
+        buffered_wraps = self._BUFFERED_WRAPS
+        append = out.append
+        claims = None
+        stack = [(iter(tag.contents), "", None)]
+        while stack:
+            for child in stack[-1][0]:
+                if not isinstance(child, Tag):
+                    if not isinstance(child, Comment) and isinstance(child, NavigableString):
+                        append(str(child))
+                    continue
+                name = child.name.lower()
+                handler = handlers.get(name)
+                if handler is None:
+                    append(str(child))
+                    continue
+                wrap = buffered_wraps.get(name)
+                if wrap is not None and getattr(handler, "__func__", None) is default_handlers[name]:
+                    pair = wrap(self, child)
+                    if pair is not None:
+                        append(pair[0])
+                        stack.append((iter(child.contents), pair[1], None))
+                        break
+                elif name == "details" and handler == self._handle_details:
+                    if claims is None:
+                        claims = self._summary_claims(tag)
+                    summary = claims.get(id(child))
+                    if summary is not None:
+                        stack.append((iter(summary.contents), "", (child, summary, len(out))))
+                    else:
+                        append("[SPOILER]")
+                        stack.append((iter(child.contents), "[/SPOILER]", None))
+                    break
+                append(handler(child))
+            else:
+                _, closing, details = stack.pop()
+                if details is None:
+                    append(closing)
+                    continue
+                # The summary is done: take it back out as the title, then convert the
+                # rest of the <details> element.
+                details_tag, summary, mark = details
+                spoiler_title = "".join(out[mark:]).strip()
+                del out[mark:]
+                summary.decompose()
+                append(f"[SPOILER={spoiler_title}]" if spoiler_title else "[SPOILER]")
+                stack.append((iter(details_tag.contents), "[/SPOILER]", None))
+
+    def _convert_into(self, tag: Tag, out: List[str]) -> None:
+        # Buffered mode: append the BBCode for tag's children to out.
+        handlers = self.handlers
+        default_handlers = self._HANDLERS
+        buffered_wraps = self._BUFFERED_WRAPS
+        append = out.append
+        for child in tag.contents:
+            if not isinstance(child, Tag):
+                if not isinstance(child, Comment) and isinstance(child, NavigableString):
+                    append(str(child))
+                continue
+            name = child.name.lower()
+            handler = handlers.get(name)
+            if handler is None:
+                append(str(child))
+                continue
+            wrap = buffered_wraps.get(name)
+            if wrap is not None and getattr(handler, "__func__", None) is default_handlers[name]:
+                pair = wrap(self, child)
+                if pair is not None:
+                    append(pair[0])
+                    self._convert_into(child, out)
+                    append(pair[1])
+                    continue
+            elif name == "details" and handler == self._handle_details:
+                self._details_into(child, out)
+                continue
+            append(handler(child))
+
+    @staticmethod
+    def _summary_claims(root: Tag) -> Dict[int, Tag]:
+        # The <summary> that tag.find("summary") gives each <details> under root when
+        # they are converted outermost first, found in one pass rather than one search
+        # per element: each summary goes to the outermost open details without one.
+        # A claimed summary is removed before the details around it are converted, so
+        # within it only details opened inside it can claim. Stack entries are
+        # (children iterator, kind), kind being "details", the claim count to restore
+        # after a claimed summary, or None.
+        claims: Dict[int, Tag] = {}
+        open_details: List[Tag] = []
+        claimed = 0
+        stack: List[Tuple[object, object]] = [(iter(root.contents), None)]
+        while stack:
+            for child in stack[-1][0]:
+                if isinstance(child, Tag):
+                    kind = None
+                    if child.name == "summary" and claimed < len(open_details):
+                        claims[id(open_details[claimed])] = child
+                        kind = claimed + 1
+                        claimed = len(open_details)
+                    elif child.name == "details":
+                        open_details.append(child)
+                        kind = "details"
+                    stack.append((iter(child.contents), kind))
+                    break
+            else:
+                kind = stack.pop()[1]
+                if kind == "details":
+                    open_details.pop()
+                    claimed = min(claimed, len(open_details))
+                elif kind is not None:
+                    claimed = kind
+        return claims
+
+    def _details_into(self, tag: Tag, out: List[str]) -> None:
+        summary = tag.find("summary")
+        spoiler_title = ""
+        if summary:
+            # Convert the summary in place, then take it back out as the title.
+            mark = len(out)
+            self._convert_into(summary, out)
+            spoiler_title = "".join(out[mark:]).strip()
+            del out[mark:]
+            summary.decompose()
+        out.append(f"[SPOILER={spoiler_title}]" if spoiler_title else "[SPOILER]")
+        self._convert_into(tag, out)
+        out.append("[/SPOILER]")
 
     def _convert_node(self, node) -> str:
         if isinstance(node, Comment):
@@ -161,83 +778,47 @@ class HtmlToBbCodeConverter:
             return str(node)
         return ""
 
-    def _wrap(self, content: str, wrappers: List[Tuple[str, Optional[str]]]) -> str:
-        for tag, value in reversed(wrappers):
-            if value is None:
-                content = f"[{tag}]{content}[/{tag}]"
-            else:
-                content = f"[{tag}={value}]{content}[/{tag}]"
-        return content
-
-    def _wrap_simple(self, tag: Tag, bbcode_tag: str) -> str:
-        content = self._convert_children(tag)
-        content = f"[{bbcode_tag}]{content}[/{bbcode_tag}]"
-        return self._apply_style_wrappers(tag, content, skip_tags={bbcode_tag})
-
-    def _parse_style(self, style: str) -> Dict[str, str]:
-        css_properties: Dict[str, str] = {}
-        for item in style.split(";"):
-            if ":" not in item:
-                continue
-            key, value = item.split(":", 1)
-            key = key.strip().lower()
-            value = value.strip()
-            if key:
-                css_properties[key] = value
-        return css_properties
+    def _wrap_simple(self, tag: Tag, bbcode_tag: str) -> Tuple[str, str]:
+        opening, closing = self._style_pair(tag, skip_tags={bbcode_tag})
+        return f"{opening}[{bbcode_tag}]", f"[/{bbcode_tag}]{closing}"
 
     def _style_wrappers(
         self,
         tag: Tag,
         skip_tags: Optional[Set[str]] = None,
         skip_props: Optional[Set[str]] = None,
-    ) -> List[Tuple[str, Optional[str]]]:
+    ) -> Tuple[Tuple[str, Optional[str]], ...]:
         style = tag.attrs.get("style", "")
         if not style:
-            return []
-        css_properties = self._parse_style(style)
-        wrappers: List[Tuple[str, Optional[str]]] = []
-        skip_tags = {t.upper() for t in (skip_tags or set())}
-        skip_props = set(skip_props or set())
+            return ()
+        return resolve_style(style, skip_tags, skip_props).wrappers
 
-        if "color" in css_properties and "color" not in skip_props:
-            color = _sanitize_color(css_properties["color"])
-            if color:
-                wrappers.append(("COLOR", color))
-        if "font-size" in css_properties and "size" not in skip_props:
-            size = _sanitize_size(css_properties["font-size"])
-            if size:
-                wrappers.append(("SIZE", size))
-        if "font-family" in css_properties and "font" not in skip_props:
-            face = _sanitize_font(css_properties["font-family"])
-            if face:
-                wrappers.append(("FONT", face))
-        if "text-decoration" in css_properties:
-            decoration = css_properties["text-decoration"].lower()
-            if "line-through" in decoration and "S" not in skip_tags:
-                wrappers.append(("S", None))
-            if "underline" in decoration and "U" not in skip_tags:
-                wrappers.append(("U", None))
-        if "font-weight" in css_properties and "B" not in skip_tags:
-            weight = css_properties["font-weight"].lower()
-            if weight == "bold" or (weight.isdigit() and int(weight) >= 700):
-                wrappers.append(("B", None))
-        if "font-style" in css_properties and "I" not in skip_tags:
-            style_val = css_properties["font-style"].lower()
-            if style_val in {"italic", "oblique"}:
-                wrappers.append(("I", None))
-
-        return wrappers
-
-    def _apply_style_wrappers(
+    def _style_pair(
         self,
         tag: Tag,
-        content: str,
         skip_tags: Optional[Set[str]] = None,
         skip_props: Optional[Set[str]] = None,
-    ) -> str:
+    ) -> Tuple[str, str]:
         wrappers = self._style_wrappers(tag, skip_tags=skip_tags, skip_props=skip_props)
-        return self._wrap(content, wrappers) if wrappers else content
+        return _wrapper_pair(wrappers) if wrappers else _EMPTY_PAIR
+
+    def _wrap_block(self, tag: Tag) -> Tuple[str, str]:
+        # Style wrappers inside the alignment, as for div, p, blockquote and cells.
+        style_open, style_close = self._style_pair(tag)
+        align_open, align_close = _ALIGNMENT_PAIRS.get(self._extract_alignment(tag), _EMPTY_PAIR)
+        return align_open + style_open, style_close + align_close
+
+    def _is_passthrough(self, tag: Tag) -> bool:
+        # Elements with a handler that are still written back out as HTML because
+        # the attribute they convert from is missing.
+        name = tag.name
+        if name == "a":
+            return not (tag.attrs.get("href") or tag.attrs.get("name") or tag.attrs.get("id"))
+        if name == "img":
+            return not tag.attrs.get("src")
+        if name == "abbr":
+            return not tag.attrs.get("title")
+        return False
 
     def _handle_details(self, tag: Tag) -> str:
         summary = tag.find("summary")
@@ -245,106 +826,107 @@ class HtmlToBbCodeConverter:
         if summary:
             spoiler_title = self._convert_children(summary).strip()
             summary.decompose()
-        content = self._convert_children(tag)
+        return self._finish_details(spoiler_title, self._convert_children(tag))
+
+    def _finish_details(self, spoiler_title: str, content: str) -> str:
         if spoiler_title:
             return f"[SPOILER={spoiler_title}]{content}[/SPOILER]"
         return f"[SPOILER]{content}[/SPOILER]"
 
-    def _handle_font(self, tag: Tag) -> str:
+    def _wrap_font(self, tag: Tag) -> Tuple[str, str]:
         wrappers: List[Tuple[str, Optional[str]]] = []
         skip_props: Set[str] = set()
         if "color" in tag.attrs:
-            color = _sanitize_color(tag["color"])
+            color = _sanitize_color(tag.attrs["color"])
             if color:
                 wrappers.append(("COLOR", color))
                 skip_props.add("color")
         if "size" in tag.attrs:
-            size = _sanitize_size(tag["size"])
+            size = _sanitize_size(tag.attrs["size"])
             if size:
                 wrappers.append(("SIZE", size))
                 skip_props.add("size")
         if "face" in tag.attrs:
-            face = _sanitize_font(tag["face"])
+            face = _sanitize_font(tag.attrs["face"])
             if face:
                 wrappers.append(("FONT", face))
                 skip_props.add("font")
 
-        content = self._convert_children(tag)
         wrappers.extend(self._style_wrappers(tag, skip_props=skip_props))
-        return self._wrap(content, wrappers) if wrappers else content
-
-    def _handle_span(self, tag: Tag) -> str:
-        content = self._convert_children(tag)
-        if tag.attrs.get("style"):
-            content = self._apply_style_wrappers(tag, content)
-        return content
-
-    def _handle_div(self, tag: Tag) -> str:
-        content = self._convert_children(tag)
-        content = self._apply_style_wrappers(tag, content)
-        align = self._extract_alignment(tag)
-        if align:
-            content = self._wrap_alignment(content, align)
-        return content
+        return _wrapper_pair(tuple(wrappers)) if wrappers else _EMPTY_PAIR
+
+    def _wrap_span(self, tag: Tag) -> Tuple[str, str]:
+        return self._style_pair(tag)
 
     def _handle_kbd(self, tag: Tag) -> str:
-        content = tag.get_text()
+        return self._finish_icode(tag.get_text())
+
+    def _finish_icode(self, content: str) -> str:
         return f"[ICODE]{content}[/ICODE]"
 
     def _handle_link(self, tag: Tag) -> str:
+        if self._is_passthrough(tag):
+            return str(tag)
+        email = self._link_email(tag)
+        if email:
+            return f"[EMAIL]{email}[/EMAIL]"
+        return self._finish_link(tag, self._convert_children(tag))
+
+    def _buffered_link_wrap(self, tag: Tag) -> Optional[Tuple[str, str]]:
+        if self._is_passthrough(tag) or self._link_email(tag):
+            return None
+        return self._wrap_link(tag)
+
+    def _link_email(self, tag: Tag) -> Optional[str]:
+        # The address of a mailto: link; its text is dropped in favour of [EMAIL].
+        href = (tag.attrs.get("href") or "").strip()
+        if not href.lower().startswith("mailto:"):
+            return None
+        email = href[7:].strip()
+        if "?" in email:
+            email = email.split("?", 1)[0]
+        return email or None
+
+    def _finish_link(self, tag: Tag, text: str) -> str:
+        opening, closing = self._wrap_link(tag)
+        return opening + text + closing
+
+    def _wrap_link(self, tag: Tag) -> Tuple[str, str]:
         href = tag.attrs.get("href")
-        name = tag.attrs.get("name") or tag.attrs.get("id")
         if href:
             href = href.strip()
-            if href.lower().startswith("mailto:"):
-                email = href[7:].strip()
-                if "?" in email:
-                    email = email.split("?", 1)[0]
-                if email:
-                    return f"[EMAIL]{email}[/EMAIL]"
-            text = self._convert_children(tag)
             if href.startswith("#"):
                 anchor = href[1:]
                 if anchor:
-                    return f"[JUMPTO={anchor}]{text}[/JUMPTO]"
-            return f"[URL={_safe_url(href, self.domain)}]{text}[/URL]"
-        if name:
-            text = self._convert_children(tag)
-            return f"[ANAME={name}]{text}[/ANAME]"
-        return str(tag)
+                    return f"[JUMPTO={anchor}]", "[/JUMPTO]"
+            return f"[URL={resolve_url(href, self.domain)}]", "[/URL]"
+        name = tag.attrs.get("name") or tag.attrs.get("id")
+        return f"[ANAME={name}]", "[/ANAME]"
 
     def _handle_image(self, tag: Tag) -> str:
         src = tag.attrs.get("src")
         if not src:
             return str(tag)
         alt = tag.attrs.get("alt", "")
-        safe_src = _safe_url(src, self.domain)
-        rewritten_url = rewrite_svg_url(safe_src)
+        safe_src = resolve_url(src, self.domain)
+        rewritten_url = image_url(safe_src)
         if rewritten_url is None:
             link_text = alt or safe_src
             return f"[URL={safe_src}]{link_text}[/URL]"
         alt_text = f' alt="{alt}"' if alt else ""
         return f"[IMG{alt_text}]{rewritten_url}[/IMG]"
 
-    def _handle_paragraph(self, tag: Tag) -> str:
-        content = self._convert_children(tag)
-        content = self._apply_style_wrappers(tag, content)
-        align = self._extract_alignment(tag)
-        if align:
-            content = self._wrap_alignment(content, align)
-        return f"{content}\n\n"
+    def _wrap_paragraph(self, tag: Tag) -> Tuple[str, str]:
+        opening, closing = self._wrap_block(tag)
+        return opening, closing + "\n\n"
 
-    def _handle_blockquote(self, tag: Tag) -> str:
-        content = self._convert_children(tag)
-        content = self._apply_style_wrappers(tag, content)
-        align = self._extract_alignment(tag)
-        if align:
-            content = self._wrap_alignment(content, align)
+    def _wrap_blockquote(self, tag: Tag) -> Tuple[str, str]:
+        opening, closing = self._wrap_block(tag)
         attribution = self._extract_blockquote_attribution(tag)
         if attribution:
             attribution = attribution.replace('"', "'")
-            return f'[QUOTE="{attribution}"]\n{content}[/QUOTE]\n'
-        return f"[QUOTE]\n{content}[/QUOTE]\n"
+            return f'[QUOTE="{attribution}"]\n{opening}', f"{closing}[/QUOTE]\n"
+        return f"[QUOTE]\n{opening}", f"{closing}[/QUOTE]\n"
 
     def _extract_code_language(self, tag: Tag) -> Optional[str]:
         classes = tag.attrs.get("class", [])
@@ -365,7 +947,9 @@ class HtmlToBbCodeConverter:
         else:
             lang = self._extract_code_language(tag)
             code_text = tag.get_text()
+        return self._finish_pre(lang, code_text)
 
+    def _finish_pre(self, lang: Optional[str], code_text: str) -> str:
         if lang:
             return f"[CODE={lang}]{code_text}[/CODE]\n"
         return f"[CODE]{code_text}[/CODE]\n"
@@ -373,28 +957,7 @@ class HtmlToBbCodeConverter:
     def _handle_code(self, tag: Tag) -> str:
         if tag.parent and isinstance(tag.parent, Tag) and tag.parent.name.lower() == "pre":
             return ""
-        content = tag.get_text()
-        return f"[ICODE]{content}[/ICODE]"
-
-    def _handle_list(self, tag: Tag, ordered: bool) -> str:
-        content = self._convert_children(tag)
-        list_tag = "LIST=1" if ordered else "LIST"
-        return f"[{list_tag}]{content}[/LIST]\n"
-
-    def _handle_list_item(self, tag: Tag) -> str:
-        content = self._convert_children(tag)
-        return f"[*]{content}\n"
-
-    def _handle_table(self, tag: Tag) -> str:
-        content = self._convert_children(tag)
-        return f"[TABLE]\n{content}[/TABLE]\n"
-
-    def _handle_passthrough_children(self, tag: Tag) -> str:
-        return self._convert_children(tag)
-
-    def _handle_table_row(self, tag: Tag) -> str:
-        content = self._convert_children(tag)
-        return f"[TR]\n{content}[/TR]\n"
+        return self._finish_icode(tag.get_text())
 
     def _extract_alignment(self, tag: Tag) -> Optional[str]:
         align = tag.attrs.get("align")
@@ -403,19 +966,7 @@ class HtmlToBbCodeConverter:
         style = tag.attrs.get("style", "")
         if not style:
             return None
-        css = self._parse_style(style)
-        if "text-align" in css:
-            return css["text-align"].strip().lower()
-        return None
-
-    def _wrap_alignment(self, content: str, align: str) -> str:
-        if align == "center":
-            return f"[CENTER]{content}[/CENTER]"
-        if align == "right":
-            return f"[RIGHT]{content}[/RIGHT]"
-        if align == "left":
-            return f"[LEFT]{content}[/LEFT]"
-        return content
+        return resolve_style(style).alignment
 
     def _extract_blockquote_attribution(self, tag: Tag) -> Optional[str]:
         for key in (
@@ -433,34 +984,128 @@ class HtmlToBbCodeConverter:
                     return value
         return None
 
-    def _handle_table_cell(self, tag: Tag, head: bool) -> str:
+    def _wrap_table_cell(self, tag: Tag, head: bool) -> Tuple[str, str]:
         tag_name = "TH" if head else "TD"
-        content = self._convert_children(tag)
-        content = self._apply_style_wrappers(tag, content)
-        align = self._extract_alignment(tag)
-        if align == "center":
-            content = f"[CENTER]{content}[/CENTER]"
-        elif align == "right":
-            content = f"[RIGHT]{content}[/RIGHT]"
-        elif align == "left":
-            content = f"[LEFT]{content}[/LEFT]"
-        return f"[{tag_name}]{content}[/{tag_name}]\n"
+        opening, closing = self._wrap_block(tag)
+        return f"[{tag_name}]{opening}", f"{closing}[/{tag_name}]\n"
 
     def _handle_abbr(self, tag: Tag) -> str:
-        title = tag.attrs.get("title")
-        if not title:
+        if self._is_passthrough(tag):
             return str(tag)
-        content = self._convert_children(tag)
-        return f"[ABBR={title}]{content}[/ABBR]"
-
+        return self._finish_abbr(tag, self._convert_children(tag))
 
-def html_to_bbcode(html: str, domain: Optional[str] = None) -> str:
-    converter = HtmlToBbCodeConverter(domain=domain)
-    return converter.convert(html)
+    def _finish_abbr(self, tag: Tag, content: str) -> str:
+        return f"[ABBR={tag.attrs['title']}]{content}[/ABBR]"
 
-
-def process_html(input_html: str, debug: bool = False, output_file: Optional[str] = None, domain: Optional[str] = None) -> str:
-    converted_bbcode = html_to_bbcode(input_html, domain=domain)
+    def _buffered_abbr_wrap(self, tag: Tag) -> Optional[Tuple[str, str]]:
+        if self._is_passthrough(tag):
+            return None
+        return f"[ABBR={tag.attrs['title']}]", "[/ABBR]"
+
+    # Dispatch tables shared by every instance and built once with the class; each
+    # entry is a plain function taking the converter first.
+    #
+    # Elements whose BBCode is their converted children between an opening and a
+    # closing part that only depend on the element's attributes. Both engines share
+    # these; buffered and iterative modes write the parts around the children.
+    _WRAPS = {
+        "font": _wrap_font,
+        "span": _wrap_span,
+        "div": _wrap_block,
+        "sup": _simple_wrap("SUP"),
+        "sub": _simple_wrap("SUB"),
+        "b": _simple_wrap("B"),
+        "strong": _simple_wrap("B"),
+        "i": _simple_wrap("I"),
+        "em": _simple_wrap("I"),
+        "u": _simple_wrap("U"),
+        "s": _simple_wrap("S"),
+        "del": _simple_wrap("S"),
+        "strike": _simple_wrap("S"),
+        "ins": _simple_wrap("U"),
+        "mark": _simple_wrap("MARK"),
+        "p": _wrap_paragraph,
+        "blockquote": _wrap_blockquote,
+        "ul": lambda self, tag: ("[LIST]", "[/LIST]\n"),
+        "ol": lambda self, tag: ("[LIST=1]", "[/LIST]\n"),
+        "li": lambda self, tag: ("[*]", "\n"),
+        "table": lambda self, tag: ("[TABLE]\n", "[/TABLE]\n"),
+        "thead": lambda self, tag: _EMPTY_PAIR,
+        "tbody": lambda self, tag: _EMPTY_PAIR,
+        "tfoot": lambda self, tag: _EMPTY_PAIR,
+        "tr": lambda self, tag: ("[TR]\n", "[/TR]\n"),
+        "th": lambda self, tag: self._wrap_table_cell(tag, head=True),
+        "td": lambda self, tag: self._wrap_table_cell(tag, head=False),
+    }
+    _HANDLERS = {name: _children_handler(wrap) for name, wrap in _WRAPS.items()}
+    _HANDLERS.update({
+        "details": _handle_details,
+        "kbd": _handle_kbd,
+        "br": lambda self, tag: "\n",
+        "hr": lambda self, tag: "[HR][/HR]\n",
+        "a": _handle_link,
+        "img": _handle_image,
+        "pre": _handle_pre,
+        "code": _handle_code,
+        "abbr": _handle_abbr,
+    })
+    # Buffered and iterative modes write these elements' parts around their children
+    # while the handler is still the default one; a wrap returning None defers to it.
+    _BUFFERED_WRAPS = dict(_WRAPS, a=_buffered_link_wrap, abbr=_buffered_abbr_wrap)
+
+
+# html_to_bbcode() reuses a converter per option set. The events engine keeps parser
+# state on its converter, so each thread has its own, least recently used dropped first.
+DEFAULT_CONVERTER_LIMIT = 16
+_default_converters = threading.local()
+
+
+def get_default_html_converter(
+    domain: Optional[str] = None,
+    engine: str = "soup",
+    parser: str = "html.parser",
+    plain_tags: Optional[Sequence[str]] = None,
+    mode: str = "recursive",
+) -> HtmlToBbCodeConverter:
+    """Return this thread's shared HtmlToBbCodeConverter for these options, creating it once."""
+    converters = getattr(_default_converters, "converters", None)
+    if converters is None:
+        converters = _default_converters.converters = OrderedDict()
+    key = (domain or "", engine, parser, tuple(plain_tags) if plain_tags is not None else None, mode)
+    converter = converters.get(key)
+    if converter is None:
+        converter = HtmlToBbCodeConverter(domain=domain, engine=engine, parser=parser, plain_tags=plain_tags, mode=mode)
+        converters[key] = converter
+        if len(converters) > DEFAULT_CONVERTER_LIMIT:
+            converters.popitem(last=False)
+    else:
+        converters.move_to_end(key)
+    return converter
+
+
+def html_to_bbcode(
+    html: str,
+    domain: Optional[str] = None,
+    profile: Optional[ConversionProfile] = None,
+    engine: str = "soup",
+    parser: str = "html.parser",
+    plain_tags: Optional[Sequence[str]] = None,
+    mode: str = "recursive",
+) -> str:
+    converter = get_default_html_converter(domain=domain, engine=engine, parser=parser, plain_tags=plain_tags, mode=mode)
+    return converter.convert(html, profile=profile)
+
+
+def process_html(
+    input_html: str,
+    debug: bool = False,
+    output_file: Optional[str] = None,
+    domain: Optional[str] = None,
+    profile: Optional[ConversionProfile] = None,
+    engine: str = "soup",
+    parser: str = "html.parser",
+) -> str:
+    converted_bbcode = html_to_bbcode(input_html, domain=domain, profile=profile, engine=engine, parser=parser)
 
     if debug:
         if output_file is None:
@@ -496,6 +1141,9 @@ def main(argv=None) -> None:
     parser.add_argument("input_file", type=str, help="Input HTML file path")
     parser.add_argument("-o", "--output", help='Output BBCode file path (UTF-8). Recommended on Windows instead of shell redirection. Use "-" or omit for stdout.')
     parser.add_argument("--debug", action="store_true", help="Save output to readme.finalpass for debugging")
+    parser.add_argument("--profile", action="store_true", help="Print a per-stage timing breakdown to stderr")
+    parser.add_argument("--engine", choices=HTML_ENGINES, default="soup", help='HTML engine: "soup" builds a BeautifulSoup tree, "events" converts from parser events without one')
+    parser.add_argument("--parser", choices=("auto",) + HTML_PARSERS, default="html.parser", help='BeautifulSoup tree builder for the soup engine; "auto" uses lxml when it is installed')
 
     args = parser.parse_args(argv)
     input_file = args.input_file
@@ -504,7 +1152,14 @@ def main(argv=None) -> None:
     with open(input_file, "r", encoding="utf-8") as file:
         html_content = file.read()
 
-    converted_bbcode = process_html(html_content, debug=args.debug, output_file=output_file)
+    profile = None
+    if args.profile:
+        from md2bbcode.profiling import ConversionProfile
+
+        profile = ConversionProfile()
+    converted_bbcode = process_html(html_content, debug=args.debug, output_file=output_file, profile=profile, engine=args.engine, parser=args.parser)
+    if profile is not None:
+        print(profile.report(), file=sys.stderr)
 
     # Always emit the final BBCode to -o/stdout (debug mode also writes readme.finalpass).
     output_path = args.output if args.output and args.output != "-" else None
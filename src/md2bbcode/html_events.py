@@ -0,0 +1,391 @@
+# converts HTML to BBCode straight from html.parser events, keeping only a stack of
+# open elements instead of building a BeautifulSoup tree.
+#
+# The output matches HtmlToBbCodeConverter's "soup" engine: the tree BeautifulSoup's
+# html.parser builder would make is tracked implicitly (end tags pop to the most recent
+# open element of that name, whitespace-only strings collapse outside <pre>, entities
+# decode the same way) and elements without a handler are serialized the way str(tag)
+# would print them.
+from __future__ import annotations
+
+import re
+from html.parser import HTMLParser
+from typing import TYPE_CHECKING, Dict, List, Optional
+
+if TYPE_CHECKING:
+    from md2bbcode.html2bbcode import HtmlToBbCodeConverter
+
+# How an element's content is handled.
+_CONVERT = 0  # children converted to BBCode, then the element's finisher applied
+_TEXT = 1  # only text collected, like Tag.get_text() (kbd, code, pre)
+_RAW = 2  # serialized back to HTML, like str(tag)
+_DROP = 3  # content discarded (a mailto: link becomes [EMAIL])
+
+# String kinds, after BeautifulSoup's NavigableString subclasses.
+_COMMENT = "comment"
+_CDATA = "cdata"
+_PI = "pi"
+_DECLARATION = "declaration"
+_DOCTYPE = "doctype"
+_RAW_AFFIXES = {
+    _COMMENT: ("<!--", "-->"),
+    _CDATA: ("<![CDATA[", "]]>"),
+    _PI: ("<?", ">"),
+    _DECLARATION: ("<?", "?>"),
+    _DOCTYPE: ("<!DOCTYPE ", ">\n"),
+}
+
+# Mirrors bs4's HTMLTreeBuilder defaults.
+_VOID_TAGS = frozenset({
+    "area", "base", "basefont", "bgsound", "br", "col", "command", "embed", "frame", "hr", "image",
+    "img", "input", "isindex", "keygen", "link", "menuitem", "meta", "nextid", "param", "source",
+    "spacer", "track", "wbr",
+})
+_PRESERVE_WHITESPACE_TAGS = frozenset({"pre", "textarea"})
+# Text inside these isn't NavigableString, so get_text() skips it.
+_STRING_CONTAINER_TAGS = frozenset({"rt", "rp", "style", "script", "template"})
+# Text directly inside these is serialized without escaping.
+_CDATA_CONTAINING_TAGS = frozenset({"script", "style"})
+_UNIVERSAL_LIST_ATTRIBUTES = frozenset({"class", "accesskey", "dropzone"})
+_LIST_ATTRIBUTES = {
+    "a": frozenset({"rel", "rev"}),
+    "link": frozenset({"rel", "rev"}),
+    "td": frozenset({"headers"}),
+    "th": frozenset({"headers"}),
+    "form": frozenset({"accept-charset"}),
+    "object": frozenset({"archive"}),
+    "area": frozenset({"rel"}),
+    "icon": frozenset({"sizes"}),
+    "iframe": frozenset({"sandbox"}),
+    "output": frozenset({"for"}),
+}
+_NON_WHITESPACE_RE = re.compile(r"\S+")
+_ASCII_SPACES = "\x20\x0a\x09\x0c\x0d"
+_META_CHARSET_RE = re.compile(r"((^|;)\s*charset=)([^;]*)", re.M)
+_DECIMAL_REFERENCE_RE = re.compile("^([0-9]+)(.*)")
+_HEX_REFERENCE_RE = re.compile("^([0-9a-f]+)(.*)")
+
+
+def _escape(text: str) -> str:
+    return text.replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;")
+
+
+def _quote_attribute(value: str) -> str:
+    if '"' in value:
+        if "'" in value:
+            return '"' + value.replace('"', "&quot;") + '"'
+        return "'" + value + "'"
+    return '"' + value + '"'
+
+
+class _Element:
+    """An open element: enough of a bs4 Tag (name, attrs) for the shared finishers."""
+
+    __slots__ = ("name", "attrs", "mode", "parts", "finish", "title", "owner", "code", "language", "root")
+
+    def __init__(self, name: str, attrs: Dict[str, object], mode: int, parts: List[str]) -> None:
+        self.name = name
+        self.attrs = attrs
+        self.mode = mode
+        # Where this element's content goes; shared with the parent for raw and text content.
+        self.parts = parts
+        self.finish = None
+        # <details>: None until it claims a <summary>, then that summary's converted text.
+        self.title: Optional[str] = None
+        # A claimed <summary>: the <details> it titles.
+        self.owner: Optional[_Element] = None
+        # <pre>: text of its first <code>, and the language taken from that <code>.
+        self.code: Optional[List[str]] = None
+        self.language: Optional[str] = None
+        # The <pre>, <kbd> or <code> collecting text for this element.
+        self.root: Optional[_Element] = None
+
+
+class HtmlEventConverter(HTMLParser):
+    """
+    Converts one HTML document to BBCode with the handlers of an HtmlToBbCodeConverter,
+    from parser events. Use convert(); an instance can be reused for many documents.
+    """
+
+    def __init__(self, converter: HtmlToBbCodeConverter) -> None:
+        from bs4.dammit import EntitySubstitution, UnicodeDammit
+
+        super().__init__(convert_charrefs=False)
+        self.converter = converter
+        self._finishers = {name: self._pair_finisher(wrap) for name, wrap in converter._WRAPS.items()}
+        self._entities = EntitySubstitution.HTML_ENTITY_TO_CHARACTER
+        self._numeric_reference = UnicodeDammit.numeric_character_reference
+
+    def convert(self, html: str) -> str:
+        self.reset()
+        root = _Element("[document]", {}, _CONVERT, [])
+        self._stack: List[_Element] = [root]
+        self._open_counts: Dict[str, int] = {}
+        self._data: List[str] = []
+        self._preserve_whitespace = 0
+        self._string_containers = 0
+        self._already_closed: List[str] = []
+        # Converted <details> elements that are open, outermost first. Each <summary>
+        # goes to the outermost one without a title yet, so the first _claimed of them
+        # always have one. Inside a claimed summary, which the soup engine removes
+        # before converting the details elements around it, only details opened within
+        # it can claim: _claimed restarts there and is restored when the summary ends.
+        self._details: List[_Element] = []
+        self._claimed = 0
+        self._claim_frames: List[int] = []
+        self._body: Optional[_Element] = None
+        self._body_parts: List[str] = []
+
+        self.feed(html)
+        self.close()
+        self._end_data()
+        while len(self._stack) > 1:
+            self._pop()
+        # Like converting `soup.body or soup`.
+        parts = self._body_parts if self._body is not None else root.parts
+        return "".join(parts)
+
+    # html.parser events, translated the way bs4's BeautifulSoupHTMLParser does.
+
+    def handle_starttag(self, tag: str, attrs) -> None:
+        self._start(tag, attrs)
+        if tag in _VOID_TAGS:
+            self._end(tag)
+            self._already_closed.append(tag)
+
+    def handle_startendtag(self, tag: str, attrs) -> None:
+        self._start(tag, attrs)
+        self._end(tag)
+
+    def handle_endtag(self, tag: str) -> None:
+        if tag in self._already_closed:
+            self._already_closed.remove(tag)
+        else:
+            self._end(tag)
+
+    def handle_data(self, data: str) -> None:
+        self._data.append(data)
+
+    def handle_charref(self, name: str) -> None:
+        base, pattern = 10, _DECIMAL_REFERENCE_RE
+        if name.startswith(("x", "X")):
+            name, base, pattern = name[1:], 16, _HEX_REFERENCE_RE
+        extra = ""
+        try:
+            number: Optional[int] = int(name, base)
+        except ValueError:
+            match = pattern.search(name)
+            number = None
+            if match is not None:
+                number, extra = int(match.group(1), base), match.group(2)
+        if number is None:
+            self._data.append(name)
+            return
+        self._data.append(self._numeric_reference(number)[0])
+        self._data.append(extra)
+
+    def handle_entityref(self, name: str) -> None:
+        character = self._entities.get(name)
+        self._data.append(character if character is not None else "&" + name)
+
+    def handle_comment(self, data: str) -> None:
+        self._string(data, _COMMENT)
+
+    def handle_decl(self, decl: str) -> None:
+        self._string(decl[len("DOCTYPE "):], _DOCTYPE)
+
+    def unknown_decl(self, data: str) -> None:
+        if data.upper().startswith("CDATA["):
+            self._string(data[len("CDATA["):], _CDATA)
+        else:
+            self._string(data, _DECLARATION)
+
+    def handle_pi(self, data: str) -> None:
+        self._string(data, _PI)
+
+    # Tree tracking.
+
+    def _string(self, data: str, kind: str) -> None:
+        self._end_data()
+        self._data.append(data)
+        self._end_data(kind)
+
+    def _end_data(self, kind: Optional[str] = None) -> None:
+        if not self._data:
+            return
+        text = "".join(self._data)
+        self._data = []
+        if not self._preserve_whitespace and not text.strip(_ASCII_SPACES):
+            text = "\n" if "\n" in text else " "
+
+        element = self._stack[-1]
+        mode = element.mode
+        if mode == _CONVERT:
+            if kind != _COMMENT:
+                element.parts.append(text)
+        elif mode == _TEXT:
+            if kind == _CDATA or (kind is None and not self._string_containers):
+                element.parts.append(text)
+        elif mode == _RAW:
+            if kind is not None:
+                prefix, suffix = _RAW_AFFIXES[kind]
+                element.parts.append(prefix + text + suffix)
+            elif element.name in _CDATA_CONTAINING_TAGS:
+                element.parts.append(text)
+            else:
+                element.parts.append(_escape(text))
+
+    def _start(self, name: str, attr_list) -> None:
+        self._end_data()
+        attrs: Dict[str, object] = {}
+        for key, value in attr_list:
+            attrs[key] = "" if value is None else value
+        specific = _LIST_ATTRIBUTES.get(name)
+        for key, value in attrs.items():
+            if key in _UNIVERSAL_LIST_ATTRIBUTES or (specific is not None and key in specific):
+                attrs[key] = _NON_WHITESPACE_RE.findall(value)
+
+        parent = self._stack[-1]
+        if name == "body" and self._body is None:
+            # Only the first <body> is output, converted whatever surrounds it.
+            element = self._body = _Element(name, attrs, _CONVERT, self._body_parts)
+            self._details = []
+            self._claimed = 0
+            self._claim_frames = []
+        elif name == "summary" and self._claimed < len(self._details):
+            element = _Element(name, attrs, _CONVERT, [])
+            element.owner = self._details[self._claimed]
+            element.owner.title = ""
+            self._claim_frames.append(self._claimed + 1)
+            self._claimed = len(self._details)
+        elif parent.mode == _CONVERT:
+            element = self._start_converted(name, attrs, parent)
+        elif parent.mode == _TEXT:
+            element = _Element(name, attrs, _TEXT, parent.parts)
+            element.root = parent.root
+            pre = parent.root
+            if name == "code" and pre.name == "pre" and pre.code is None:
+                element.parts = pre.code = []
+                pre.language = self.converter._extract_code_language(element)
+        elif parent.mode == _RAW:
+            element = _Element(name, attrs, _RAW, parent.parts)
+            parent.parts.append(self._format_start_tag(name, attrs))
+        else:
+            element = _Element(name, attrs, _DROP, parent.parts)
+
+        self._stack.append(element)
+        self._open_counts[name] = self._open_counts.get(name, 0) + 1
+        if name in _PRESERVE_WHITESPACE_TAGS:
+            self._preserve_whitespace += 1
+        if name in _STRING_CONTAINER_TAGS:
+            self._string_containers += 1
+
+    def _start_converted(self, name: str, attrs: Dict[str, object], parent: _Element) -> _Element:
+        converter = self.converter
+        element = _Element(name, attrs, _CONVERT, [])
+        finish = self._finishers.get(name)
+        if finish is not None:
+            element.finish = finish
+            return element
+        if name not in converter.handlers or converter._is_passthrough(element):
+            element.mode, element.parts = _RAW, parent.parts
+            parent.parts.append(self._format_start_tag(name, attrs))
+        elif name == "details":
+            element.finish = self._finish_details
+            self._details.append(element)
+        elif name in ("kbd", "code", "pre"):
+            element.mode = _TEXT
+            element.root = element
+            if name == "code" and parent.name == "pre":
+                element.mode, element.parts = _DROP, parent.parts
+        elif name == "a":
+            email = converter._link_email(element)
+            if email:
+                element.mode, element.parts = _DROP, parent.parts
+                parent.parts.append(f"[EMAIL]{email}[/EMAIL]")
+            else:
+                element.finish = converter._finish_link
+        elif name == "abbr":
+            element.finish = converter._finish_abbr
+        else:
+            # br, hr and img: void elements whose handler only reads attributes.
+            element.mode, element.parts = _DROP, parent.parts
+            parent.parts.append(converter.handlers[name](element))
+        return element
+
+    def _pair_finisher(self, wrap):
+        converter = self.converter
+
+        def finish(element: _Element, content: str) -> str:
+            opening, closing = wrap(converter, element)
+            return opening + content + closing
+
+        return finish
+
+    def _finish_details(self, element: _Element, content: str) -> str:
+        if self._details and self._details[-1] is element:
+            self._details.pop()
+            self._claimed = min(self._claimed, len(self._details))
+        return self.converter._finish_details(element.title or "", content)
+
+    def _end(self, name: str) -> None:
+        self._end_data()
+        if not self._open_counts.get(name):
+            return
+        while True:
+            element = self._pop()
+            if element.name == name:
+                return
+
+    def _pop(self) -> _Element:
+        element = self._stack.pop()
+        name = element.name
+        self._open_counts[name] -= 1
+        if name in _PRESERVE_WHITESPACE_TAGS:
+            self._preserve_whitespace -= 1
+        if name in _STRING_CONTAINER_TAGS:
+            self._string_containers -= 1
+
+        mode = element.mode
+        if element is self._body:
+            pass
+        elif element.owner is not None:
+            element.owner.title = "".join(element.parts).strip()
+            if self._claim_frames:
+                self._claimed = self._claim_frames.pop()
+        elif mode == _CONVERT:
+            self._stack[-1].parts.append(element.finish(element, "".join(element.parts)))
+        elif mode == _TEXT and element.root is element:
+            self._stack[-1].parts.append(self._finish_text(element))
+        elif mode == _RAW and name not in _VOID_TAGS:
+            element.parts.append(f"</{name}>")
+        return element
+
+    def _finish_text(self, element: _Element) -> str:
+        converter = self.converter
+        if element.name != "pre":
+            return converter._finish_icode("".join(element.parts))
+        if element.code is not None:
+            return converter._finish_pre(element.language, "".join(element.code))
+        return converter._finish_pre(converter._extract_code_language(element), "".join(element.parts))
+
+    def _format_start_tag(self, name: str, attrs: Dict[str, object]) -> str:
+        if not attrs:
+            return f"<{name}/>" if name in _VOID_TAGS else f"<{name}>"
+        if name == "meta":
+            attrs = self._substitute_meta_charset(attrs)
+        pieces = [name]
+        for key, value in sorted(attrs.items()):
+            if isinstance(value, list):
+                value = " ".join(value)
+            pieces.append(f"{key}={_quote_attribute(_escape(value))}")
+        return "<" + " ".join(pieces) + ("/>" if name in _VOID_TAGS else ">")
+
+    def _substitute_meta_charset(self, attrs: Dict[str, object]) -> Dict[str, object]:
+        # str(tag) writes the output encoding into <meta> charset declarations.
+        attrs = dict(attrs)
+        if "charset" in attrs:
+            attrs["charset"] = "utf-8"
+        elif "content" in attrs and str(attrs.get("http-equiv", "")).lower() == "content-type":
+            attrs["content"] = _META_CHARSET_RE.sub(lambda match: match.group(1) + "utf-8", attrs["content"])
+        return attrs
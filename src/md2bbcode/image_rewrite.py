@@ -1,15 +1,16 @@
 from typing import Optional
-from urllib.parse import parse_qs, quote, urlencode, urlparse
+from urllib.parse import ParseResult, parse_qs, quote, urlencode, urlparse
 
 _RASTER_SHIELDS_BASE = "https://raster.shields.io"
 _WESERV_BASE = "https://images.weserv.nl/"
 
 
-def rewrite_svg_url(url: str) -> Optional[str]:
+def rewrite_svg_url(url: str, parsed: Optional[ParseResult] = None) -> Optional[str]:
     if not url:
         return url
 
-    parsed = urlparse(url)
+    if parsed is None:
+        parsed = urlparse(url)
     if _is_github_actions_badge(parsed):
         return _rewrite_github_actions_badge(parsed)
 
@@ -0,0 +1,183 @@
+# incremental re-conversion for documents that are edited and reconverted repeatedly.
+# the source is cut into top-level segments at the streaming converter's safe boundaries;
+# only segments whose text changed are block-parsed again, and only top-level blocks whose
+# tokens or context changed are inline-parsed and rendered again.
+import hashlib
+import json
+from typing import Dict, List, Optional, Tuple
+
+from md2bbcode.stream import iter_chunks
+
+# (first-pass output, emitted raw HTML, footnote keys first referenced by the block)
+_BlockResult = Tuple[str, bool, Tuple[str, ...]]
+
+
+def _digest(*parts: str) -> str:
+    digest = hashlib.sha256()
+    for part in parts:
+        digest.update(part.encode("utf-8", "surrogatepass"))
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+def _dump(value) -> str:
+    return json.dumps(value, sort_keys=True, ensure_ascii=False, default=repr)
+
+
+def _replay_footnotes(env: dict, keys: Tuple[str, ...]) -> None:
+    # Same bookkeeping as mistune's parse_inline_footnote, for a block served from cache.
+    notes = env.get("footnotes") or []
+    indexes = env.get("footnote_indexes") or {key: index for index, key in enumerate(notes)}
+    for key in keys:
+        if key not in indexes:
+            notes.append(key)
+            indexes[key] = len(notes) - 1
+    env["footnotes"] = notes
+    env["footnote_indexes"] = indexes
+
+
+def _merge_definitions(env: dict, definitions: dict) -> None:
+    # The block parser's rules: a reference link or footnote keeps its first
+    # definition, an abbreviation its last.
+    for name, values in definitions.items():
+        merged = env.setdefault(name, {})
+        if name == "ref_abbrs":
+            merged.update(values)
+        else:
+            for key, value in values.items():
+                merged.setdefault(key, value)
+
+
+class IncrementalConverter:
+    """
+    Converts successive versions of a document, reusing the first-pass output of
+    every top-level block that is unchanged since the previous call.
+
+    A block's result is keyed on its parsed token, which already reflects
+    merge_ordered_lists merging adjacent lists, on the document's reference link,
+    footnote and abbreviation definitions, and on the domain. Blocks that reference
+    footnotes also key on the footnotes numbered before them, so numbering stays
+    right when a reference is added or removed earlier in the document. The
+    footnotes section and the HTML pass always run over the whole document.
+
+    Use one instance per document being edited; only the blocks of the latest
+    version are kept.
+    """
+
+    def __init__(self, converter=None) -> None:
+        if converter is None:
+            from md2bbcode.main import Converter
+
+            converter = Converter()
+        self.converter = converter
+        self._segments: Dict[str, str] = {}
+        self._blocks: Dict[str, _BlockResult] = {}
+        self._last_first_pass: Optional[Tuple[Optional[str], bool, str]] = None
+        self._last_result = ""
+        self._stats = {
+            "calls": 0, "segments_reused": 0, "segments_parsed": 0, "blocks_reused": 0, "blocks_rendered": 0,
+        }
+
+    def convert(self, markdown_text: str, domain: Optional[str] = None) -> str:
+        """Convert Markdown to final BBCode; same output as process_readme."""
+        converter = self.converter
+        with converter.lock:
+            bbcode_text, emitted_html = self._render_first_pass(markdown_text, domain)
+            # The HTML pass only depends on these, so an edit that leaves the first
+            # pass unchanged doesn't need it again.
+            first_pass = (domain, emitted_html, bbcode_text)
+            if first_pass == self._last_first_pass:
+                return self._last_result
+            result = converter.html_pass(bbcode_text, domain, emitted_html)
+            self._last_first_pass = first_pass
+            self._last_result = result
+            return result
+
+    def _parse_blocks(self, text: str):
+        # Block-parse segment by segment, reusing the tokens of unchanged segments.
+        # The segments are cut where the streaming converter may cut a chunk, so each
+        # parses the same way on its own as it does inside the whole document. Each
+        # segment is parsed with its own env, and the definitions it made are merged
+        # into the document's in order, whether it was parsed now or reused.
+        md = self.converter.markdown
+        state = md.block.state_cls()
+        state.env = env = {"ref_links": {}}
+
+        segments: Dict[str, Tuple[str, str]] = {}
+        tokens: List[dict] = []
+        for segment in iter_chunks(text.splitlines(keepends=True), chunk_size=1):
+            parsed = segments.get(segment) or self._segments.get(segment)
+            if parsed is None:
+                segment_state = md.block.state_cls()
+                segment_state.env = {"ref_links": {}}
+                segment_state.process(segment)
+                for hook in md.before_parse_hooks:
+                    hook(md, segment_state)
+                md.block.parse(segment_state)
+                definitions = {key: value for key, value in segment_state.env.items() if key.startswith("ref_")}
+                parsed = (json.dumps(segment_state.tokens), json.dumps(definitions))
+                self._stats["segments_parsed"] += 1
+            else:
+                self._stats["segments_reused"] += 1
+            segments[segment] = parsed
+            # Rendering and merge_ordered_lists modify tokens in place, so the cache
+            # holds them serialized.
+            tokens.extend(json.loads(parsed[0]))
+            _merge_definitions(env, json.loads(parsed[1]))
+        self._segments = segments
+
+        state.tokens = tokens
+        for hook in md.before_render_hooks:
+            hook(md, state)
+        return state
+
+    def _render_first_pass(self, markdown_text: str, domain: Optional[str]) -> Tuple[str, bool]:
+        md = self.converter.markdown
+        renderer = self.converter.renderer
+        renderer.domain = domain
+
+        text = markdown_text.replace("\r\n", "\n").replace("\r", "\n")
+        if not text.endswith("\n"):
+            text += "\n"
+        state = self._parse_blocks(text)
+
+        env = state.env
+        # Definitions live under "ref_*" keys; other keys are parser bookkeeping.
+        definitions = {key: value for key, value in env.items() if key.startswith("ref_")}
+        # Abbreviations are matched in definition order, which the sorted dump loses.
+        context = _digest(domain or "", _dump(definitions), _dump(list(env.get("ref_abbrs") or ())))
+        blocks: Dict[str, _BlockResult] = {}
+        parts: List[str] = []
+        emitted_html = False
+        for token in state.tokens:
+            raw = _dump(token)
+            if "[^" in raw:
+                key = _digest(context, raw, _dump(env.get("footnotes") or []))
+            else:
+                key = _digest(context, raw)
+            cached = blocks.get(key) or self._blocks.get(key)
+            if cached is None:
+                before = len(env.get("footnotes") or [])
+                renderer.emitted_html = False
+                output = self.converter.render_blocks([token], state)
+                cached = (output, renderer.emitted_html, tuple((env.get("footnotes") or [])[before:]))
+                self._stats["blocks_rendered"] += 1
+            else:
+                _replay_footnotes(env, cached[2])
+                self._stats["blocks_reused"] += 1
+            blocks[key] = cached
+            parts.append(cached[0])
+            emitted_html = emitted_html or cached[1]
+
+        self._blocks = blocks
+        self._stats["calls"] += 1
+
+        result = "".join(parts)
+        renderer.emitted_html = False
+        for hook in md.after_render_hooks:
+            result = hook(md, result, state)
+        return result, emitted_html or renderer.emitted_html
+
+    def stats(self) -> Dict[str, int]:
+        """Counters since creation, plus the number of segments and blocks currently held."""
+        return dict(self._stats, cached_segments=len(self._segments), cached_blocks=len(self._blocks))
@@ -0,0 +1,132 @@
+# streams JSON Lines records of {"id", "markdown", "domain"} through process_readme,
+# writing {"id", "bbcode"} (or {"id", "error"}) lines in input order.
+import gzip
+import io
+import json
+import os
+import sys
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import IO, Any, Callable, Dict, Iterable, Iterator, Optional, Tuple
+
+_GZIP_MAGIC = b"\x1f\x8b"
+
+
+def _ordered_map(func: Callable, items: Iterable, jobs: Optional[int] = None, window: Optional[int] = None) -> Iterator:
+    """
+    Like map(), but runs func in up to `jobs` worker processes with at most `window`
+    items in flight, yielding results in input order. Items are pulled from the
+    iterable only as results are consumed, so memory stays bounded.
+    """
+    if jobs is None:
+        jobs = os.cpu_count() or 1
+    if jobs <= 1:
+        yield from map(func, items)
+        return
+    if window is None:
+        window = jobs * 4
+    window = max(window, 1)
+
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        in_flight: deque = deque()
+        for item in items:
+            in_flight.append(executor.submit(func, item))
+            if len(in_flight) >= window:
+                yield in_flight.popleft().result()
+        while in_flight:
+            yield in_flight.popleft().result()
+
+
+def _convert_record(record: Dict[str, Any], default_domain: Optional[str] = None) -> Dict[str, Any]:
+    from md2bbcode.main import process_readme
+
+    record_id = record.get("id")
+    try:
+        markdown_text = record["markdown"]
+        if not isinstance(markdown_text, str):
+            raise TypeError("'markdown' must be a string")
+        domain = record.get("domain") or default_domain
+        return {"id": record_id, "bbcode": process_readme(markdown_text, domain)}
+    except Exception as exc:
+        return {"id": record_id, "error": f"{type(exc).__name__}: {exc}"}
+
+
+def _convert_line(job: Tuple[int, str, Optional[str]]) -> Tuple[bool, str]:
+    # Decoding happens in the worker too, keeping the parent process to plain I/O.
+    line_number, line, default_domain = job
+    try:
+        record = json.loads(line)
+        if not isinstance(record, dict):
+            raise ValueError("record is not a JSON object")
+    except ValueError as exc:
+        result: Dict[str, Any] = {"id": None, "line": line_number, "error": f"invalid record: {exc}"}
+    else:
+        result = _convert_record(record, default_domain)
+    return "error" not in result, json.dumps(result, ensure_ascii=False)
+
+
+def _convert_record_job(job: Tuple[Dict[str, Any], Optional[str]]) -> Dict[str, Any]:
+    return _convert_record(*job)
+
+
+def iter_convert_records(
+    records: Iterable[Dict[str, Any]],
+    domain: Optional[str] = None,
+    jobs: Optional[int] = 1,
+    window: Optional[int] = None,
+) -> Iterator[Dict[str, Any]]:
+    """
+    Convert an iterable of {"id", "markdown", "domain"} dicts, yielding
+    {"id", "bbcode"} or {"id", "error"} dicts in input order. `domain` is used for
+    records that don't carry their own.
+    """
+    jobs_iter = ((record, domain) for record in records)
+    return _ordered_map(_convert_record_job, jobs_iter, jobs=jobs, window=window)
+
+
+def open_jsonl(path: str) -> IO[str]:
+    """Open a JSON Lines file ("-" for stdin) as text, transparently gunzipping it."""
+    if path == "-":
+        raw = sys.stdin.buffer
+    else:
+        raw = open(path, "rb")
+    buffered = raw if isinstance(raw, io.BufferedReader) else io.BufferedReader(raw)
+    if buffered.peek(2)[:2] == _GZIP_MAGIC:
+        return io.TextIOWrapper(gzip.GzipFile(fileobj=buffered), encoding="utf-8")
+    return io.TextIOWrapper(buffered, encoding="utf-8")
+
+
+def open_jsonl_output(path: Optional[str]) -> IO[str]:
+    """Open an output path ("-" or None for stdout) for JSON Lines, gzipping *.gz paths."""
+    if path is None or path == "-":
+        return io.TextIOWrapper(sys.stdout.buffer, encoding="utf-8", newline="\n", write_through=True)
+    if path.endswith(".gz"):
+        return io.TextIOWrapper(gzip.open(path, "wb"), encoding="utf-8", newline="\n")
+    return open(path, "w", encoding="utf-8", newline="\n")
+
+
+def convert_jsonl(
+    input_stream: Iterable[str],
+    output_stream: IO[str],
+    domain: Optional[str] = None,
+    jobs: Optional[int] = None,
+    window: Optional[int] = None,
+) -> Tuple[int, int]:
+    """
+    Convert JSON Lines from input_stream to output_stream. Blank lines are ignored;
+    malformed records produce an error line instead of stopping the stream.
+    Returns (records written, records with errors).
+    """
+    jobs_iter = (
+        (line_number, line, domain)
+        for line_number, line in enumerate(input_stream, 1)
+        if line.strip()
+    )
+    written = errors = 0
+    for ok, output_line in _ordered_map(_convert_line, jobs_iter, jobs=jobs, window=window):
+        output_stream.write(output_line)
+        output_stream.write("\n")
+        written += 1
+        if not ok:
+            errors += 1
+    return written, errors
@@ -4,7 +4,9 @@
 
 #standard library
 import argparse
+import os
 import sys
+import threading
 
 
 def _write_output(text, output_path=None):
@@ -27,49 +29,317 @@ def _write_output(text, output_path=None):
             return
     print(text)
 
-# mistune
-import mistune
-from mistune.plugins.formatting import strikethrough, mark, superscript, subscript, insert
-from mistune.plugins.table import table, table_in_list
-from mistune.plugins.footnotes import footnotes
-from mistune.plugins.task_lists import task_lists
-from mistune.plugins.def_list import def_list
-from mistune.plugins.abbr import abbr
-from mistune.plugins.spoiler import spoiler
-
-# local
-from md2bbcode.plugins.merge_lists import merge_ordered_lists
-from md2bbcode.renderers.bbcode import BBCodeRenderer
-from md2bbcode.html2bbcode import process_html
+# mistune, its plugins, the renderer and bs4 are imported on first use rather than here,
+# so `md2bbcode --help` and `import md2bbcode` stay fast.
+def default_plugins():
+    from mistune.plugins.formatting import strikethrough, mark, superscript, subscript, insert
+    from mistune.plugins.table import table, table_in_list
+    from mistune.plugins.footnotes import footnotes
+    from mistune.plugins.task_lists import task_lists
+    from mistune.plugins.def_list import def_list
+    from mistune.plugins.abbr import abbr
+    from mistune.plugins.spoiler import spoiler
+
+    from md2bbcode.plugins.merge_lists import merge_ordered_lists
+
+    return [strikethrough, mark, superscript, subscript, insert, table, footnotes, task_lists, def_list, abbr, spoiler, table_in_list, merge_ordered_lists]
+
+
+class Converter:
+    """A reusable Markdown to BBCode pipeline.
+
+    The mistune parser, the BBCode renderer and the HTML converter are built once
+    and reused for every document, so repeated conversions only pay for the work
+    itself. A lock serializes conversions because the domain lives on the shared
+    renderer and HTML converter.
+
+    With html_fast_path (the default), documents whose first pass emitted no raw
+    HTML and contains nothing the HTML pass could change skip BeautifulSoup entirely.
+
+    Pass a md2bbcode.cache.ResultCache as `cache` to reuse results for Markdown that
+    has been converted before with the same domain, plugins and package version.
+
+    With html_islands (the default), the HTML pass only parses the parts of the
+    first-pass output that contain HTML and copies the plain BBCode between them.
+
+    render_mode picks the BBCodeRenderer mode. "iterative" (the default here) gives the
+    same output as "recursive" without re-copying nested output at every level or
+    recursing once per nesting level.
+
+    html_engine picks how the HTML pass parses: "soup" builds a BeautifulSoup tree,
+    "events" converts straight from parser events with the same output. html_parser
+    picks the soup engine's tree builder ("html.parser", "lxml", "html5lib" or "auto",
+    which prefers lxml when it is installed). html_mode picks how the soup engine walks
+    the tree; "iterative" (the default here) writes into one list that is joined once
+    and uses an explicit stack, so deeply nested HTML can't exhaust the recursion limit.
+    """
+
+    def __init__(self, plugins=None, html_fast_path=True, cache=None, render_mode='iterative', html_islands=True, html_engine='soup', html_parser='html.parser', html_mode='iterative'):
+        import mistune
+        from md2bbcode.renderers.bbcode import BBCodeRenderer
+        from md2bbcode.html2bbcode import HtmlToBbCodeConverter
+
+        self.plugins = default_plugins() if plugins is None else list(plugins)
+        self.renderer = BBCodeRenderer(mode=render_mode)
+        self.markdown = mistune.create_markdown(renderer=self.renderer, plugins=self.plugins)
+        self.html_converter = HtmlToBbCodeConverter(islands=html_islands, engine=html_engine, parser=html_parser, mode=html_mode)
+        self.html_fast_path = html_fast_path
+        self.cache = cache
+        self._lock = threading.RLock()
+
+    @property
+    def lock(self):
+        """
+        The re-entrant lock every conversion holds. Hold it to drive the converter
+        step by step (render_blocks, then html_pass) as one conversion.
+        """
+        return self._lock
+
+    def render_markdown(self, markdown_text, domain=None, profile=None):
+        # First pass only: Markdown to BBCode, leaving any raw HTML in place
+        with self._lock:
+            self.renderer.domain = domain
+            self.renderer.emitted_html = False
+            if profile is None:
+                return self.markdown(markdown_text)
+            return self._render_markdown_profiled(markdown_text, profile)
+
+    def _render_markdown_profiled(self, markdown_text, profile):
+        # Mirrors mistune's Markdown.parse step by step so each step can be timed;
+        # inline parsing is normally interleaved with rendering.
+        from md2bbcode.profiling import count_tokens
+
+        md = self.markdown
+        with profile.stage('block_parse', len(markdown_text)) as stage:
+            state = md.block.state_cls()
+            text = markdown_text.replace('\r\n', '\n').replace('\r', '\n')
+            if not text.endswith('\n'):
+                text += '\n'
+            state.process(text)
+            for hook in md.before_parse_hooks:
+                hook(md, state)
+            md.block.parse(state)
+            for hook in md.before_render_hooks:
+                hook(md, state)
+            stage.count, stage.unit = len(state.tokens), 'blocks'
+        with profile.stage('inline_parse') as stage:
+            tokens = list(md._iter_render(state.tokens, state))
+            stage.count, stage.unit = count_tokens(tokens), 'tokens'
+        with profile.stage('render') as stage:
+            result = self.renderer(tokens, state)
+            for hook in md.after_render_hooks:
+                result = hook(md, result, state)
+            stage.output_size = len(result)
+        return result
+
+    def render_blocks(self, tokens, state):
+        # First pass for already block-parsed top-level tokens of `state`: inline
+        # parsing and rendering only. Call with the lock held.
+        return self.renderer.render_tokens(self.markdown._iter_render(tokens, state), state)
+
+    def html_pass(self, bbcode_text, domain=None, emitted_html=False):
+        """
+        Second pass only: convert first-pass output to final BBCode. Pass
+        emitted_html=True when the first pass emitted raw HTML.
+        """
+        with self._lock:
+            self.renderer.emitted_html = emitted_html
+            return self._html_pass(bbcode_text, domain)
+
+    def _needs_html_pass(self, bbcode_text):
+        from md2bbcode.html2bbcode import needs_html_pass
+
+        if not self.html_fast_path or self.renderer.emitted_html:
+            return True
+        return needs_html_pass(bbcode_text)
+
+    def _html_pass(self, bbcode_text, domain, profile=None):
+        # Convert BBCode formatted as HTML to final BBCode
+        if self._needs_html_pass(bbcode_text):
+            self.html_converter.domain = domain or ""
+            return self.html_converter.convert(bbcode_text, profile=profile)
+        if profile is not None:
+            from md2bbcode.profiling import StageStats
+
+            profile.add(StageStats('html_skipped', 0.0, len(bbcode_text), len(bbcode_text)))
+        return bbcode_text
+
+    def convert(self, markdown_text, domain=None, debug=False, cache=None, profile=None):
+        """
+        Convert Markdown to final BBCode. Pass a md2bbcode.profiling.ConversionProfile
+        as `profile` to collect per-stage timings.
+        """
+        cache = cache if cache is not None else self.cache
+        if cache is None or debug:
+            return self._convert(markdown_text, domain, debug, profile)
+
+        from md2bbcode.cache import cache_key, plugin_names
+
+        names = plugin_names(self.plugins)
+        if self.html_converter.parser != 'html.parser':
+            # Other tree builders may not match html.parser's output; keep their results
+            # apart while leaving existing keys for the default unchanged.
+            names.append(f'html_parser={self.html_converter.parser}')
+        key = cache_key(markdown_text, domain, names)
+        if profile is None:
+            final_bbcode = cache.get(key)
+        else:
+            with profile.stage('cache_lookup', len(markdown_text)) as stage:
+                final_bbcode = cache.get(key)
+                stage.count, stage.unit = int(final_bbcode is not None), 'hit'
+        if final_bbcode is None:
+            final_bbcode = self._convert(markdown_text, domain, debug, profile)
+            cache.put(key, final_bbcode)
+        return final_bbcode
+
+    def convert_ast(self, tokens, domain=None, profile=None):
+        """
+        Convert an already parsed token list (as produced by a mistune parser with
+        renderer=None and the same plugins, see md2bbcode.md2ast) to final BBCode,
+        skipping Markdown parsing.
+        """
+        from mistune.core import BlockState
+
+        with self._lock:
+            self.renderer.domain = domain
+            self.renderer.emitted_html = False
+            if profile is None:
+                bbcode_text = self.renderer(tokens, BlockState())
+            else:
+                from md2bbcode.profiling import count_tokens
+
+                with profile.stage('render') as stage:
+                    bbcode_text = self.renderer(tokens, BlockState())
+                    stage.count, stage.unit = count_tokens(tokens), 'tokens'
+                    stage.output_size = len(bbcode_text)
+            return self._html_pass(bbcode_text, domain, profile)
+
+    def _convert(self, markdown_text, domain, debug, profile=None):
+        with self._lock:
+            bbcode_text = self.render_markdown(markdown_text, domain, profile)
+
+            # If debug mode, save intermediate BBCode
+            if debug:
+                with open('readme.1stpass', 'w', encoding='utf-8') as file:
+                    file.write(bbcode_text)
+
+            final_bbcode = self._html_pass(bbcode_text, domain, profile)
+
+            if debug:
+                with open('readme.finalpass', 'w', encoding='utf-8') as file:
+                    file.write(final_bbcode)
+
+            return final_bbcode
+
+
+_default_converter = None
+_default_converter_lock = threading.Lock()
+
+
+def get_default_converter():
+    # Built on first use so importing the module stays cheap
+    global _default_converter
+    if _default_converter is None:
+        with _default_converter_lock:
+            if _default_converter is None:
+                _default_converter = Converter()
+    return _default_converter
 
 def convert_markdown_to_bbcode(markdown_text, domain):
-    # Create a Markdown parser instance using the custom BBCode renderer
-    markdown_parser = mistune.create_markdown(renderer=BBCodeRenderer(domain=domain), plugins=[strikethrough, mark, superscript, subscript, insert, table, footnotes, task_lists, def_list, abbr, spoiler, table_in_list, merge_ordered_lists])
+    return get_default_converter().render_markdown(markdown_text, domain)
 
-    # Convert Markdown text to BBCode
-    return markdown_parser(markdown_text)
+def process_readme(markdown_text, domain=None, debug=False, cache=None, profile=None):
+    return get_default_converter().convert(markdown_text, domain=domain, debug=debug, cache=cache, profile=profile)
 
-def process_readme(markdown_text, domain=None, debug=False):
-    # Convert Markdown to BBCode
-    bbcode_text = convert_markdown_to_bbcode(markdown_text, domain)
+def _convert_directory(args):
+    from md2bbcode.batch import convert_tree
 
-    # If debug mode, save intermediate BBCode
-    if debug:
-        with open('readme.1stpass', 'w', encoding='utf-8') as file:
-            file.write(bbcode_text)
+    if not args.output or args.output == '-':
+        sys.exit('md2bbcode: an output directory (-o) is required when the input is a directory')
+    result = convert_tree(args.input, args.output, domain=args.domain, jobs=args.jobs, force=args.force)
+    for relpath, error in result.failed.items():
+        print(f'{relpath}: {error}', file=sys.stderr)
+    print(
+        f'converted {len(result.converted)}, unchanged {len(result.skipped)}, '
+        f'removed {len(result.removed)}, failed {len(result.failed)}',
+        file=sys.stderr,
+    )
+    if result.failed:
+        sys.exit(1)
 
-    # Convert BBCode formatted as HTML to final BBCode
-    final_bbcode = process_html(bbcode_text, debug, 'readme.finalpass', domain=domain)
+def _convert_jsonl(args):
+    from md2bbcode.jsonl import convert_jsonl, open_jsonl, open_jsonl_output
 
-    return final_bbcode
+    to_stdout = not args.output or args.output == '-'
+    input_stream = open_jsonl(args.input)
+    output_stream = open_jsonl_output(args.output)
+    try:
+        written, errors = convert_jsonl(input_stream, output_stream, domain=args.domain, jobs=args.jobs, window=args.window)
+    finally:
+        if to_stdout:
+            # Don't close the real stdout along with the wrapper.
+            output_stream.flush()
+            output_stream.detach()
+        else:
+            output_stream.close()
+        if args.input != '-':
+            input_stream.close()
+    print(f'records {written}, errors {errors}', file=sys.stderr)
 
-def main():
+def _convert_streaming(args):
+    from md2bbcode.stream import DEFAULT_CHUNK_SIZE, iter_convert
+
+    chunk_size = args.chunk_size or DEFAULT_CHUNK_SIZE
+    pieces = iter_convert(args.input, domain=args.domain, chunk_size=chunk_size)
+    if args.output and args.output != '-':
+        out_file = open(args.output, 'w', encoding='utf-8', newline='')
+        close = True
+    else:
+        try:
+            sys.stdout.reconfigure(encoding='utf-8')
+        except (AttributeError, ValueError):
+            pass
+        out_file = sys.stdout
+        close = False
+    try:
+        last = ''
+        for piece in pieces:
+            if piece:
+                out_file.write(piece)
+                last = piece
+        # Match _write_output: stdout always gets a final newline, files only when missing.
+        if not close or not last.endswith('\n'):
+            out_file.write('\n')
+    finally:
+        if close:
+            out_file.close()
+
+def main(argv=None):
     parser = argparse.ArgumentParser(description='Convert Markdown file to BBCode with HTML processing.')
-    parser.add_argument('input', help='Input Markdown file path (use "-" for stdin)')
-    parser.add_argument('-o', '--output', help='Output BBCode file path (UTF-8). Recommended on Windows instead of shell redirection. Use "-" or omit for stdout.')
+    parser.add_argument('input', help='Input Markdown file path (use "-" for stdin), or a directory to convert recursively')
+    parser.add_argument('-o', '--output', help='Output BBCode file path (UTF-8). Recommended on Windows instead of shell redirection. Use "-" or omit for stdout. Required (as a directory) when the input is a directory.')
     parser.add_argument('--domain', help='Domain to prepend to relative URLs')
     parser.add_argument('--debug', action='store_true', help='Output intermediate results to files for debugging')
-    args = parser.parse_args()
+    parser.add_argument('-j', '--jobs', type=int, help='Worker processes for directory or JSON Lines input (default: CPU count)')
+    parser.add_argument('--force', action='store_true', help='Directory input: reconvert every file, ignoring the manifest')
+    parser.add_argument('--jsonl', action='store_true', help='Treat the input as JSON Lines records {"id", "markdown", "domain"} (optionally gzipped) and write {"id", "bbcode"} lines in input order')
+    parser.add_argument('--window', type=int, help='JSON Lines input: maximum records in flight (default: 4 per worker)')
+    parser.add_argument('--profile', action='store_true', help='Print a per-stage timing breakdown to stderr')
+    parser.add_argument('--stream', action='store_true', help='Convert a very large document in chunks with bounded memory, writing output as it goes')
+    parser.add_argument('--chunk-size', type=int, help='Streaming mode: approximate characters per chunk (default: 1 MiB)')
+    args = parser.parse_args(argv)
+
+    if args.stream:
+        _convert_streaming(args)
+        return
+
+    if args.jsonl:
+        _convert_jsonl(args)
+        return
+
+    if args.input != '-' and os.path.isdir(args.input):
+        _convert_directory(args)
+        return
 
     if args.input == '-':
         # Read Markdown content from stdin
@@ -78,8 +348,16 @@ def main():
         with open(args.input, 'r', encoding='utf-8') as md_file:
             markdown_text = md_file.read()
 
+    profile = None
+    if args.profile:
+        from md2bbcode.profiling import ConversionProfile
+
+        profile = ConversionProfile()
+
     # Process the readme and get the final BBCode
-    final_bbcode = process_readme(markdown_text, args.domain, args.debug)
+    final_bbcode = process_readme(markdown_text, args.domain, args.debug, profile=profile)
+    if profile is not None:
+        print(profile.report(), file=sys.stderr)
 
     # Always emit the final BBCode to -o/stdout (debug mode also writes readme.1stpass/readme.finalpass).
     output_path = args.output if args.output and args.output != '-' else None
@@ -1,47 +1,147 @@
-# this is for debugging the custom mistune renderer bbcode.py
+# this is for debugging the custom mistune renderer bbcode.py, and for storing parsed
+# documents so they can be rendered later (possibly many times) without parsing again.
 import argparse
-import mistune
+import gzip
 import json  # Import the json module for serialization
-from mistune.plugins.formatting import strikethrough, mark, superscript, subscript, insert
-from mistune.plugins.table import table, table_in_list
-from mistune.plugins.footnotes import footnotes
-from mistune.plugins.task_lists import task_lists
-from mistune.plugins.def_list import def_list
-from mistune.plugins.abbr import abbr
-from mistune.plugins.spoiler import spoiler
+import sys
 
 #local
-from md2bbcode.plugins.merge_lists import merge_ordered_lists
+from md2bbcode.main import default_plugins
+
+AST_SCHEMA = "md2bbcode-ast"
+AST_VERSION = 1
+
+_GZIP_MAGIC = b"\x1f\x8b"
+
+
+def markdown_to_ast(markdown_text, plugins=None):
+    """
+    Parse Markdown into a fully inline-parsed token list. Reference links, footnotes
+    and abbreviations are already resolved, so the tokens render on their own.
+    """
+    import mistune
 
-def convert_markdown_to_ast(input_filepath, output_filepath):
     # Initialize Markdown parser with no renderer to produce an AST
-    markdown_parser = mistune.create_markdown(renderer=None, plugins=[strikethrough, mark, superscript, subscript, insert, table, footnotes, task_lists, def_list, abbr, spoiler, table_in_list, merge_ordered_lists])
-    
+    markdown_parser = mistune.create_markdown(
+        renderer=None, plugins=default_plugins() if plugins is None else plugins
+    )
+    return markdown_parser(markdown_text)
+
+
+def dumps_ast(tokens, compress=False):
+    """
+    Serialize tokens as a versioned envelope in minified JSON, returned as UTF-8
+    bytes. With compress, the bytes are gzipped.
+    """
+    envelope = {"schema": AST_SCHEMA, "version": AST_VERSION, "tokens": tokens}
+    data = json.dumps(envelope, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    if compress:
+        data = gzip.compress(data, mtime=0)
+    return data
+
+
+def loads_ast(data):
+    """
+    Load tokens written by dumps_ast (gzipped or not), or the bare token list that
+    older versions of md2ast wrote. Raises ValueError for anything else.
+    """
+    if isinstance(data, (bytes, bytearray)):
+        if data[:2] == _GZIP_MAGIC:
+            data = gzip.decompress(data)
+        data = data.decode("utf-8")
+    loaded = json.loads(data)
+    if isinstance(loaded, list):
+        return loaded
+    if not isinstance(loaded, dict) or loaded.get("schema") != AST_SCHEMA:
+        raise ValueError("not an md2bbcode AST")
+    if loaded.get("version") != AST_VERSION:
+        raise ValueError(f"unsupported AST version {loaded.get('version')!r} (expected {AST_VERSION})")
+    tokens = loaded.get("tokens")
+    if not isinstance(tokens, list):
+        raise ValueError("AST has no token list")
+    return tokens
+
+
+def render_ast(ast, domain=None, profile=None):
+    """
+    Render a stored AST to final BBCode with the shared pipeline. `ast` may be a
+    token list or anything loads_ast accepts.
+    """
+    from md2bbcode.main import get_default_converter
+
+    tokens = ast if isinstance(ast, list) else loads_ast(ast)
+    return get_default_converter().convert_ast(tokens, domain=domain, profile=profile)
+
+
+def convert_markdown_to_ast(input_filepath, output_filepath, compact=False, compress=False):
     # Read the input Markdown file
     with open(input_filepath, 'r', encoding='utf-8') as md_file:
         markdown_text = md_file.read()
-    
+
     # Convert Markdown text to AST
-    ast_text = markdown_parser(markdown_text)
-    
+    ast_text = markdown_to_ast(markdown_text)
+
+    if compact or compress:
+        with open(output_filepath, 'wb') as ast_file:
+            ast_file.write(dumps_ast(ast_text, compress=compress))
+        return
+
     # Serialize the AST to a JSON string
     ast_json = json.dumps(ast_text, indent=4)
-    
+
     # Write the output AST to a new file in JSON format
     with open(output_filepath, 'w', encoding='utf-8') as ast_file:
         ast_file.write(ast_json)
 
-def main():
+
+def _read_input(path, binary):
+    if path == '-':
+        return sys.stdin.buffer.read() if binary else sys.stdin.buffer.read().decode('utf-8')
+    with open(path, 'rb') as in_file:
+        data = in_file.read()
+    return data if binary else data.decode('utf-8')
+
+
+def _write_bytes(data, path):
+    if path is None or path == '-':
+        sys.stdout.buffer.write(data)
+        sys.stdout.buffer.flush()
+        return
+    with open(path, 'wb') as out_file:
+        out_file.write(data)
+
+
+def main(argv=None):
     # Create argument parser
-    parser = argparse.ArgumentParser(description='Convert Markdown file to AST file (JSON format).')
+    parser = argparse.ArgumentParser(description='Convert Markdown file to AST file (JSON format), or render a stored AST to BBCode.')
     # Add arguments
-    parser.add_argument('input', help='Input Markdown file path')
-    parser.add_argument('output', help='Output AST file path (JSON format)')
+    parser.add_argument('input', help='Input Markdown file path, or a stored AST with --render (use "-" for stdin)')
+    parser.add_argument('output', nargs='?', help='Output file path (use "-" or omit for stdout)')
+    parser.add_argument('--compact', action='store_true', help='Write the versioned, minified AST format that --render and render_ast() read')
+    parser.add_argument('--gzip', action='store_true', help='Like --compact, but gzip-compressed')
+    parser.add_argument('--render', action='store_true', help='Treat the input as a stored AST and write the final BBCode, skipping Markdown parsing')
+    parser.add_argument('--domain', help='--render: domain to prepend to relative URLs')
     # Parse arguments
-    args = parser.parse_args()
-    
-    # Convert the Markdown to AST using the provided paths
-    convert_markdown_to_ast(args.input, args.output)
+    args = parser.parse_args(argv)
+
+    if args.render:
+        from md2bbcode.main import _write_output
+
+        final_bbcode = render_ast(_read_input(args.input, binary=True), domain=args.domain)
+        _write_output(final_bbcode, args.output if args.output and args.output != '-' else None)
+        return
+
+    if args.input != '-' and args.output and args.output != '-':
+        # Convert the Markdown to AST using the provided paths
+        convert_markdown_to_ast(args.input, args.output, compact=args.compact, compress=args.gzip)
+        return
+
+    tokens = markdown_to_ast(_read_input(args.input, binary=False))
+    if args.compact or args.gzip:
+        data = dumps_ast(tokens, compress=args.gzip)
+    else:
+        data = json.dumps(tokens, indent=4).encode('utf-8')
+    _write_bytes(data, args.output)
 
 if __name__ == '__main__':
     main()
@@ -0,0 +1,108 @@
+from typing import Any, Callable, Dict, List, Optional
+
+Token = Dict[str, Any]
+
+
+class TokenCursor:
+    """
+    A visitor's view of the token it was called for and the siblings after it.
+    Visitors replace the current token and consume following siblings through the
+    cursor; the pass manager applies both to the sibling list in place.
+    """
+
+    __slots__ = ("state", "parent", "_siblings", "_index", "_consumed")
+
+    def __init__(self, state, parent: Optional[Token], siblings: List[Token]) -> None:
+        self.state = state
+        # The token whose children are being visited; None at the top level.
+        self.parent = parent
+        self._siblings = siblings
+        self._index = 0
+        self._consumed = 0
+
+    @property
+    def token(self) -> Token:
+        return self._siblings[self._index]
+
+    def peek(self, offset: int = 1) -> Optional[Token]:
+        """Return the offset-th following sibling that hasn't been consumed, or None."""
+        index = self._index + self._consumed + offset
+        if index < len(self._siblings):
+            return self._siblings[index]
+        return None
+
+    def consume(self, count: int = 1) -> None:
+        """Drop the next `count` unconsumed siblings from the token list."""
+        self._consumed += count
+
+    def replace(self, token: Token) -> None:
+        self._siblings[self._index] = token
+
+
+Visitor = Callable[[TokenCursor, Token], None]
+
+
+class TokenPassManager:
+    """
+    Runs every registered token visitor in one traversal of the block token tree,
+    as a single before-render hook.
+
+    Visitors are registered per token type and called in registration order with a
+    TokenCursor and the token. Tokens are visited before their children, the tree is
+    walked with an explicit stack, and sibling lists are compacted in place, so
+    unchanged tokens are never copied. Visitors registered with nested=False only
+    see top-level tokens; when no visitor needs nested tokens, the walk stays at
+    the top level.
+    """
+
+    def __init__(self) -> None:
+        self._top_level: Dict[str, List[Visitor]] = {}
+        self._nested: Dict[str, List[Visitor]] = {}
+
+    def register(self, token_type: str, visitor: Visitor, nested: bool = True) -> None:
+        self._top_level.setdefault(token_type, []).append(visitor)
+        if nested:
+            self._nested.setdefault(token_type, []).append(visitor)
+
+    def run(self, tokens: List[Token], state=None) -> None:
+        stack = [(tokens, None)]
+        while stack:
+            siblings, parent = stack.pop()
+            visitors = self._top_level if parent is None else self._nested
+            self._visit_siblings(siblings, parent, state, visitors, stack)
+
+    def _visit_siblings(self, siblings, parent, state, visitors, stack) -> None:
+        descend = bool(self._nested)
+        cursor = TokenCursor(state, parent, siblings)
+        write = read = 0
+        count = len(siblings)
+        while read < count:
+            token = siblings[read]
+            token_visitors = visitors.get(token["type"])
+            if token_visitors:
+                cursor._index, cursor._consumed = read, 0
+                for visitor in token_visitors:
+                    visitor(cursor, cursor.token)
+                token = siblings[read]
+                read += cursor._consumed
+            siblings[write] = token
+            write += 1
+            read += 1
+            if descend:
+                children = token.get("children")
+                if children:
+                    stack.append((children, token))
+        del siblings[write:]
+
+    def __call__(self, md, state) -> None:
+        self.run(state.tokens, state)
+
+
+def get_pass_manager(md) -> TokenPassManager:
+    """Return the Markdown instance's pass manager, installing its hook on first use."""
+    manager = getattr(md, "token_passes", None)
+    if manager is None:
+        manager = TokenPassManager()
+        md.token_passes = manager
+        md.before_render_hooks.append(manager)
+    return manager
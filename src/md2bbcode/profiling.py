@@ -0,0 +1,92 @@
+# per-stage timing for the conversion pipeline. Pass a ConversionProfile as `profile=` to
+# Converter.convert / process_readme / HtmlToBbCodeConverter.convert; when no profile is
+# given the pipeline takes its normal path and pays nothing for instrumentation.
+import time
+from typing import Callable, Dict, List, NamedTuple, Optional
+
+
+class StageStats(NamedTuple):
+    name: str
+    seconds: float
+    input_size: Optional[int] = None
+    output_size: Optional[int] = None
+    count: Optional[int] = None
+    unit: str = ""
+
+
+class _StageTimer:
+    def __init__(self, profile: "ConversionProfile", name: str, input_size: Optional[int]) -> None:
+        self.profile = profile
+        self.name = name
+        self.input_size = input_size
+        self.output_size: Optional[int] = None
+        self.count: Optional[int] = None
+        self.unit = ""
+
+    def __enter__(self) -> "_StageTimer":
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        elapsed = time.perf_counter() - self._start
+        if exc_type is None:
+            self.profile.add(StageStats(self.name, elapsed, self.input_size, self.output_size, self.count, self.unit))
+
+
+class ConversionProfile:
+    """
+    Collects a StageStats entry (wall time, input/output size in characters and a
+    token or node count where one makes sense) for each pipeline stage that runs.
+    `on_stage`, if given, is called with every entry as it is recorded.
+    """
+
+    def __init__(self, on_stage: Optional[Callable[[StageStats], None]] = None) -> None:
+        self.stages: List[StageStats] = []
+        self.on_stage = on_stage
+
+    def stage(self, name: str, input_size: Optional[int] = None) -> _StageTimer:
+        """Time a `with` block; set .output_size, .count and .unit on the timer inside it."""
+        return _StageTimer(self, name, input_size)
+
+    def add(self, stats: StageStats) -> None:
+        self.stages.append(stats)
+        if self.on_stage is not None:
+            self.on_stage(stats)
+
+    @property
+    def total_seconds(self) -> float:
+        return sum(stage.seconds for stage in self.stages)
+
+    def as_dict(self) -> Dict[str, object]:
+        return {
+            "total_seconds": self.total_seconds,
+            "stages": [stage._asdict() for stage in self.stages],
+        }
+
+    def report(self) -> str:
+        def size(value: Optional[int]) -> str:
+            return "-" if value is None else str(value)
+
+        lines = [f"{'stage':<16} {'ms':>9} {'%':>6} {'in':>10} {'out':>10}  count"]
+        total = self.total_seconds or 1e-12
+        for stage in self.stages:
+            count = "" if stage.count is None else f"{stage.count} {stage.unit}".rstrip()
+            lines.append(
+                f"{stage.name:<16} {stage.seconds * 1000:>9.3f} {stage.seconds / total:>6.1%} "
+                f"{size(stage.input_size):>10} {size(stage.output_size):>10}  {count}"
+            )
+        lines.append(f"{'total':<16} {self.total_seconds * 1000:>9.3f}")
+        return "\n".join(lines)
+
+
+def count_tokens(tokens: List[dict]) -> int:
+    """Count tokens in a mistune token tree, including nested children."""
+    total = 0
+    stack = [tokens]
+    while stack:
+        for token in stack.pop():
+            total += 1
+            children = token.get("children")
+            if children:
+                stack.append(children)
+    return total
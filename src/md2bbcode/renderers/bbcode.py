@@ -1,22 +1,235 @@
 from mistune.core import BaseRenderer
 from mistune.util import escape as escape_text, striptags, safe_entity
+import inspect
 import re
-from urllib.parse import urljoin, urlparse
 
-from md2bbcode.image_rewrite import rewrite_svg_url
+from md2bbcode.urls import image_url, resolve_url
+
+
+RENDER_MODES = ('recursive', 'buffered', 'iterative')
+
+_ADMONITION_RE = re.compile(r"^\s*\[!(NOTE|TIP|IMPORTANT|WARNING|CAUTION)\]\s*", re.IGNORECASE)
+# Non-space characters needed to tell an admonition from a plain quote: len('[!IMPORTANT]')
+_ADMONITION_HEAD = 12
+
+# Tokens whose output is a fixed prefix and suffix around their rendered children.
+# Buffered mode writes these pieces straight into the output buffer; they must match
+# the methods below exactly.
+_STATIC_WRAPS = {
+    'emphasis': ('[i]', '[/i]'),
+    'strong': ('[b]', '[/b]'),
+    'paragraph': ('', '\n\n'),
+    'block_text': ('', ''),
+    'list_item': ('[*]', '\n'),
+    'strikethrough': ('[s]', '[/s]'),
+    'mark': ('[mark]', '[/mark]'),
+    'insert': ('[u]', '[/u]'),
+    'superscript': ('[sup]', '[/sup]'),
+    'subscript': ('[sub]', '[/sub]'),
+    'inline_spoiler': ('[ISPOILER]', '[/ISPOILER]'),
+    'block_spoiler': ('[SPOILER]\n', '\n[/SPOILER]'),
+    'footnotes': ('[b]Footnotes:[/b]\n', ''),
+    'def_list': ('\n', '\n'),
+    'def_list_head': ('[b]', '[/b] :\n'),
+    'def_list_item': ('[INDENT]', '[/INDENT]\n'),
+}
+
+# Same idea, but the prefix and suffix depend on the token's attrs.
+_ATTR_WRAPS = (
+    'link', 'heading', 'list', 'footnote_item', 'table', 'table_head', 'table_body',
+    'table_row', 'table_cell', 'task_list_item', 'abbr',
+)
+
+# Where each token type's render method takes its text from, for the dispatch table.
+_RAW_TOKENS = ('text', 'codespan', 'inline_html', 'block_html', 'block_code', 'block_error', 'footnote_ref')
+_EMPTY_TOKENS = ('linebreak', 'softbreak', 'blank_line', 'thematic_break')
+_CHILDREN_TOKENS = tuple(_STATIC_WRAPS) + _ATTR_WRAPS + ('image', 'block_quote')
+
+
+def _takes_attrs(func, positional):
+    # True when the method accepts anything besides self and its text argument.
+    return len(inspect.signature(func).parameters) > positional
+
+
+def _raw_caller(func, with_attrs):
+    def call(renderer, token, state):
+        if 'raw' not in token:
+            return renderer._render_token_generic(token, state)
+        attrs = token.get('attrs') if with_attrs else None
+        if attrs:
+            return func(renderer, token['raw'], **attrs)
+        return func(renderer, token['raw'])
+    return call
+
+
+def _children_caller(func, with_attrs):
+    def call(renderer, token, state):
+        if 'raw' in token or 'children' not in token:
+            return renderer._render_token_generic(token, state)
+        text = renderer.render_tokens(token['children'], state)
+        attrs = token.get('attrs') if with_attrs else None
+        if attrs:
+            return func(renderer, text, **attrs)
+        return func(renderer, text)
+    return call
+
+
+def _empty_caller(func, with_attrs):
+    def call(renderer, token, state):
+        if 'raw' in token or 'children' in token:
+            return renderer._render_token_generic(token, state)
+        attrs = token.get('attrs') if with_attrs else None
+        if attrs:
+            return func(renderer, **attrs)
+        return func(renderer)
+    return call
 
 
 class BBCodeRenderer(BaseRenderer):
-    """A renderer for converting Markdown to BBCode."""
+    """A renderer for converting Markdown to BBCode.
+
+    In the default "recursive" mode every token returns its output as a string and
+    wraps its children's output in a new one. "buffered" mode gives the same output,
+    but tokens that only wrap their children write into one shared list of parts
+    that is joined once, so deep nesting doesn't re-copy the text at every level.
+    "iterative" mode also writes into one list, but walks the tokens with an explicit
+    stack instead of recursion, so arbitrarily deep trees render in linear time
+    without hitting the recursion limit.
+    """
     _escape: bool
     NAME = 'bbcode'
 
-    def __init__(self, escape=False, domain=None):
+    def __init__(self, escape=False, domain=None, mode='recursive'):
         super(BBCodeRenderer, self).__init__()
+        if mode not in RENDER_MODES:
+            raise ValueError(f'unknown render mode {mode!r}, expected one of {RENDER_MODES}')
         self._escape = escape
         self.domain = domain
+        self.mode = mode
+        # Set when raw HTML reaches the output; callers reset it per document.
+        self.emitted_html = False
+        self._wraps = self._build_wraps()
+        self._dispatch = self._dispatch_table()
+
+    @classmethod
+    def _dispatch_table(cls):
+        """
+        Map each known token type to a caller that already knows where the method's
+        text comes from and whether it takes attrs. Built once per class; token types
+        not listed here, and methods added with register(), use the generic path.
+        """
+        table = cls.__dict__.get('_compiled_dispatch')
+        if table is None:
+            table = {}
+            for names, make, positional in (
+                (_RAW_TOKENS, _raw_caller, 2),
+                (_CHILDREN_TOKENS, _children_caller, 2),
+                (_EMPTY_TOKENS, _empty_caller, 1),
+            ):
+                for name in names:
+                    func = getattr(cls, name)
+                    table[name] = make(func, _takes_attrs(func, positional))
+            cls._compiled_dispatch = table
+        return table
+
+    def _build_wraps(self):
+        # A subclass that overrides a render method gets that method called as usual.
+        cls = type(self)
+        wraps = {}
+        for name, pair in _STATIC_WRAPS.items():
+            if getattr(cls, name) is getattr(BBCodeRenderer, name):
+                wraps[name] = pair
+        for name in _ATTR_WRAPS:
+            if getattr(cls, name) is getattr(BBCodeRenderer, name):
+                wraps[name] = getattr(self, '_wrap_' + name)
+        return wraps
+
+    def render_tokens(self, tokens, state):
+        if self.mode == 'recursive':
+            return super().render_tokens(tokens, state)
+        if self.mode == 'iterative':
+            return self._render_iterative(tokens, state)
+        out = []
+        self._render_into(tokens, state, out)
+        return ''.join(out)
+
+    def _render_iterative(self, tokens, state):
+        # Each stack entry is (children iterator, token, index of its first part in
+        # out, suffix). Wrapping tokens write their prefix and later their suffix; other
+        # tokens reserve a slot and replace their parts with the method's result once
+        # their children are done.
+        wraps = self._wraps
+        quote_splice = type(self).block_quote is BBCodeRenderer.block_quote
+        out = []
+        append = out.append
+        stack = [(iter(tokens), None, 0, None)]
+        while stack:
+            for token in stack[-1][0]:
+                if 'raw' in token or 'children' not in token:
+                    append(self.render_token(token, state))
+                    continue
+                wrap = wraps.get(token['type'])
+                if wrap is None:
+                    stack.append((iter(token['children']), token, len(out), None))
+                    append('')
+                else:
+                    if type(wrap) is not tuple:
+                        attrs = token.get('attrs')
+                        wrap = wrap(**attrs) if attrs else wrap()
+                    stack.append((iter(token['children']), token, len(out), wrap[1]))
+                    append(wrap[0])
+                break
+            else:
+                _, token, start, suffix = stack.pop()
+                if suffix is not None:
+                    append(suffix)
+                elif token is None:
+                    continue
+                elif quote_splice and token['type'] == 'block_quote' and not self._is_admonition(out, start + 1):
+                    # Plain quotes only add tags around their text, which keeps
+                    # nested quotes linear.
+                    out[start] = '[QUOTE]\n'
+                    append('[/QUOTE]\n')
+                else:
+                    text = ''.join(out[start + 1:])
+                    del out[start:]
+                    func = self._get_method(token['type'])
+                    attrs = token.get('attrs')
+                    append(func(text, **attrs) if attrs else func(text))
+        return ''.join(out)
+
+    @staticmethod
+    def _is_admonition(parts, start):
+        head = ''
+        for index in range(start, len(parts)):
+            if len(head.lstrip()) >= _ADMONITION_HEAD:
+                break
+            head += parts[index]
+        return _ADMONITION_RE.match(head) is not None
+
+    def _render_into(self, tokens, state, out):
+        wraps = self._wraps
+        append = out.append
+        for token in tokens:
+            wrap = wraps.get(token['type'])
+            if wrap is None or 'raw' in token or 'children' not in token:
+                # Leaves, and tokens whose output depends on their rendered text
+                append(self.render_token(token, state))
+                continue
+            if type(wrap) is not tuple:
+                attrs = token.get('attrs')
+                wrap = wrap(**attrs) if attrs else wrap()
+            append(wrap[0])
+            self._render_into(token['children'], state, out)
+            append(wrap[1])
 
     def render_token(self, token, state):
+        call = self._dispatch.get(token['type'])
+        if call is None or token['type'] in self.__dict__:
+            return self._render_token_generic(token, state)
+        return call(self, token, state)
+
+    def _render_token_generic(self, token, state):
         func = self._get_method(token['type'])
         attrs = token.get('attrs')
 
@@ -35,13 +248,8 @@ class BBCodeRenderer(BaseRenderer):
             return func(text)
 
     def safe_url(self, url: str) -> str:
-        # Simple URL sanitization
-        if url.startswith(('javascript:', 'vbscript:', 'data:')):
-            return '#harmful-link'
-        # Check if the URL is absolute by looking for a netloc part in the URL
-        if not urlparse(url).netloc:
-            url = urljoin(self.domain, url)
-        return url
+        # Sanitize and resolve against the domain; shared with html2bbcode and memoized
+        return resolve_url(url, self.domain)
 
     def text(self, text: str) -> str:
         if self._escape:
@@ -60,7 +268,7 @@ class BBCodeRenderer(BaseRenderer):
     def image(self, text: str, url: str, title=None) -> str:
         alt_text = f' alt="{text}"' if text else ''
         safe_url = self.safe_url(url)
-        rewritten_url = rewrite_svg_url(safe_url)
+        rewritten_url = image_url(safe_url)
         if rewritten_url is None:
             link_text = text or safe_url
             return f"[url={safe_url}]{link_text}[/url]"
@@ -80,6 +288,7 @@ class BBCodeRenderer(BaseRenderer):
         return ''
 
     def inline_html(self, html: str) -> str:
+        self.emitted_html = True
         if self._escape:
             return escape_text(html)
         return html
@@ -126,7 +335,7 @@ class BBCodeRenderer(BaseRenderer):
     def block_quote(self, text: str) -> str:
         # GFMD "alerts"/admonitions are expressed as a blockquote
         # Render these into a dedicated XenForo custom BBCode, rather than a normal QUOTE.
-        m = re.match(r"^\s*\[!(NOTE|TIP|IMPORTANT|WARNING|CAUTION)\]\s*", text, flags=re.IGNORECASE)
+        m = _ADMONITION_RE.match(text)
         if m:
             kind = m.group(1).lower()
             body = text[m.end():].strip()
@@ -137,6 +346,7 @@ class BBCodeRenderer(BaseRenderer):
         return '[QUOTE]\n' + text + '[/QUOTE]\n'
 
     def block_html(self, html: str) -> str:
+        self.emitted_html = True
         if self._escape:
             return '<p>' + escape_text(html.strip()) + '</p>\n'
         return html + '\n'
@@ -244,4 +454,45 @@ class BBCodeRenderer(BaseRenderer):
     def abbr(self, text: str, title: str) -> str:
         if title:
             return f'[abbr={title}]{text}[/abbr]'
-        return text
\ No newline at end of file
+        return text
+
+    # Prefix and suffix for the _ATTR_WRAPS tokens in buffered mode
+
+    def _wrap_link(self, url, title=None):
+        return '[url=' + self.safe_url(url) + ']', '[/url]'
+
+    def _wrap_heading(self, level, **attrs):
+        return f"[HEADING={level if 1 <= level <= 3 else 3}]", "[/HEADING]\n"
+
+    def _wrap_list(self, ordered, **attrs):
+        return ('[list=1]' if ordered else '[list]'), '[/list]\n'
+
+    def _wrap_footnote_item(self, key, index):
+        return f'[ANAME=fn-{index}]{index}[/ANAME]. ', ''
+
+    def _wrap_table(self, **attrs):
+        return '[TABLE]\n', '[/TABLE]\n'
+
+    def _wrap_table_head(self, **attrs):
+        return '[TR]\n', '[/TR]\n'
+
+    def _wrap_table_body(self, **attrs):
+        return '', ''
+
+    def _wrap_table_row(self, **attrs):
+        return '[TR]\n', '[/TR]\n'
+
+    def _wrap_table_cell(self, align=None, head=False, **attrs):
+        tag = 'TH' if head else 'TD'
+        alignment = {'center': 'CENTER', 'right': 'RIGHT', 'left': 'LEFT'}.get(align)
+        if alignment:
+            return f'[{tag}][{alignment}]', f'[/{alignment}][/{tag}]\n'
+        return f'[{tag}]', f'[/{tag}]\n'
+
+    def _wrap_task_list_item(self, checked=False):
+        return ('🗹' if checked else '☐') + ' ', '\n'
+
+    def _wrap_abbr(self, title):
+        if title:
+            return f'[abbr={title}]', '[/abbr]'
+        return '', ''
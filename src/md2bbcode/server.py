@@ -0,0 +1,240 @@
+# long-running conversion server: keeps a warm Converter so each request only pays for the conversion.
+# POST /convert with JSON {"markdown", "domain"} (or a raw Markdown body and ?domain=...);
+# GET /health returns uptime and request statistics.
+import argparse
+import errno
+import json
+import os
+import socket
+import stat
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from socketserver import ThreadingMixIn, UnixStreamServer
+from typing import Any, Dict, Optional
+from urllib.parse import parse_qs, urlparse
+
+from md2bbcode._version import get_version
+
+MAX_BODY_BYTES = 64 * 1024 * 1024
+
+
+class ServerStats:
+    def __init__(self) -> None:
+        self.started = time.time()
+        self.requests = 0
+        self.errors = 0
+        self.conversion_seconds = 0.0
+        self.bytes_in = 0
+        self.bytes_out = 0
+        self._lock = threading.Lock()
+
+    def record(self, seconds: float, bytes_in: int, bytes_out: int, error: bool = False) -> None:
+        with self._lock:
+            self.requests += 1
+            self.conversion_seconds += seconds
+            self.bytes_in += bytes_in
+            self.bytes_out += bytes_out
+            if error:
+                self.errors += 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "status": "ok",
+                "version": get_version(),
+                "uptime_seconds": round(time.time() - self.started, 3),
+                "requests": self.requests,
+                "errors": self.errors,
+                "conversion_seconds": round(self.conversion_seconds, 6),
+                "bytes_in": self.bytes_in,
+                "bytes_out": self.bytes_out,
+            }
+
+
+class ConversionRequestHandler(BaseHTTPRequestHandler):
+    server_version = "md2bbcode"
+    protocol_version = "HTTP/1.1"
+    # Headers and body go out as separate writes; without this, delayed ACKs add ~40ms per request.
+    disable_nagle_algorithm = True
+
+    def log_message(self, format: str, *args: Any) -> None:
+        if getattr(self.server, "verbose", False):
+            super().log_message(format, *args)
+
+    def address_string(self) -> str:
+        # Unix sockets report an empty client address.
+        return self.client_address[0] if self.client_address else "unix"
+
+    def _send(self, status: int, body: bytes, content_type: str) -> None:
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send_json(self, status: int, payload: Dict[str, Any]) -> None:
+        self._send(status, json.dumps(payload, ensure_ascii=False).encode("utf-8"), "application/json; charset=utf-8")
+
+    def do_GET(self) -> None:
+        path = urlparse(self.path).path
+        if path in ("/health", "/stats"):
+            snapshot = self.server.stats.snapshot()
+            cache = getattr(self.server.converter, "cache", None)
+            if cache is not None:
+                snapshot["cache"] = cache.stats()
+            self._send_json(200, snapshot)
+        else:
+            self._send_json(404, {"error": "not found"})
+
+    def do_POST(self) -> None:
+        url = urlparse(self.path)
+        if url.path != "/convert":
+            self._send_json(404, {"error": "not found"})
+            return
+
+        length = self._content_length()
+        if length is None:
+            return
+        if length > MAX_BODY_BYTES:
+            self.close_connection = True
+            self._send_json(413, {"error": "request body too large"})
+            return
+        body = self.rfile.read(length)
+
+        started = time.perf_counter()
+        try:
+            markdown_text, domain, want_json = self._parse_request(body, url.query)
+            bbcode = self.server.converter.convert(markdown_text, domain=domain)
+        except Exception as exc:
+            self.server.stats.record(time.perf_counter() - started, len(body), 0, error=True)
+            self._send_json(400, {"error": f"{type(exc).__name__}: {exc}"})
+            return
+        elapsed = time.perf_counter() - started
+
+        if want_json:
+            payload = json.dumps({"bbcode": bbcode}, ensure_ascii=False).encode("utf-8")
+            content_type = "application/json; charset=utf-8"
+        else:
+            payload = bbcode.encode("utf-8")
+            content_type = "text/plain; charset=utf-8"
+        self.server.stats.record(elapsed, len(body), len(payload))
+        self._send(200, payload, content_type)
+
+    def _content_length(self) -> Optional[int]:
+        # The body is read by its declared length, so without a valid one there is no
+        # telling where it ends: answer and close the connection.
+        value = self.headers.get("Content-Length")
+        if value is None:
+            self.close_connection = True
+            self._send_json(411, {"error": "Content-Length required"})
+            return None
+        value = value.strip()
+        if not value.isdigit() or not value.isascii():
+            self.close_connection = True
+            self._send_json(400, {"error": "invalid Content-Length"})
+            return None
+        return int(value)
+
+    def _parse_request(self, body: bytes, query: str):
+        params = parse_qs(query)
+        domain: Optional[str] = params["domain"][0] if params.get("domain") else None
+        content_type = (self.headers.get("Content-Type") or "").split(";", 1)[0].strip().lower()
+        text = body.decode("utf-8")
+        if content_type == "application/json":
+            request = json.loads(text)
+            if not isinstance(request, dict) or not isinstance(request.get("markdown"), str):
+                raise ValueError('expected a JSON object with a "markdown" string')
+            return request["markdown"], request.get("domain") or domain, True
+        return text, domain, False
+
+
+class _UnixRequestHandler(ConversionRequestHandler):
+    # TCP_NODELAY doesn't apply to Unix domain sockets.
+    disable_nagle_algorithm = False
+
+
+class _ConverterServerMixin:
+    daemon_threads = True
+    # The socketserver default of 5 drops connections under bursts of concurrent clients.
+    request_queue_size = 128
+
+    def setup_converter(self, converter=None, verbose: bool = False) -> None:
+        if converter is None:
+            from md2bbcode.main import Converter
+
+            converter = Converter()
+        self.converter = converter
+        self.stats = ServerStats()
+        self.verbose = verbose
+
+
+class ConversionHTTPServer(_ConverterServerMixin, ThreadingHTTPServer):
+    pass
+
+
+class UnixConversionHTTPServer(_ConverterServerMixin, ThreadingMixIn, UnixStreamServer):
+    def server_bind(self) -> None:
+        # Replace a stale socket file left behind by a previous run, but never
+        # anything else that happens to be at the path.
+        try:
+            mode = os.lstat(self.server_address).st_mode
+        except FileNotFoundError:
+            pass
+        else:
+            if not stat.S_ISSOCK(mode):
+                raise FileExistsError(errno.EEXIST, "path exists and is not a socket", self.server_address)
+            os.unlink(self.server_address)
+        super().server_bind()
+
+    def get_request(self):
+        request, _ = self.socket.accept()
+        return request, ("unix", 0)
+
+
+def make_server(host: str = "127.0.0.1", port: int = 8765, unix_socket: Optional[str] = None, converter=None, verbose: bool = False):
+    """Create (but don't start) a conversion server on localhost or a Unix domain socket."""
+    if unix_socket:
+        if not hasattr(socket, "AF_UNIX"):
+            raise OSError("Unix domain sockets are not supported on this platform")
+        server = UnixConversionHTTPServer(unix_socket, _UnixRequestHandler)
+    else:
+        server = ConversionHTTPServer((host, port), ConversionRequestHandler)
+    server.setup_converter(converter, verbose=verbose)
+    return server
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description="Serve Markdown to BBCode conversions from a warm, long-running process.")
+    parser.add_argument("--host", default="127.0.0.1", help="Address to listen on (default: 127.0.0.1)")
+    parser.add_argument("--port", type=int, default=8765, help="TCP port to listen on (default: 8765)")
+    parser.add_argument("--unix-socket", help="Listen on this Unix domain socket path instead of TCP")
+    parser.add_argument("--cache-dir", help="Cache results in this directory (shared safely between processes)")
+    parser.add_argument("--cache-items", type=int, help="Results kept in the in-memory cache tier (default: 1024; 0 disables the cache unless --cache-dir is set)")
+    parser.add_argument("--verbose", action="store_true", help="Log every request to stderr")
+    args = parser.parse_args(argv)
+
+    converter = None
+    if args.cache_dir or args.cache_items:
+        from md2bbcode.cache import DEFAULT_MEMORY_ITEMS, ResultCache
+        from md2bbcode.main import Converter
+
+        memory_items = DEFAULT_MEMORY_ITEMS if args.cache_items is None else args.cache_items
+        converter = Converter(cache=ResultCache(args.cache_dir, memory_items=memory_items))
+
+    server = make_server(args.host, args.port, unix_socket=args.unix_socket, converter=converter, verbose=args.verbose)
+    where = args.unix_socket or "http://{}:{}".format(*server.server_address[:2])
+    print(f"md2bbcode server listening on {where}", file=sys.stderr)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        if args.unix_socket and os.path.exists(args.unix_socket):
+            os.unlink(args.unix_socket)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,329 @@
+# bounded-memory conversion for very large Markdown documents.
+# the input is read line by line and split at safe top-level block boundaries; each chunk
+# goes through both passes on its own and the BBCode is yielded as soon as it is ready.
+import re
+import shutil
+import tempfile
+from typing import IO, Iterable, Iterator, List, Optional, Union
+
+from md2bbcode.html2bbcode import ends_with_markup, needs_html_pass
+
+DEFAULT_CHUNK_SIZE = 1 << 20
+
+_FENCE_RE = re.compile(r"^ {0,3}(`{3,}|~{3,})")
+_LIST_MARKER_RE = re.compile(r"^(?:[*+-]|\d{1,9}[.)])(?:[ \t]|$)")
+_DEFINITION_RE = re.compile(r"^ {0,3}(?:\[\^?[^\]]+\]|\*\[[^\]]+\]):")
+_DEF_LIST_ITEM_RE = re.compile(r"^:[ \t]")
+_FOOTNOTE_DEFINITION_RE = re.compile(r"^ {0,3}\[\^[^\]]+\]:")
+_CODE_SPAN_RE = re.compile(r"(`+).+?\1")
+_HTML_TAG_RE = re.compile(r"<!--|-->|<(/?)([a-zA-Z][a-zA-Z0-9-]*)\b[^>]*?(/?)>")
+_VOID_TAGS = frozenset({
+    "area", "base", "br", "col", "embed", "hr", "img", "input", "link", "meta",
+    "param", "source", "track", "wbr",
+})
+
+
+class _BoundaryTracker:
+    """
+    Follows fenced code blocks, open HTML elements and definition lists line by line,
+    so the splitter only cuts where the next line starts a fresh top-level block that
+    neither Markdown nor the HTML pass would join to what came before.
+    """
+
+    def __init__(self) -> None:
+        self.fence: Optional[str] = None
+        self.open_tags: List[str] = []
+        self.in_comment = False
+        # mistune joins a term and its ": " definitions to a definition list that ends
+        # right before it, even across blank lines. After a definition, the next
+        # paragraph may be such a term until another block follows it.
+        self.def_list = False
+        self.def_term = False
+        self.previous_blank = True
+
+    def feed(self, line: str) -> None:
+        if self.fence is not None:
+            stripped = line.strip()
+            if stripped.startswith(self.fence) and stripped.strip(self.fence[0]) == "":
+                self.fence = None
+            return
+        if not self.open_tags and not self.in_comment:
+            self._feed_def_list(line)
+        m = _FENCE_RE.match(line)
+        if m and not self.open_tags and not self.in_comment:
+            self.fence = m.group(1)
+            return
+        if not self.open_tags and not self.in_comment and line.startswith("    "):
+            # Probably an indented code block; its contents aren't HTML.
+            return
+        self._feed_html(_CODE_SPAN_RE.sub("", line))
+
+    def _feed_def_list(self, line: str) -> None:
+        blank = not line.strip()
+        if _DEF_LIST_ITEM_RE.match(line):
+            self.def_list = True
+            self.def_term = False
+        elif _DEFINITION_RE.match(line):
+            # Definitions leave no token between the list and what follows.
+            pass
+        elif self.def_list and self.previous_blank and not blank and line[0] not in " \t":
+            if self.def_term:
+                # The paragraph before this block wasn't a term after all.
+                self.def_list = self.def_term = False
+            else:
+                self.def_term = True
+        self.previous_blank = blank
+
+    def _feed_html(self, line: str) -> None:
+        for m in _HTML_TAG_RE.finditer(line):
+            token = m.group(0)
+            if self.in_comment:
+                if token == "-->":
+                    self.in_comment = False
+                continue
+            if token == "<!--":
+                self.in_comment = True
+                continue
+            if token == "-->":
+                continue
+            closing, name, self_closing = m.group(1), m.group(2).lower(), m.group(3)
+            if closing:
+                if name in self.open_tags:
+                    # Like the HTML parser, a close tag closes everything opened after its match.
+                    index = len(self.open_tags) - 1 - self.open_tags[::-1].index(name)
+                    del self.open_tags[index:]
+            elif not self_closing and name not in _VOID_TAGS:
+                self.open_tags.append(name)
+
+    def can_split_before(self, line: str) -> bool:
+        if self.fence is not None or self.open_tags or self.in_comment:
+            return False
+        if self.def_list and not (self.def_term and self.previous_blank):
+            return False
+        if not line or line[0] in " \t:" or _FENCE_RE.match(line):
+            # Indented continuations, definition list bodies and fences (which
+            # merge_ordered_lists may attach to a preceding list) stay with their block.
+            return False
+        return not _LIST_MARKER_RE.match(line)
+
+
+def _pop_chunks(buffer: List[str], cuts: List[int]) -> List[str]:
+    # Removes and returns the chunks that end at each cut (an index into buffer).
+    chunks = []
+    start = 0
+    for cut in cuts:
+        chunks.append("".join(buffer[start:cut]))
+        start = cut
+    del buffer[:start]
+    return chunks
+
+
+def iter_chunks(lines: Iterable[str], chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[str]:
+    """Group Markdown lines into chunks of roughly chunk_size characters, cut only at safe block boundaries."""
+    tracker = _BoundaryTracker()
+    buffer: List[str] = []
+    size = 0
+    previous_blank = False
+    # Reference, footnote and abbreviation definitions leave no token, so the blocks on
+    # either side of them still join (a list continued, a ": " definition for the
+    # paragraph before). Cuts before definitions wait for the next block to decide.
+    pending: List[int] = []
+    held = 0
+    in_footnote = False
+    previous_definition = False
+    for line in lines:
+        blank = not line.strip()
+        definition = not blank and bool(_DEFINITION_RE.match(line))
+        if not blank and (previous_blank or previous_definition):
+            # Indented paragraphs after a footnote definition belong to it.
+            continued = in_footnote and line[0] in " \t"
+            if definition:
+                in_footnote = bool(_FOOTNOTE_DEFINITION_RE.match(line))
+            elif not continued:
+                in_footnote = False
+            if pending and not definition and not continued:
+                if tracker.can_split_before(line):
+                    yield from _pop_chunks(buffer, pending)
+                else:
+                    size += held
+                pending = []
+                held = 0
+            if previous_blank and size >= chunk_size and tracker.can_split_before(line):
+                if definition:
+                    pending.append(len(buffer))
+                    held += size
+                else:
+                    yield "".join(buffer)
+                    buffer = []
+                size = 0
+        buffer.append(line)
+        size += len(line)
+        tracker.feed(line)
+        previous_blank = blank
+        previous_definition = definition
+    yield from _pop_chunks(buffer, pending)
+    if buffer:
+        yield "".join(buffer)
+
+
+def collect_definitions(lines: Iterable[str]) -> str:
+    """
+    Return the source of every top-level reference link, footnote and abbreviation
+    definition, so each chunk can resolve references defined elsewhere in the document.
+    """
+    fence: Optional[str] = None
+    collected: List[str] = []
+    capturing = False
+    in_footnote = False
+    previous_blank = True
+    for line in lines:
+        if fence is not None:
+            stripped = line.strip()
+            if stripped.startswith(fence) and stripped.strip(fence[0]) == "":
+                fence = None
+            previous_blank = False
+            continue
+        m = _FENCE_RE.match(line)
+        if m:
+            fence = m.group(1)
+            capturing = in_footnote = False
+            previous_blank = False
+            continue
+
+        blank = not line.strip()
+        if blank:
+            if capturing:
+                collected.append(line)
+        elif _DEFINITION_RE.match(line):
+            capturing = True
+            in_footnote = bool(_FOOTNOTE_DEFINITION_RE.match(line))
+            collected.append(line)
+        elif capturing and not previous_blank:
+            # Continuation lines (e.g. a reference title on the next line).
+            collected.append(line)
+        elif capturing and in_footnote and line[0] in " \t":
+            # Indented paragraphs that belong to a multi-paragraph footnote.
+            collected.append(line)
+        else:
+            capturing = in_footnote = False
+        previous_blank = blank
+    return "".join(collected) + "\n"
+
+
+class StreamConverter:
+    """
+    Converts arbitrarily large Markdown sources chunk by chunk with bounded memory.
+
+    Reference links, footnotes and abbreviations are collected in a first pass over
+    the input and shared by every chunk, footnote numbering continues across chunks,
+    and the footnotes section is emitted once at the end.
+    """
+
+    def __init__(self, domain: Optional[str] = None, chunk_size: int = DEFAULT_CHUNK_SIZE) -> None:
+        import mistune
+        from mistune.plugins.footnotes import md_footnotes_hook
+
+        from md2bbcode.html2bbcode import HtmlToBbCodeConverter
+        from md2bbcode.main import default_plugins
+        from md2bbcode.renderers.bbcode import BBCodeRenderer
+
+        self.domain = domain
+        self.chunk_size = chunk_size
+        self.renderer = BBCodeRenderer(domain=domain)
+        self.markdown = mistune.create_markdown(renderer=self.renderer, plugins=default_plugins())
+        # Footnotes are rendered once, after the last chunk.
+        self._footnotes_hook = md_footnotes_hook
+        self.markdown.after_render_hooks.remove(md_footnotes_hook)
+        # A chunk parses its own definitions again. Reference links and footnotes keep
+        # the first definition, but the last abbreviation definition wins, so an earlier
+        # duplicate in the chunk would replace the document-wide one while it renders.
+        self._abbreviations: dict = {}
+        self.markdown.before_render_hooks.append(self._restore_abbreviations)
+        self.html_converter = HtmlToBbCodeConverter(domain=domain)
+
+    def _restore_abbreviations(self, markdown, state) -> None:
+        if self._abbreviations:
+            state.env["ref_abbrs"] = dict(self._abbreviations)
+
+    def _convert_html(self, bbcode_text: str) -> str:
+        if self.renderer.emitted_html or needs_html_pass(bbcode_text):
+            return self.html_converter.convert(bbcode_text)
+        return bbcode_text
+
+    def _new_state(self, env: dict):
+        state = self.markdown.block.state_cls()
+        state.env = env
+        return state
+
+    def iter_convert(self, source: IO[str]) -> Iterator[str]:
+        """Yield final BBCode for a seekable text source, one chunk at a time."""
+        start = source.tell()
+        definitions = collect_definitions(source)
+        source.seek(start)
+
+        env_state = self._new_state({"ref_links": {}})
+        env_state.process(definitions)
+        self.markdown.block.parse(env_state)
+        env = env_state.env
+        self._abbreviations = dict(env.get("ref_abbrs") or {})
+
+        # BeautifulSoup collapses whitespace-only text between tags to a single "\n", so
+        # whitespace at a chunk edge has to land on the same side of a tag as it would
+        # in the whole document: trailing whitespace after a tag moves to the next chunk.
+        # After text (even text ending in a literal ">") it stays, as the text node keeps it.
+        # The last chunk is converted together with the footnotes, as they are in the
+        # whole document, with its trailing whitespace unchanged.
+        pending = bbcode_text = ""
+        self.renderer.emitted_html = False
+        chunks = iter_chunks(source, self.chunk_size)
+        chunk = next(chunks, None)
+        while chunk is not None:
+            following = next(chunks, None)
+            self.renderer.emitted_html = False
+            bbcode_text = pending + self.markdown.parse(chunk, state=self._new_state(env))[0]
+            pending = ""
+            if following is None:
+                break
+            chunk = following
+            body = bbcode_text.rstrip()
+            if not body:
+                pending = bbcode_text
+                continue
+            if ends_with_markup(body):
+                pending = bbcode_text[len(body):]
+                bbcode_text = body
+            yield self._convert_html(bbcode_text)
+
+        footnotes = self._footnotes_hook(self.markdown, "", self._new_state(env))
+        if bbcode_text or footnotes:
+            yield self._convert_html(bbcode_text + footnotes)
+
+
+def iter_convert(
+    source: Union[str, IO[str]],
+    domain: Optional[str] = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+) -> Iterator[str]:
+    """
+    Yield the BBCode for a large Markdown document piece by piece. `source` is a
+    file path, "-" for stdin, or a text file object; non-seekable streams are
+    spooled to a temporary file first because definitions are collected up front.
+    """
+    converter = StreamConverter(domain=domain, chunk_size=chunk_size)
+    if isinstance(source, str):
+        if source == "-":
+            import sys
+
+            source = sys.stdin
+        else:
+            with open(source, "r", encoding="utf-8") as file:
+                yield from converter.iter_convert(file)
+            return
+
+    if source.seekable():
+        yield from converter.iter_convert(source)
+        return
+    with tempfile.TemporaryFile("w+", encoding="utf-8") as spool:
+        shutil.copyfileobj(source, spool)
+        spool.seek(0)
+        yield from converter.iter_convert(spool)
@@ -0,0 +1,56 @@
+# URL handling shared by the Markdown renderer and the HTML pass. Badge-heavy READMEs repeat
+# the same URLs many times, so parsing, domain resolution and image rewriting are memoized
+# in bounded LRU caches that live for the whole process.
+from functools import lru_cache
+from typing import Dict, Optional
+from urllib.parse import ParseResult, urljoin, urlparse
+
+from md2bbcode.image_rewrite import rewrite_svg_url
+
+URL_CACHE_SIZE = 4096
+
+_HARMFUL_SCHEMES = ("javascript:", "vbscript:", "data:")
+
+
+@lru_cache(maxsize=URL_CACHE_SIZE)
+def parse_url(url: str) -> ParseResult:
+    """urlparse, parsed once per distinct URL."""
+    return urlparse(url)
+
+
+@lru_cache(maxsize=URL_CACHE_SIZE)
+def _resolve_url(url: str, domain: str) -> str:
+    if url.startswith(_HARMFUL_SCHEMES):
+        return "#harmful-link"
+    if domain and not parse_url(url).netloc:
+        return urljoin(domain, url)
+    return url
+
+
+def resolve_url(url: str, domain: Optional[str] = None) -> str:
+    """
+    Sanitize a link or image URL and make it absolute against `domain` when it
+    has no host of its own.
+    """
+    return _resolve_url(url, domain or "")
+
+
+@lru_cache(maxsize=URL_CACHE_SIZE)
+def image_url(url: str) -> Optional[str]:
+    """rewrite_svg_url for an already resolved URL, reusing its parse."""
+    if not url:
+        return url
+    return rewrite_svg_url(url, parse_url(url))
+
+
+def url_cache_stats() -> Dict[str, Dict[str, int]]:
+    stats = {}
+    for name, func in (("parse", parse_url), ("resolve", _resolve_url), ("image", image_url)):
+        info = func.cache_info()
+        stats[name] = {"hits": info.hits, "misses": info.misses, "size": info.currsize, "maxsize": info.maxsize}
+    return stats
+
+
+def clear_url_caches() -> None:
+    for func in (parse_url, _resolve_url, image_url):
+        func.cache_clear()
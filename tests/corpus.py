@@ -0,0 +1,97 @@
+# Markdown documents collected from the test suite, used by tests that check alternative
+# conversion paths produce exactly the same output as the default pipeline.
+import os
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+
+def _read(relpath):
+    with open(os.path.join(REPO_ROOT, relpath), "r", encoding="utf-8") as file:
+        return file.read()
+
+
+MARKDOWN_CORPUS = [
+    _read("README.md"),
+    "# Hell World",
+    "",
+    "\n\n",
+    "Plain paragraph with no markup at all.\n",
+    "Tom & Jerry, 1 < 2, AT&amp;T and &lt;b&gt;escaped&lt;/b&gt;\n",
+    "Some **bold**, *italic*, ~~struck~~, `code` and a [link](https://example.com).\n",
+    "> [!NOTE]\n> Body for note.\n",
+    "> Just a quote.\n> Still quoted.\n",
+    "> [!FOO]\n> Not a supported GitHub alert type.\n",
+    '<font color="red" size="3" face="Times New Roman">Hello</font>\n',
+    (
+        '<span style="color: #f00; font-size: 12px; font-family: Arial; '
+        'font-weight: bold; font-style: italic; text-decoration: underline line-through;">X</span>\n'
+    ),
+    '<font color="red">Red</font> and `<font color="red">Code</font>`\n',
+    (
+        "<b>bold</b> <i>italic</i> <u>under</u> <s>strike</s> "
+        "<ins>insert</ins> <mark>mark</mark> <kbd>kbd</kbd><br>"
+        "<a href=\"https://example.com\">link</a> "
+        "<img src=\"https://example.com/x.png\" alt=\"alt text\">"
+        "<hr>"
+    ),
+    "<pre><code class=\"language-python\">print('hi')</code></pre> and <code>inline</code>",
+    (
+        "<ul><li>One</li><li>Two</li></ul>"
+        "<ol><li>First</li><li>Second</li></ol>"
+        "<table>"
+        "<tr><th>H</th><th>H2</th></tr>"
+        "<tr><td>A</td><td>B</td></tr>"
+        "</table>"
+    ),
+    (
+        "<a name=\"section\">Target</a> "
+        "<a href=\"#section\">Jump</a> "
+        "<abbr title=\"World Health Organization\">WHO</abbr>"
+    ),
+    (
+        "<a href=\"mailto:test@example.com?subject=Hello\">Email</a> "
+        "<p style=\"text-align:center\">Centered</p>"
+        "<div align=\"right\"><b>Right</b></div>"
+        "<blockquote data-author=\"Alice\">Quoted</blockquote>"
+    ),
+    "<span><b>Bold</b></span><div><i>Italic</i></div>",
+    "<custom-tag data-x=\"1\"><b>Bold</b></custom-tag>",
+    (
+        "Before\n\n"
+        "<!-- BEGIN GENERATED CLI REFERENCE -->\n\n"
+        "Middle\n\n"
+        "<!-- END GENERATED CLI REFERENCE -->\n\n"
+        "After"
+    ),
+    """
+Some ==highlighted== text and a footnote.[^1]
+
+![pixel art](https://example.com/pixel.png)
+
+> [!TIP]
+> A GitHub-style alert should become a custom BBCode.
+
+---
+
+Water is H<sub>2</sub>O.
+
+The HTML specification is maintained by the W3C.
+
+*[HTML]: Hyper Text Markup Language
+*[W3C]: World Wide Web Consortium
+
+[^1]: This is the footnote.
+""".lstrip(),
+    (
+        "[![Publish to PyPI](https://github.com/RedGuides/md2bbcode/actions/workflows/publish.yml/badge.svg)]"
+        "(https://github.com/RedGuides/md2bbcode/actions/workflows/publish.yml)"
+    ),
+    '<img src="https://example.com/asset.svg?x=1&y=2" alt="Alt text">',
+    "![alt](https://example.com/x.png) and ![logo](images/logo.svg) and [docs](docs/index.md)\n",
+    "1. one\n2. two\n\n```python\nprint('attached')\n```\n\n3. three\n\n- [ ] todo\n- [x] done\n",
+    "| a | b |\n| :- | -: |\n| 1 | 2 |\n| `x` | **y** |\n",
+    "Term\n: Definition\n\n>! spoiler\n\nInline >!spoiler!< ^sup^ ~sub~ ++ins++\n",
+    "```\n[code]literal[/code] <b>not html</b> & stays\n```\n",
+    "Literal \x1a1\x1a token-like text\n",
+    "#### Deep heading\n\n***\n\nLine one  \nLine two\n",
+]
@@ -0,0 +1,149 @@
+import asyncio
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from md2bbcode import aio, amap, aprocess_readme
+from md2bbcode.aio import AsyncConverter
+from md2bbcode.main import get_default_converter, process_readme
+
+
+def test_aprocess_readme_matches_sync():
+    markdown = "![x](x.png) **bold** <b>html</b>\n"
+    result = asyncio.run(aprocess_readme(markdown, "https://example.com/"))
+    assert result == process_readme(markdown, "https://example.com/")
+
+
+def test_amap_preserves_order_and_per_item_domains():
+    items = [f"*post {i}* ![x](x{i}.png)" for i in range(10)] + [("![y](y.png)", "https://d.example/")]
+    results = asyncio.run(amap(items, domain="https://example.com/"))
+
+    assert results[:10] == [process_readme(item, "https://example.com/") for item in items[:10]]
+    assert "https://d.example/y.png" in results[10]
+
+
+def test_event_loop_stays_responsive():
+    big = "\n\n".join(f"Paragraph {i} with **bold** and <i>html</i>." for i in range(3000))
+
+    async def run():
+        ticks = 0
+        done = asyncio.Event()
+
+        async def ticker():
+            nonlocal ticks
+            while not done.is_set():
+                ticks += 1
+                await asyncio.sleep(0)
+
+        tick_task = asyncio.ensure_future(ticker())
+        async with AsyncConverter(max_concurrency=1) as converter:
+            result = await converter.convert(big)
+        done.set()
+        await tick_task
+        return ticks, result
+
+    ticks, result = asyncio.run(run())
+    assert ticks > 10
+    assert result == process_readme(big)
+
+
+def test_concurrency_limit_and_cancellation(monkeypatch):
+    started = []
+    release = threading.Event()
+
+    def blocking(markdown_text, domain):
+        started.append(markdown_text)
+        release.wait(5)
+        return process_readme(markdown_text, domain)
+
+    monkeypatch.setattr(aio, "_convert", blocking)
+
+    async def run():
+        converter = AsyncConverter(max_concurrency=1)
+        first = asyncio.ensure_future(converter.convert("*first*"))
+        second = asyncio.ensure_future(converter.convert("*second*"))
+        await asyncio.sleep(0.05)
+        # Only one conversion may run at a time; the queued one can be cancelled.
+        assert started == ["*first*"]
+        second.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await second
+        release.set()
+        assert await first == process_readme("*first*")
+        assert await converter.convert("*after*") == process_readme("*after*")
+        assert started == ["*first*", "*after*"]
+        converter.close()
+
+    asyncio.run(run())
+
+
+def test_shared_converter_from_many_threads():
+    # Documents whose output depends on the domain and on the HTML pass, so state
+    # leaking between overlapping calls on the shared Converter changes the result.
+    documents = [
+        (f"# Doc {i}\n\n![img](img{i}.png) [link](page{i}.html) **bold** <b>html {i}</b>\n\n"
+         f"* item\n  * nested <i>{i}</i>\n\n<details><summary>s</summary>\n\nbody {i}\n</details>\n",
+         f"https://site{i % 3}.example/" if i % 4 else None)
+        for i in range(12)
+    ]
+    converter = get_default_converter()
+    expected = [converter.convert(markdown, domain=domain) for markdown, domain in documents]
+    switch_interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+    try:
+        barrier = threading.Barrier(8)
+
+        def worker(offset):
+            barrier.wait()
+            results = {}
+            for round_ in range(5):
+                for index in range(len(documents)):
+                    index = (index + offset + round_) % len(documents)
+                    markdown, domain = documents[index]
+                    if (index + round_) % 2:
+                        result = process_readme(markdown, domain)
+                    else:
+                        result = converter.convert(markdown, domain=domain)
+                    results.setdefault(index, []).append(result)
+            return results
+
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            outcomes = list(pool.map(worker, range(8)))
+    finally:
+        sys.setswitchinterval(switch_interval)
+
+    assert get_default_converter() is converter
+    for results in outcomes:
+        for index, outputs in results.items():
+            assert outputs == [expected[index]] * len(outputs)
+
+
+def test_process_pool_converter():
+    async def run():
+        async with AsyncConverter(max_concurrency=2, processes=True) as converter:
+            return await converter.map(["*a*", "**b**"])
+
+    assert asyncio.run(run()) == [process_readme("*a*"), process_readme("**b**")]
+
+
+def _worker_converter():
+    aio._convert("*x*", None)
+    return aio._worker_state.converter
+
+
+def test_thread_workers_use_their_own_converter():
+    async def run():
+        async with AsyncConverter(max_concurrency=2) as converter:
+            loop = asyncio.get_running_loop()
+            # Each worker thread builds one Converter on first use and keeps it.
+            owners = await asyncio.gather(
+                *(loop.run_in_executor(converter.executor, _worker_converter) for _ in range(8))
+            )
+            return owners, await converter.map(["*a*", "**b**"])
+
+    owners, results = asyncio.run(run())
+    assert results == [process_readme("*a*"), process_readme("**b**")]
+    assert len({id(owner) for owner in owners}) <= 2
+    assert all(owner is not get_default_converter() for owner in owners)
@@ -0,0 +1,134 @@
+import json
+import os
+
+from md2bbcode import _version
+from md2bbcode.batch import MANIFEST_NAME, convert_tree
+from md2bbcode.main import main, process_readme
+
+
+def _write(path, text):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as file:
+        file.write(text)
+
+
+def _read(path):
+    with open(path, "r", encoding="utf-8") as file:
+        return file.read()
+
+
+def test_convert_tree_mirrors_directory(tmp_path):
+    src = tmp_path / "docs"
+    out = tmp_path / "out"
+    _write(str(src / "index.md"), "# Index\n")
+    _write(str(src / "guide" / "setup.markdown"), "Some **bold** text\n")
+    _write(str(src / "notes.txt"), "not markdown\n")
+
+    result = convert_tree(str(src), str(out), jobs=1)
+
+    assert sorted(result.converted) == ["guide/setup.markdown", "index.md"]
+    assert _read(str(out / "index.bbcode")) == process_readme("# Index\n")
+    assert "[b]bold[/b]" in _read(str(out / "guide" / "setup.bbcode"))
+    assert not (out / "notes.bbcode").exists()
+
+
+def test_rerun_only_converts_changed_files(tmp_path):
+    src = tmp_path / "docs"
+    out = tmp_path / "out"
+    _write(str(src / "a.md"), "A\n")
+    _write(str(src / "b.md"), "B\n")
+    convert_tree(str(src), str(out), jobs=1)
+
+    _write(str(src / "b.md"), "B changed\n")
+    os.remove(str(src / "a.md"))
+    _write(str(src / "c.md"), "C\n")
+    result = convert_tree(str(src), str(out), jobs=1)
+
+    assert sorted(result.converted) == ["b.md", "c.md"]
+    assert result.removed == ["a.md"]
+    assert not (out / "a.bbcode").exists()
+
+    result = convert_tree(str(src), str(out), jobs=1)
+    assert result.converted == []
+    assert sorted(result.skipped) == ["b.md", "c.md"]
+
+
+def test_changed_options_invalidate_manifest(tmp_path):
+    src = tmp_path / "docs"
+    out = tmp_path / "out"
+    _write(str(src / "a.md"), "![x](img.png)\n")
+    convert_tree(str(src), str(out), jobs=1)
+
+    result = convert_tree(str(src), str(out), domain="https://example.com/", jobs=1)
+
+    assert result.converted == ["a.md"]
+    assert "https://example.com/img.png" in _read(str(out / "a.bbcode"))
+    with open(str(out / MANIFEST_NAME), encoding="utf-8") as file:
+        manifest = json.load(file)
+    assert manifest["options"] == {"domain": "https://example.com/"}
+    assert "a.md" in manifest["files"]
+
+
+def test_colliding_outputs_are_reported(tmp_path):
+    src = tmp_path / "docs"
+    out = tmp_path / "out"
+    _write(str(src / "a.md"), "from md\n")
+    _write(str(src / "a.markdown"), "from markdown\n")
+
+    result = convert_tree(str(src), str(out), jobs=1)
+
+    assert result.converted == ["a.markdown"]
+    assert list(result.failed) == ["a.md"]
+    assert "a.bbcode" in result.failed["a.md"] and "a.markdown" in result.failed["a.md"]
+    assert "from markdown" in _read(str(out / "a.bbcode"))
+
+    # The surviving output isn't removed when the losing file was converted earlier.
+    os.remove(str(src / "a.markdown"))
+    convert_tree(str(src), str(out), jobs=1)
+    _write(str(src / "a.markdown"), "from markdown\n")
+    result = convert_tree(str(src), str(out), jobs=1)
+    assert result.removed == []
+    assert "from markdown" in _read(str(out / "a.bbcode"))
+
+
+def test_source_checkout_version_follows_the_code(monkeypatch):
+    from importlib import metadata
+
+    def missing(name):
+        raise metadata.PackageNotFoundError(name)
+
+    monkeypatch.setattr(metadata, "distribution", missing)
+    _version.get_version.cache_clear()
+    try:
+        version = _version.get_version()
+        assert version == f"0+src.{_version._source_digest()}"
+        monkeypatch.setattr(_version, "_source_digest", lambda: "changed")
+        _version.get_version.cache_clear()
+        assert _version.get_version() != version
+    finally:
+        monkeypatch.undo()
+        _version.get_version.cache_clear()
+
+
+def test_worker_pool_matches_serial_output(tmp_path):
+    src = tmp_path / "docs"
+    for i in range(6):
+        _write(str(src / f"doc{i}.md"), f"# Doc {i}\n\n* item {i}\n")
+
+    convert_tree(str(src), str(tmp_path / "serial"), jobs=1)
+    result = convert_tree(str(src), str(tmp_path / "parallel"), jobs=2)
+
+    assert len(result.converted) == 6
+    for i in range(6):
+        name = f"doc{i}.bbcode"
+        assert _read(str(tmp_path / "parallel" / name)) == _read(str(tmp_path / "serial" / name))
+
+
+def test_cli_directory_mode(tmp_path, capsys):
+    src = tmp_path / "docs"
+    _write(str(src / "a.md"), "*hi*\n")
+
+    main([str(src), "-o", str(tmp_path / "out"), "-j", "1"])
+
+    assert "[i]hi[/i]" in _read(str(tmp_path / "out" / "a.bbcode"))
+    assert "converted 1" in capsys.readouterr().err
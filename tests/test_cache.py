@@ -0,0 +1,137 @@
+import errno
+import multiprocessing
+import os
+import tempfile
+
+from md2bbcode.cache import ResultCache, cache_key
+from md2bbcode.main import Converter, process_readme
+
+
+def test_memory_tier_hits_and_lru_eviction():
+    cache = ResultCache(memory_items=2)
+    cache.put("a", "A")
+    cache.put("b", "B")
+    assert cache.get("a") == "A"
+    cache.put("c", "C")
+
+    assert cache.get("b") is None
+    assert cache.get("a") == "A"
+    assert cache.get("c") == "C"
+    stats = cache.stats()
+    assert stats["memory_hits"] == 3
+    assert stats["misses"] == 1
+
+
+def test_disk_tier_survives_new_instance(tmp_path):
+    ResultCache(str(tmp_path)).put("k" * 64, "[b]x[/b]\n")
+
+    fresh = ResultCache(str(tmp_path))
+    assert fresh.get("k" * 64) == "[b]x[/b]\n"
+    assert fresh.stats()["disk_hits"] == 1
+    # A disk hit is promoted to the memory tier.
+    assert fresh.get("k" * 64) == "[b]x[/b]\n"
+    assert fresh.stats()["memory_hits"] == 1
+
+
+def test_disk_tier_evicts_least_recently_used(tmp_path):
+    cache = ResultCache(str(tmp_path), memory_items=0, max_bytes=250)
+    keys = [f"{i:02d}" + "0" * 62 for i in range(3)]
+    for i, key in enumerate(keys[:2]):
+        cache.put(key, str(i) * 100)
+        os.utime(cache._path(key), (1000 + i, 1000 + i))
+    # Touching entry 0 makes entry 1 the least recently used one when entry 2 overflows the cap.
+    cache.get(keys[0])
+    cache.put(keys[2], "2" * 100)
+
+    assert cache.get(keys[1]) is None
+    assert cache.get(keys[0]) == "0" * 100
+    assert cache.get(keys[2]) == "2" * 100
+    assert cache.stats()["evictions"] == 1
+
+
+def test_overwriting_an_entry_keeps_disk_budget(tmp_path):
+    cache = ResultCache(str(tmp_path), memory_items=0, max_bytes=250)
+    keys = ["a" * 64, "b" * 64]
+    cache.put(keys[0], "0" * 100)
+    for _ in range(5):
+        cache.put(keys[1], "1" * 100)
+
+    assert cache._disk_bytes == 200
+    assert cache.stats()["evictions"] == 0
+    assert cache.get(keys[0]) == "0" * 100
+
+
+def test_unreadable_disk_entry_is_a_miss(tmp_path):
+    cache = ResultCache(str(tmp_path), memory_items=0)
+    key = "c" * 64
+    cache.put(key, "[b]x[/b]\n")
+    with open(cache._path(key), "wb") as file:
+        file.write(b"\xff\xfe[b]")
+
+    assert cache.get(key) is None
+    assert not os.path.exists(cache._path(key))
+    assert cache.stats()["misses"] == 1
+    cache.put(key, "[b]y[/b]\n")
+    assert cache.get(key) == "[b]y[/b]\n"
+
+
+def test_key_covers_domain_plugins_and_version():
+    base = cache_key("text", None, ["p"], version="1.0")
+    assert base == cache_key("text", "", ["p"], version="1.0")
+    assert base != cache_key("text", "https://example.com/", ["p"], version="1.0")
+    assert base != cache_key("text", None, ["p", "q"], version="1.0")
+    assert base != cache_key("text", None, ["p"], version="1.1")
+    assert base != cache_key("text2", None, ["p"], version="1.0")
+
+
+def test_converter_uses_cache(tmp_path):
+    cache = ResultCache(str(tmp_path))
+    converter = Converter(cache=cache)
+    markdown = "![x](x.png) <b>hi</b>\n"
+
+    first = converter.convert(markdown, domain="https://example.com/")
+    second = converter.convert(markdown, domain="https://example.com/")
+    other = converter.convert(markdown, domain="https://other.example/")
+
+    assert first == second == process_readme(markdown, "https://example.com/")
+    assert other != first
+    assert cache.stats()["memory_hits"] == 1
+    assert cache.stats()["misses"] == 2
+
+
+def test_failed_disk_write_keeps_the_result(tmp_path, monkeypatch):
+    def no_space(*args, **kwargs):
+        raise OSError(errno.ENOSPC, "No space left on device")
+
+    cache = ResultCache(str(tmp_path))
+    monkeypatch.setattr(tempfile, "mkstemp", no_space)
+    converter = Converter(cache=cache)
+    markdown = "Some **bold** text\n"
+
+    assert converter.convert(markdown) == process_readme(markdown)
+    assert converter.convert(markdown) == process_readme(markdown)
+    stats = cache.stats()
+    assert stats["write_errors"] == 1
+    assert stats["memory_hits"] == 1
+    assert stats["writes"] == 0
+
+
+def _convert_in_child(directory, markdown, queue):
+    cache = ResultCache(directory)
+    result = process_readme(markdown, cache=cache)
+    queue.put((result, cache.stats()))
+
+
+def test_cache_directory_shared_between_processes(tmp_path):
+    markdown = "# Shared\n\n*cached*\n"
+    process_readme(markdown, cache=ResultCache(str(tmp_path)))
+
+    ctx = multiprocessing.get_context("spawn")
+    queue = ctx.Queue()
+    child = ctx.Process(target=_convert_in_child, args=(str(tmp_path), markdown, queue))
+    child.start()
+    result, stats = queue.get(timeout=30)
+    child.join(timeout=30)
+
+    assert result == process_readme(markdown)
+    assert stats["disk_hits"] == 1
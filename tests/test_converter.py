@@ -0,0 +1,54 @@
+import threading
+
+from md2bbcode import Converter, process_readme
+from md2bbcode.html2bbcode import get_default_html_converter, process_html
+from md2bbcode.main import get_default_converter
+
+
+def test_converter_is_reusable_across_domains():
+    converter = Converter()
+    markdown = "![logo](images/logo.png) and [docs](docs/index.md)\n"
+
+    first = converter.convert(markdown, domain="https://example.com/repo/")
+    second = converter.convert(markdown, domain="https://other.example/")
+    third = converter.convert(markdown, domain="https://example.com/repo/")
+
+    assert "https://example.com/repo/images/logo.png" in first
+    assert "https://other.example/docs/index.md" in second
+    assert first == third
+
+
+def test_process_readme_matches_converter_output():
+    markdown = "# Title\n\nSome **bold** text.<br>\n\n1. one\n2. two\n"
+    assert process_readme(markdown, domain="") == Converter().convert(markdown, domain="")
+
+
+def test_passes_run_step_by_step():
+    converter = Converter()
+    markdown = "![x](x.png) **bold** <b>html</b>\n\nplain\n"
+    with converter.lock:
+        first_pass = converter.render_markdown(markdown, "https://example.com/")
+        emitted_html = converter.renderer.emitted_html
+        assert converter.html_pass(first_pass, "https://example.com/", emitted_html) == converter.convert(
+            markdown, "https://example.com/"
+        )
+
+
+def test_default_converter_is_shared():
+    assert get_default_converter() is get_default_converter()
+
+
+def test_default_html_converter_is_shared_per_options():
+    converter = get_default_html_converter("https://example.com/")
+    assert get_default_html_converter("https://example.com/") is converter
+    assert get_default_html_converter("https://example.com/", engine="events") is not converter
+    assert get_default_html_converter("https://example.org/") is not converter
+    assert process_html('<a href="x">x</a>', domain="https://example.com/") == "[URL=https://example.com/x]x[/URL]"
+
+
+def test_default_html_converter_is_per_thread():
+    converters = []
+    thread = threading.Thread(target=lambda: converters.append(get_default_html_converter(engine="events")))
+    thread.start()
+    thread.join()
+    assert converters[0] is not get_default_html_converter(engine="events")
@@ -0,0 +1,107 @@
+import random
+
+import pytest
+
+from md2bbcode.html2bbcode import HTML_ENGINES, HtmlToBbCodeConverter, html_to_bbcode
+from md2bbcode.main import Converter
+from tests.corpus import MARKDOWN_CORPUS
+
+DOMAIN = "https://example.com/repo/"
+
+
+@pytest.mark.parametrize("markdown", MARKDOWN_CORPUS)
+@pytest.mark.parametrize("html_islands", [True, False])
+def test_events_engine_matches_soup_on_corpus(markdown, html_islands):
+    soup = Converter(html_islands=html_islands)
+    events = Converter(html_islands=html_islands, html_engine="events")
+    assert events.convert(markdown, DOMAIN) == soup.convert(markdown, DOMAIN)
+    assert events.convert(markdown) == soup.convert(markdown)
+
+
+@pytest.mark.parametrize(
+    "html",
+    [
+        "<details><summary>Title <b>bold</b></summary>body <i>it</i></details>",
+        "<details>no summary</details>",
+        "<details><details><summary>inner</summary>x</details><summary>outer</summary></details>",
+        "<details><summary>a<summary>nested</summary></summary>rest</details>",
+        "<details><details><summary><code><summary>x</code></details>",
+        '<pre><code class="language-python">if a &lt; b:\n    pass</code></pre>',
+        "<pre>  plain\n\n  text  </pre>",
+        '<pre><b>x</b><code class="lang-js">y</code></pre>',
+        "<table><thead><tr><th align=center>H</th></tr></thead><tbody><tr><td style=\"text-align:right\">1</td></tr></tbody></table>",
+        "<table><tr><td>unclosed<td>cells</table>",
+        '<span style="color: #27F573; font-size: 12px; font-family: Times New Roman; font-weight: bold">s</span>',
+        '<font color="red" size="3" face="Arial">f</font>',
+        '<div align="center">c</div><p style="text-align: left">p</p>',
+        "<html><head><title>t</title></head><body>first</body><body>second</body></html>",
+        "before<body>inside</body>after",
+        "&amp; &lt; &gt; &nbsp; &copy &foo; &#65; &#x41; &#0; &#128; &#x110000;",
+        "<script>a < b && c</script><style>p { x: 1 }</style><template><b>t</b></template>",
+        "<ruby>漢<rp>(</rp><rt>kan</rt><rp>)</rp></ruby>",
+        "<!-- comment --><![CDATA[data]]><?pi x?><!DOCTYPE html><!ELEMENT x>",
+        "<a href=\"mailto:me@example.com\">mail</a> <a href=\"#top\">top</a> <a name=\"n\">anchor</a>",
+        "<img src=\"pic.svg\" alt=\"a'b\"><img alt=\"no src\"><abbr title=\"T\">ab</abbr><abbr>plain</abbr>",
+        "<ul><li>one<li>two<ol><li>three</ol></ul>",
+        "<br></br><br/><hr><kbd>Ctrl</kbd><code>x</code>",
+        "</b>stray</p></div><b>unclosed <i>tags",
+        "<blockquote data-author=\"Jo\">q</blockquote><sup>2</sup><sub>2</sub>",
+        "[b]bbcode[/b] <mark>m</mark> <ins>i</ins> <del>d</del> <strike>s</strike>",
+    ],
+)
+@pytest.mark.parametrize("domain", [None, DOMAIN])
+def test_events_engine_matches_soup(html, domain):
+    assert html_to_bbcode(html, domain=domain, engine="events") == html_to_bbcode(html, domain=domain)
+
+
+_TAGS = [
+    "b", "i", "u", "s", "em", "span", "div", "font", "p", "blockquote", "pre", "code", "kbd", "details",
+    "summary", "a", "abbr", "img", "br", "hr", "ul", "ol", "li", "table", "tr", "td", "th", "thead",
+    "body", "script", "style", "rt", "template", "textarea", "meta", "x-y",
+]
+_ATTRS = [
+    "", ' style="color: red; font-size: 12px"', ' style="text-align:center"', ' class="language-py x"',
+    ' align="right"', ' href="https://e.com/?a=1&amp;b=2"', ' href="mailto:a@b.c"', ' href="rel/x.svg"',
+    ' name="n"', ' src="pic.png"', ' alt="a\'b"', ' title="T"', ' charset="latin1"', ' rel="a  b"',
+    ' disabled', ' face="Times New Roman"', ' x="<&>"',
+]
+_TEXTS = [
+    "text", " ", "\n", "  \n ", "a&amp;b", "&lt;x&gt;", "&foo;", "&#65;", "&#128;", "&nbsp;", "x < y",
+    "\x1a0\x1a", "é", "[b]bb[/b]", "&", "<!-- c -->", "<![CDATA[cd]]>", "<?pi ?>", "<!DOCTYPE html>",
+    "</br>", "</p>", "</summary>", "<br/>", "<div/>", "</x-y>",
+]
+
+
+def _random_markup(rng, depth=0):
+    out = []
+    for _ in range(rng.randint(1, 6)):
+        if rng.random() < 0.4 and depth < 5:
+            tag = rng.choice(_TAGS)
+            out.append(f"<{tag}{rng.choice(_ATTRS)}>")
+            out.append(_random_markup(rng, depth + 1))
+            if rng.random() < 0.8:
+                out.append(f"</{tag}>")
+        else:
+            out.append(rng.choice(_TEXTS))
+    return "".join(out)
+
+
+def test_events_engine_matches_soup_on_random_markup():
+    soup = HtmlToBbCodeConverter(domain="https://example.com/")
+    events = HtmlToBbCodeConverter(domain="https://example.com/", engine="events")
+    rng = random.Random(20)
+    for _ in range(3000):
+        html = _random_markup(rng)
+        assert events.convert(html) == soup.convert(html), html
+
+
+def test_events_engine_is_reusable():
+    converter = HtmlToBbCodeConverter(engine="events")
+    assert converter.convert("<b>unclosed <details><summary>s") == html_to_bbcode("<b>unclosed <details><summary>s")
+    assert converter.convert("<i>next</i>") == "[I]next[/I]"
+
+
+def test_unknown_engine_is_rejected():
+    assert HTML_ENGINES == ("soup", "events")
+    with pytest.raises(ValueError):
+        HtmlToBbCodeConverter(engine="dom")
@@ -0,0 +1,44 @@
+import pytest
+
+from md2bbcode.html2bbcode import needs_html_pass
+from md2bbcode.main import Converter
+from tests.corpus import MARKDOWN_CORPUS
+
+
+@pytest.mark.parametrize("markdown", MARKDOWN_CORPUS)
+def test_fast_path_output_is_identical(markdown):
+    fast = Converter(html_fast_path=True)
+    full = Converter(html_fast_path=False)
+    for domain in (None, "https://example.com/base/"):
+        assert fast.convert(markdown, domain=domain) == full.convert(markdown, domain=domain)
+
+
+def test_plain_markdown_skips_html_pass(monkeypatch):
+    converter = Converter()
+
+    def fail(_):
+        raise AssertionError("HTML pass should have been skipped")
+
+    monkeypatch.setattr(converter.html_converter, "convert", fail)
+    assert converter.convert("Some **bold** text\n\n* item\n") == "Some [b]bold[/b] text\n\n[list][*]item\n[/list]\n"
+
+
+def test_html_in_markdown_still_uses_html_pass():
+    converter = Converter()
+    assert "[B]x[/B]" in converter.convert("<b>x</b>\n")
+    assert converter.renderer.emitted_html
+
+
+@pytest.mark.parametrize(
+    "text, expected",
+    [
+        ("plain [b]bbcode[/b]\n", False),
+        ("", False),
+        ("a < b", True),
+        ("AT&T", True),
+        ("\x1a0\x1a", True),
+        ("\n\n", True),
+    ],
+)
+def test_needs_html_pass(text, expected):
+    assert needs_html_pass(text) is expected
@@ -0,0 +1,63 @@
+import random
+
+import pytest
+
+from md2bbcode.html2bbcode import HtmlToBbCodeConverter, find_html_islands
+from md2bbcode.main import Converter
+from tests.corpus import MARKDOWN_CORPUS
+
+
+@pytest.mark.parametrize("markdown", MARKDOWN_CORPUS)
+def test_islands_match_full_pass(markdown):
+    full = Converter(html_islands=False)
+    islands = Converter(html_islands=True)
+    assert islands.convert(markdown, "https://example.com/") == full.convert(markdown, "https://example.com/")
+
+
+def test_single_tag_in_large_document_is_a_small_island():
+    text = "plain [b]BBCode[/b] text\n\n" * 2000 + "line<br>break\n\n" + "more text\n\n" * 100
+    islands = find_html_islands(text)
+    assert len(islands) == 1
+    start, end = islands[0]
+    assert text[start:end] == "<br>"
+
+
+def test_elements_spanning_blocks_stay_in_one_island():
+    text = "intro " * 100 + "\n\n<details>\n<summary>Title</summary>\n\n" + "body text\n\n" * 50 + "</details>\n\n" + "tail " * 100
+    ((start, end),) = find_html_islands(text)
+    assert text[start:].startswith("<details>")
+    assert text[:end].endswith("</details>")
+
+
+@pytest.mark.parametrize(
+    "text, expected",
+    [
+        ("no markup at all", []),
+        ("AT&amp;T", [(0, 8)]),
+        ("<body>x</body>", None),
+        ("x" * 300 + "<b>unclosed" + "y" * 300, [(300, 611)]),
+        ("x" * 300 + "<script>1 < 2</script>" + "y" * 300, [(300, 622)]),
+        ("x" * 300 + "<!--->" + "y" * 300, [(0, 606)]),
+    ],
+)
+def test_find_html_islands(text, expected):
+    assert find_html_islands(text) == expected
+
+
+_PIECES = [
+    "<b>", "</b>", "<i>", "</i>", "<details>", "</details>", "<summary>", "</summary>", "<br>", "<br/>",
+    "</br>", "<p>", "</p>", "text ", "\n", "\n\n", "  ", "&amp;", "&foo;", "AT&T", "<!-- c -->", "<!--->",
+    '<a href="u>v">', "</a>", "<img src=x.svg>", "<x/>", "< b", "1<2", "<pre>", "</pre>",
+    "[ICODE]<b>[/ICODE]", '<span style="color:red">', "</span>", "<ul>", "<li>", "</li>", "</ul>",
+    "<!DOCTYPE x>", "<?pi?>", "x" * 300, "<script>", "</script>", "<body>", "<B>", "</B >", "</p\n>",
+    "<font color=red>", "</font>", "<blockquote>", "</blockquote>", "&#32;", "\x1a0\x1a", "<hr>",
+]
+
+
+def test_islands_match_full_pass_on_random_markup():
+    full = HtmlToBbCodeConverter(domain="https://example.com/")
+    islands = HtmlToBbCodeConverter(domain="https://example.com/", islands=True)
+    rng = random.Random(17)
+    for _ in range(3000):
+        text = "".join(rng.choice(_PIECES) for _ in range(rng.randint(1, 25)))
+        assert islands.convert(text) == full.convert(text), text
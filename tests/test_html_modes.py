@@ -0,0 +1,91 @@
+import random
+import time
+
+import pytest
+
+from md2bbcode.html2bbcode import HTML_CONVERT_MODES, HtmlToBbCodeConverter
+from md2bbcode.main import Converter
+from tests.corpus import MARKDOWN_CORPUS
+from tests.test_html_events import _random_markup
+
+DOMAIN = "https://example.com/repo/"
+OTHER_MODES = [mode for mode in HTML_CONVERT_MODES if mode != "recursive"]
+
+
+@pytest.mark.parametrize("mode", OTHER_MODES)
+@pytest.mark.parametrize("markdown", MARKDOWN_CORPUS)
+def test_mode_matches_recursive_on_corpus(markdown, mode):
+    recursive = Converter(html_mode="recursive")
+    other = Converter(html_mode=mode)
+    assert other.convert(markdown, DOMAIN) == recursive.convert(markdown, DOMAIN)
+
+
+@pytest.mark.parametrize("mode", OTHER_MODES)
+def test_mode_matches_recursive_on_random_markup(mode):
+    recursive = HtmlToBbCodeConverter(domain=DOMAIN)
+    other = HtmlToBbCodeConverter(domain=DOMAIN, mode=mode)
+    rng = random.Random(24)
+    for _ in range(3000):
+        html = _random_markup(rng)
+        assert other.convert(html) == recursive.convert(html), html
+
+
+@pytest.mark.parametrize("mode", OTHER_MODES)
+def test_details_summary_is_taken_from_the_buffer(mode):
+    converter = HtmlToBbCodeConverter(mode=mode)
+    html = (
+        '<div align="center"><details><summary> <b>Title</b> <i>here</i> </summary>'
+        '<table><tr><td style="text-align: right; color: red">cell</td></tr></table></details></div>'
+    )
+    assert converter.convert(html) == (
+        "[CENTER][SPOILER=[B]Title[/B] [I]here[/I]][TABLE]\n[TR]\n"
+        "[TD][RIGHT][COLOR=red]cell[/COLOR][/RIGHT][/TD]\n[/TR]\n[/TABLE]\n[/SPOILER][/CENTER]"
+    )
+
+
+@pytest.mark.parametrize("mode", OTHER_MODES)
+def test_mode_calls_replaced_handlers(mode):
+    converter = HtmlToBbCodeConverter(mode=mode)
+    converter.handlers["b"] = lambda tag: "[STRONG]" + tag.get_text().upper() + "[/STRONG]"
+    converter.handlers["details"] = lambda tag: "[D]"
+    html = '<i><b>bold</b></i> <details><summary>s</summary>x</details> <a href="mailto:a@b.c">mail</a>'
+    assert converter.convert(html) == "[I][STRONG]BOLD[/STRONG][/I] [D] [EMAIL]a@b.c[/EMAIL]"
+
+
+def test_replaced_handler_stays_on_its_instance():
+    # The dispatch tables are built once per class; each instance binds its own copy.
+    converter = HtmlToBbCodeConverter(mode="iterative")
+    converter.handlers["b"] = lambda tag: "[STRONG]" + tag.get_text() + "[/STRONG]"
+    assert converter.convert("<b>x</b>") == "[STRONG]x[/STRONG]"
+    assert HtmlToBbCodeConverter(mode="iterative").convert("<b>x</b>") == "[B]x[/B]"
+
+
+def test_buffered_mode_handles_deeper_nesting_than_recursive():
+    html = "<div><span>text" * 150 + "</span></div>" * 150
+    with pytest.raises(RecursionError):
+        HtmlToBbCodeConverter().convert(html)
+    result = HtmlToBbCodeConverter(mode="buffered").convert(html)
+    assert result == "text" * 150
+
+
+@pytest.mark.parametrize(
+    "opening, closing, expected",
+    [
+        ('<div style="color: red">', "</div>", "[COLOR=red]" * 20_000 + "x" + "[/COLOR]" * 20_000),
+        ("<span><font>", "</font></span>", "x"),
+        ("<details><summary>s</summary>", "</details>", "[SPOILER=s]" * 20_000 + "x" + "[/SPOILER]" * 20_000),
+    ],
+)
+@pytest.mark.parametrize("engine, mode", [("soup", "iterative"), ("events", "recursive")])
+def test_pathological_nesting_converts_in_linear_time(opening, closing, expected, engine, mode):
+    html = opening * 20_000 + "x" + closing * 20_000
+    converter = HtmlToBbCodeConverter(engine=engine, mode=mode)
+    start = time.perf_counter()
+    assert converter.convert(html) == expected
+    # One summary search per <details> used to make the last case quadratic.
+    assert time.perf_counter() - start < 10.0
+
+
+def test_unknown_mode_is_rejected():
+    with pytest.raises(ValueError):
+        HtmlToBbCodeConverter(mode="streaming")
@@ -0,0 +1,75 @@
+import importlib.util
+
+import pytest
+
+from md2bbcode import html2bbcode
+from md2bbcode.html2bbcode import (
+    HTML_PARSERS,
+    HtmlToBbCodeConverter,
+    available_html_parsers,
+    html_to_bbcode,
+    resolve_html_parser,
+)
+from md2bbcode.main import Converter, process_readme
+from tests.corpus import MARKDOWN_CORPUS
+
+DOMAIN = "https://example.com/repo/"
+
+
+# Differential check: every installed tree builder must convert the whole corpus
+# exactly as html.parser does. Backends that are not installed are reported as skipped.
+@pytest.mark.parametrize("parser", HTML_PARSERS)
+def test_backend_matches_html_parser_on_corpus(parser):
+    if parser not in available_html_parsers():
+        pytest.skip(f"{parser} is not installed")
+    converter = Converter(html_parser=parser, html_fast_path=False)
+    reference = Converter()
+    for markdown in MARKDOWN_CORPUS:
+        assert converter.convert(markdown, DOMAIN) == process_readme(markdown, DOMAIN), markdown
+        first_pass = reference.render_markdown(markdown, DOMAIN)
+        assert html_to_bbcode(first_pass, DOMAIN, parser=parser) == html_to_bbcode(first_pass, DOMAIN), markdown
+
+
+def test_html_parser_is_always_available():
+    assert available_html_parsers()[0] == "html.parser"
+    assert HtmlToBbCodeConverter().parser == "html.parser"
+
+
+def test_auto_prefers_lxml(monkeypatch):
+    monkeypatch.setattr(html2bbcode, "available_html_parsers", lambda: ("html.parser",))
+    assert resolve_html_parser("auto") == "html.parser"
+    monkeypatch.setattr(html2bbcode, "available_html_parsers", lambda: HTML_PARSERS)
+    assert resolve_html_parser("auto") == "lxml"
+    assert HtmlToBbCodeConverter(parser="auto").parser == "lxml"
+    # The events engine is built on html.parser whatever is installed.
+    assert HtmlToBbCodeConverter(engine="events", parser="auto").parser == "html.parser"
+
+
+def test_missing_or_unknown_parser_is_rejected(monkeypatch):
+    monkeypatch.setattr(html2bbcode, "available_html_parsers", lambda: ("html.parser",))
+    with pytest.raises(ValueError, match="not installed"):
+        resolve_html_parser("lxml")
+    with pytest.raises(ValueError, match="unknown parser"):
+        HtmlToBbCodeConverter(parser="html")
+    with pytest.raises(ValueError, match="events engine"):
+        HtmlToBbCodeConverter(engine="events", parser="html5lib")
+
+
+def test_other_backends_parse_the_whole_document(monkeypatch):
+    monkeypatch.setattr(html2bbcode, "available_html_parsers", lambda: HTML_PARSERS)
+    assert HtmlToBbCodeConverter(islands=True)._use_islands()
+    assert not HtmlToBbCodeConverter(islands=True, parser="lxml")._use_islands()
+
+
+def test_installed_parsers_are_looked_up_once(monkeypatch):
+    calls = []
+    find_spec = importlib.util.find_spec
+    monkeypatch.setattr(importlib.util, "find_spec", lambda name: calls.append(name) or find_spec(name))
+    available_html_parsers.cache_clear()
+    try:
+        for parser in ("html.parser", "auto", "auto"):
+            HtmlToBbCodeConverter(parser=parser)
+            html_to_bbcode("<b>x</b>", parser=parser)
+        assert sorted(calls) == sorted(html2bbcode._PARSER_MODULES.values())
+    finally:
+        available_html_parsers.cache_clear()
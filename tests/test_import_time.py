@@ -0,0 +1,49 @@
+import subprocess
+import sys
+
+# Cumulative import time (microseconds, from `python -X importtime`) allowed for the
+# md2bbcode modules a cold start touches. Loading mistune and bs4 eagerly costs
+# roughly this much on its own, so a regression that reintroduces them trips the budget.
+IMPORT_BUDGET_US = 50_000
+HEAVY_MODULES = ("mistune", "bs4")
+
+
+def _import_profile(code):
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        capture_output=True,
+        text=True,
+    )
+    assert "Traceback" not in result.stderr, result.stderr
+    cumulative = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        parts = line[len("import time:"):].split("|")
+        if len(parts) != 3 or not parts[1].strip().isdigit():
+            continue
+        cumulative[parts[2].strip()] = int(parts[1])
+    return cumulative
+
+
+def _best_of(code, module, runs=3):
+    profiles = [_import_profile(code) for _ in range(runs)]
+    for profile in profiles:
+        for heavy in HEAVY_MODULES:
+            assert heavy not in profile, f"{heavy} was imported by: {code}"
+    return min(profile[module] for profile in profiles)
+
+
+def test_import_md2bbcode_is_within_budget():
+    assert _best_of("import md2bbcode", "md2bbcode") < IMPORT_BUDGET_US
+
+
+def test_md2bbcode_help_is_within_budget():
+    code = "from md2bbcode.main import main\ntry:\n    main(['--help'])\nexcept SystemExit:\n    pass"
+    assert _best_of(code, "md2bbcode.main") < IMPORT_BUDGET_US
+
+
+def test_html2bbcode_and_md2ast_help_skip_heavy_modules():
+    for module in ("md2bbcode.html2bbcode", "md2bbcode.md2ast"):
+        code = f"from {module} import main\ntry:\n    main(['--help'])\nexcept SystemExit:\n    pass"
+        assert _best_of(code, module, runs=1) < IMPORT_BUDGET_US
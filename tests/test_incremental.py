@@ -0,0 +1,118 @@
+import pytest
+
+from md2bbcode.incremental import IncrementalConverter
+from md2bbcode.main import process_readme
+from tests.corpus import MARKDOWN_CORPUS
+
+GUIDE = """# Guide
+
+Intro paragraph with a footnote[^a] and an HTML abbreviation.
+
+1. First step
+2. Second step
+
+```
+code between steps
+```
+
+3. Third step
+
+Middle paragraph with <b>raw html</b> and a [ref link][home].
+
+Closing paragraph[^b].
+
+*[HTML]: Hyper Text Markup Language
+[home]: https://example.com/home
+[^a]: Footnote A.
+[^b]: Footnote B.
+"""
+
+
+@pytest.mark.parametrize("markdown", MARKDOWN_CORPUS)
+def test_matches_full_conversion(markdown):
+    converter = IncrementalConverter()
+    assert converter.convert(markdown, "https://example.com/") == process_readme(markdown, "https://example.com/")
+    # Converting again is served entirely from the block cache.
+    assert converter.convert(markdown, "https://example.com/") == process_readme(markdown, "https://example.com/")
+
+
+def _edit_and_check(converter, markdown):
+    assert converter.convert(markdown) == process_readme(markdown)
+
+
+def test_only_changed_blocks_are_rendered():
+    converter = IncrementalConverter()
+    _edit_and_check(converter, GUIDE)
+    first = converter.stats()
+
+    _edit_and_check(converter, GUIDE.replace("Middle paragraph", "Edited middle paragraph"))
+    second = converter.stats()
+    assert second["blocks_rendered"] - first["blocks_rendered"] == 1
+    blocks = first["blocks_rendered"] + first["blocks_reused"]
+    assert second["blocks_reused"] - first["blocks_reused"] == blocks - 1
+
+
+def test_footnote_numbering_follows_edits():
+    converter = IncrementalConverter()
+    _edit_and_check(converter, GUIDE)
+    # A new earlier reference renumbers [^a] and [^b] in unchanged blocks.
+    edited = GUIDE.replace("# Guide\n", "# Guide\n\nNew first reference[^b].\n")
+    _edit_and_check(converter, edited)
+    assert "[JUMPTO=fn-1]1[/JUMPTO][/u][/sup]." in converter.convert(edited)
+    _edit_and_check(converter, GUIDE)
+
+
+def test_definition_changes_reach_unchanged_blocks():
+    converter = IncrementalConverter()
+    _edit_and_check(converter, GUIDE)
+    _edit_and_check(converter, GUIDE.replace("https://example.com/home", "https://example.com/new"))
+    _edit_and_check(converter, GUIDE.replace("Hyper Text Markup Language", "HyperText Markup Language"))
+    _edit_and_check(converter, GUIDE.replace("Footnote B.", "Changed footnote."))
+
+
+def test_ordered_lists_still_merge_across_edits():
+    converter = IncrementalConverter()
+    _edit_and_check(converter, GUIDE)
+    # Replacing the code block with a paragraph splits the merged list in two.
+    split = GUIDE.replace("```\ncode between steps\n```", "A paragraph between steps.")
+    _edit_and_check(converter, split)
+    _edit_and_check(converter, GUIDE)
+
+
+def test_domain_change_rerenders():
+    converter = IncrementalConverter()
+    markdown = "![logo](img/logo.png)\n\n[docs](docs/index.md)\n"
+    for domain in ("https://a.example/", "https://b.example/", None):
+        assert converter.convert(markdown, domain) == process_readme(markdown, domain)
+
+
+def test_html_spanning_blocks_after_edit():
+    converter = IncrementalConverter()
+    _edit_and_check(converter, GUIDE)
+    wrapped = "<details>\n<summary>Spoiler</summary>\n\n" + GUIDE.replace("*[HTML]", "</details>\n\n*[HTML]")
+    _edit_and_check(converter, wrapped)
+    _edit_and_check(converter, wrapped.replace("Closing paragraph", "Closing words"))
+    _edit_and_check(converter, GUIDE)
+
+
+def test_repeated_abbreviation_keeps_last_definition_across_edits():
+    converter = IncrementalConverter()
+    _edit_and_check(converter, "An API here.\n\n*[API]: App\n")
+    _edit_and_check(converter, "*[API]: Changed\n\nAn API here.\n\n*[API]: App\n")
+    _edit_and_check(converter, "*[API]: Changed\n\nAn API here.\n")
+    _edit_and_check(converter, "*[API]: Changed\n\nAn API here.\n\n*[API]: App\n")
+    assert "[abbr=App]API[/abbr]" in converter.convert("*[API]: Changed\n\nAn API here.\n\n*[API]: App\n")
+
+
+def test_abbreviation_order_is_part_of_the_block_key():
+    # The first defined of two overlapping abbreviations is matched first.
+    converter = IncrementalConverter()
+    _edit_and_check(converter, "*[AP]: Short\n\n*[API]: App\n\n- item API\n")
+    _edit_and_check(converter, "*[API]: App\n\n*[AP]: Short\n\n- item API\n")
+
+
+def test_definition_list_items_across_blank_lines():
+    converter = IncrementalConverter()
+    _edit_and_check(converter, "Term\n: one\n\nOther\n: two\n")
+    _edit_and_check(converter, "Term\n: one\n\nPara\n\n[^a]: Note.\n\n: loose\n")
+    _edit_and_check(converter, "Term\n: one changed\n\nOther\n: two\n\nPlain.\n\nNext\n: three\n")
@@ -0,0 +1,74 @@
+import gzip
+import io
+import json
+
+from md2bbcode.jsonl import convert_jsonl, iter_convert_records, open_jsonl
+from md2bbcode.main import main, process_readme
+
+
+def _records(count):
+    return [{"id": i, "markdown": f"**post {i}** ![img](a{i}.png)\n", "domain": "https://example.com/"} for i in range(count)]
+
+
+def test_iter_convert_records_preserves_order():
+    records = _records(5)
+    results = list(iter_convert_records(iter(records)))
+
+    assert [r["id"] for r in results] == list(range(5))
+    for record, result in zip(records, results):
+        assert result["bbcode"] == process_readme(record["markdown"], record["domain"])
+
+
+def test_iter_convert_records_worker_pool_preserves_order():
+    records = _records(20)
+    serial = list(iter_convert_records(records, jobs=1))
+    parallel = list(iter_convert_records(records, jobs=2, window=3))
+
+    assert parallel == serial
+
+
+def test_iter_convert_records_uses_default_domain():
+    results = list(iter_convert_records([{"id": "a", "markdown": "![x](x.png)"}], domain="https://d.example/"))
+
+    assert "https://d.example/x.png" in results[0]["bbcode"]
+
+
+def test_convert_jsonl_reports_errors_without_stopping():
+    lines = [
+        json.dumps({"id": 1, "markdown": "*one*"}),
+        "not json",
+        "",
+        json.dumps({"id": 3}),
+        json.dumps({"id": 4, "markdown": "*four*"}),
+    ]
+    output = io.StringIO()
+
+    written, errors = convert_jsonl(iter(line + "\n" for line in lines), output, jobs=1)
+
+    results = [json.loads(line) for line in output.getvalue().splitlines()]
+    assert (written, errors) == (4, 2)
+    assert results[0] == {"id": 1, "bbcode": process_readme("*one*")}
+    assert results[1]["id"] is None and results[1]["line"] == 2
+    assert results[2]["id"] == 3 and "error" in results[2]
+    assert results[3] == {"id": 4, "bbcode": process_readme("*four*")}
+
+
+def test_open_jsonl_reads_gzip(tmp_path):
+    path = tmp_path / "in.jsonl.gz"
+    with gzip.open(str(path), "wt", encoding="utf-8") as file:
+        file.write(json.dumps({"id": 1, "markdown": "x"}) + "\n")
+
+    with open_jsonl(str(path)) as stream:
+        assert json.loads(stream.readline())["id"] == 1
+
+
+def test_cli_jsonl_mode(tmp_path):
+    src = tmp_path / "in.jsonl"
+    out = tmp_path / "out.jsonl"
+    src.write_text("\n".join(json.dumps(r) for r in _records(3)) + "\n", encoding="utf-8")
+
+    main([str(src), "--jsonl", "-o", str(out), "-j", "1"])
+
+    results = [json.loads(line) for line in out.read_text(encoding="utf-8").splitlines()]
+    assert [r["id"] for r in results] == [0, 1, 2]
+    assert all("bbcode" in r for r in results)
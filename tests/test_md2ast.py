@@ -0,0 +1,103 @@
+import io
+import json
+import sys
+
+import pytest
+
+from md2bbcode.main import process_readme
+from md2bbcode.md2ast import (
+    AST_SCHEMA,
+    AST_VERSION,
+    dumps_ast,
+    loads_ast,
+    main,
+    markdown_to_ast,
+    render_ast,
+)
+from tests.corpus import MARKDOWN_CORPUS
+
+DOMAIN = "https://example.com/repo/"
+
+
+@pytest.mark.parametrize("markdown", MARKDOWN_CORPUS)
+def test_render_ast_matches_process_readme(markdown):
+    data = dumps_ast(markdown_to_ast(markdown))
+    assert render_ast(data, domain=DOMAIN) == process_readme(markdown, DOMAIN)
+    assert render_ast(data) == process_readme(markdown)
+
+
+def test_footnotes_and_references_survive_round_trip():
+    markdown = "See [home][h] and a note[^1].\n\n[h]: /home\n[^1]: The note.\n"
+    tokens = loads_ast(dumps_ast(markdown_to_ast(markdown), compress=True))
+    assert tokens[-1]["type"] == "footnotes"
+    assert render_ast(tokens, domain=DOMAIN) == process_readme(markdown, DOMAIN)
+
+
+def test_envelope_is_versioned_and_minified():
+    tokens = markdown_to_ast("# Title\n\nSome *text*.\n")
+    data = dumps_ast(tokens)
+    envelope = json.loads(data)
+    assert envelope["schema"] == AST_SCHEMA
+    assert envelope["version"] == AST_VERSION
+    assert envelope["tokens"] == tokens
+    assert b"\n" not in data and b": " not in data
+    assert len(data) < len(json.dumps(tokens, indent=4))
+
+
+def test_gzip_is_detected_on_load():
+    tokens = markdown_to_ast("text\n")
+    data = dumps_ast(tokens, compress=True)
+    assert data[:2] == b"\x1f\x8b"
+    assert loads_ast(data) == tokens
+    # Identical input gives identical bytes.
+    assert data == dumps_ast(tokens, compress=True)
+
+
+def test_legacy_token_list_is_accepted():
+    tokens = markdown_to_ast("**bold**\n")
+    assert loads_ast(json.dumps(tokens, indent=4)) == tokens
+
+
+@pytest.mark.parametrize(
+    "data",
+    [
+        json.dumps({"schema": AST_SCHEMA, "version": AST_VERSION + 1, "tokens": []}),
+        json.dumps({"schema": "something-else", "version": AST_VERSION, "tokens": []}),
+        json.dumps({"schema": AST_SCHEMA, "version": AST_VERSION}),
+        json.dumps("tokens"),
+    ],
+)
+def test_rejects_unknown_data(data):
+    with pytest.raises(ValueError):
+        loads_ast(data)
+
+
+class _Stdio(io.TextIOWrapper):
+    def __init__(self, data=b""):
+        super().__init__(io.BytesIO(data), encoding="utf-8")
+
+
+def test_cli_stdin_to_stdout_and_render(monkeypatch, tmp_path):
+    markdown = "# Hi\n\n<b>bold</b> and ![img](pic.png)\n"
+
+    monkeypatch.setattr(sys, "stdin", _Stdio(markdown.encode("utf-8")))
+    monkeypatch.setattr(sys, "stdout", _Stdio())
+    main(["-", "--gzip"])
+    stored = sys.stdout.buffer.getvalue()
+    assert loads_ast(stored) == markdown_to_ast(markdown)
+
+    monkeypatch.setattr(sys, "stdin", _Stdio(stored))
+    output_path = tmp_path / "out.bbcode"
+    main(["-", str(output_path), "--render", "--domain", DOMAIN])
+    assert output_path.read_text(encoding="utf-8").rstrip("\n") == process_readme(markdown, DOMAIN).rstrip("\n")
+
+
+def test_cli_file_paths(tmp_path):
+    source = tmp_path / "in.md"
+    source.write_text("Some `code`.\n", encoding="utf-8")
+    legacy, compact = tmp_path / "ast.json", tmp_path / "ast.min.json"
+    main([str(source), str(legacy)])
+    main([str(source), str(compact), "--compact"])
+    assert json.loads(legacy.read_text(encoding="utf-8")) == loads_ast(compact.read_bytes())
+    assert compact.stat().st_size < legacy.stat().st_size
+    assert render_ast(compact.read_bytes()) == process_readme("Some `code`.\n")
@@ -0,0 +1,84 @@
+import mistune
+
+from md2bbcode.main import default_plugins
+from md2bbcode.plugins.passes import TokenPassManager, get_pass_manager
+
+
+def _clamp_headings(cursor, token):
+    if token["attrs"]["level"] > 3:
+        cursor.replace(dict(token, attrs=dict(token["attrs"], level=3)))
+
+
+def _drop_blank_lines_after_code(cursor, token):
+    while cursor.peek() is not None and cursor.peek()["type"] == "blank_line":
+        cursor.consume()
+
+
+def test_visitors_share_one_hook_and_run_on_nested_tokens():
+    def plugin(md):
+        manager = get_pass_manager(md)
+        manager.register("heading", _clamp_headings)
+        manager.register("block_code", _drop_blank_lines_after_code)
+
+    md = mistune.create_markdown(renderer=None, plugins=default_plugins() + [plugin])
+    assert md.before_render_hooks.count(md.token_passes) == 1
+
+    tokens = md("> ##### deep heading\n\n```\ncode\n```\n\n\n\ntext\n")
+    quote = tokens[0]
+    assert quote["type"] == "block_quote"
+    assert quote["children"][0]["attrs"]["level"] == 3
+    code_index = [token["type"] for token in tokens].index("block_code")
+    assert tokens[code_index + 1]["type"] == "paragraph"
+
+
+def test_top_level_visitors_skip_nested_tokens():
+    seen = []
+    manager = TokenPassManager()
+    manager.register("paragraph", lambda cursor, token: seen.append(cursor.parent), nested=False)
+    tokens = [
+        {"type": "paragraph", "text": "top"},
+        {"type": "block_quote", "children": [{"type": "paragraph", "text": "nested"}]},
+    ]
+    manager.run(tokens)
+    assert seen == [None]
+
+
+def test_consume_and_replace_compact_in_place():
+    def merge_text(cursor, token):
+        merged = token["text"]
+        while cursor.peek() is not None and cursor.peek()["type"] == "paragraph":
+            merged += cursor.peek()["text"]
+            cursor.consume()
+        cursor.replace({"type": "paragraph", "text": merged})
+
+    manager = TokenPassManager()
+    manager.register("paragraph", merge_text)
+    keep = {"type": "thematic_break"}
+    tokens = [{"type": "paragraph", "text": c} for c in "abc"] + [keep] + [{"type": "paragraph", "text": c} for c in "de"]
+    original = tokens
+    manager.run(tokens)
+    assert tokens is original
+    assert tokens == [{"type": "paragraph", "text": "abc"}, keep, {"type": "paragraph", "text": "de"}]
+    assert tokens[1] is keep
+
+
+def test_deep_trees_are_walked_without_recursion():
+    visited = []
+    manager = TokenPassManager()
+    manager.register("paragraph", lambda cursor, token: visited.append(token))
+    tree = {"type": "paragraph", "text": "leaf"}
+    for _ in range(20_000):
+        tree = {"type": "block_quote", "children": [tree]}
+    manager.run([tree])
+    assert len(visited) == 1
+
+
+def test_merge_ordered_lists_shape():
+    md = mistune.create_markdown(renderer=None, plugins=default_plugins())
+    tokens = md("1. one\n\n```\ncode\n```\n\n2. two\n\n3. three\n\nparagraph\n\n1. again\n")
+    lists = [token for token in tokens if token["type"] == "list"]
+    assert len(lists) == 2
+    assert lists[0]["attrs"] == {"ordered": True, "depth": 0}
+    assert set(lists[0]) == {"type", "children", "attrs"}
+    assert len(lists[0]["children"]) == 3
+    assert [child["type"] for child in lists[0]["children"][0]["children"]] == ["block_text", "block_code", "blank_line"]
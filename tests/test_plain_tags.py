@@ -0,0 +1,100 @@
+import random
+import re
+import time
+
+import pytest
+
+from md2bbcode.html2bbcode import (
+    BBCODE_PLAIN_TAGS,
+    HtmlToBbCodeConverter,
+    PlainTagScanner,
+    _restore_tokens,
+    _stash_bbcode_plain_items,
+    html_to_bbcode,
+)
+
+
+def _regex_stash(text, tags=BBCODE_PLAIN_TAGS):
+    # The lazy-regex implementation the scanner replaced, kept as the reference.
+    tokens = []
+    pattern = re.compile(
+        rf"\[(?P<tag>{'|'.join(tags)})(?:[^\]]*)\](?P<content>.*?)\[/\1\]", re.IGNORECASE | re.DOTALL
+    )
+
+    def repl(match):
+        tokens.append(match.group(0))
+        return f"\x1A{len(tokens) - 1}\x1A"
+
+    return pattern.sub(repl, text), tokens
+
+
+@pytest.mark.parametrize(
+    "text, segments",
+    [
+        ("a [ICODE]<b>x</b>[/ICODE] b", ["[ICODE]<b>x</b>[/ICODE]"]),
+        ("[CODE=php]<?php[/code]", ["[CODE=php]<?php[/code]"]),
+        # Nested openers are content; the first matching closing tag ends the segment.
+        ("[code][code]x[/code][/code]", ["[code][code]x[/code]"]),
+        ("[code][icode]x[/code][/icode]", ["[code][icode]x[/code]"]),
+        # An unclosed opener stays text and later segments are still found.
+        ("[code]<b>[img]a.png[/img]", ["[img]a.png[/img]"]),
+        ("[img]a [img]b[/img]", ["[img]a [img]b[/img]"]),
+        ("[code x", []),
+        # Closed segments before and after an unclosed opener.
+        ("[code]a[/code] [img]x [code]b[/code] [icode]c[/icode]", ["[code]a[/code]", "[code]b[/code]", "[icode]c[/icode]"]),
+        ("[codex]y[/code]", ["[codex]y[/code]"]),
+        ("[b]not plain[/b]", []),
+    ],
+)
+def test_segments(text, segments):
+    stashed, tokens = _stash_bbcode_plain_items(text)
+    assert tokens == segments
+    assert _restore_tokens(stashed, tokens) == text
+
+
+@pytest.mark.parametrize(
+    "tags",
+    [BBCODE_PLAIN_TAGS, ("img", "imgur", "code"), ("imgur", "img", "user")],
+)
+def test_scanner_matches_regex_on_random_input(tags):
+    pieces = [
+        "[code]", "[/code]", "[CODE a=b]", "[/Code]", "[icode]", "[/icode]", "[img]", "[/img]", "[imgur]",
+        "[/imgur]", "[/img ]", "[", "]", "x", "\n", "[code", "[user]", "[/user]", "[uſer]", "[/ICODE]", "[b]",
+    ]
+    scanner = PlainTagScanner(tags)
+    rng = random.Random(22)
+    for _ in range(3000):
+        text = "".join(rng.choice(pieces) for _ in range(rng.randint(0, 20)))
+        expected = _regex_stash(text, tags)
+        assert scanner.stash(text) == expected, text
+        assert [text[start:end] for start, end in scanner.spans(text)] == expected[1], text
+
+
+def test_plain_tags_are_configurable():
+    html = "[noparse]<b>x</b>[/noparse] [code]<b>y</b>[/code]"
+    assert html_to_bbcode(html, plain_tags=("noparse",)) == "[noparse]<b>x</b>[/noparse] [code][B]y[/B][/code]"
+    assert html_to_bbcode(html) == "[noparse][B]x[/B][/noparse] [code]<b>y</b>[/code]"
+    with pytest.raises(ValueError):
+        HtmlToBbCodeConverter(plain_tags=())
+
+
+@pytest.mark.parametrize(
+    "unit",
+    ["[code]x", "[img]a ", "[code][/img]", "[ICODE", "[code]" + "x" * 50 + "[/icode]", "[user][img][attach]"],
+)
+def test_worst_case_input_is_linear(unit):
+    # The old regex rescanned to the end of the document from every unclosed opener:
+    # about 10 seconds at this size.
+    text = unit * (200_000 // len(unit))
+    start = time.perf_counter()
+    stashed, tokens = _stash_bbcode_plain_items(text)
+    elapsed = time.perf_counter() - start
+    assert _restore_tokens(stashed, tokens) == text
+    assert elapsed < 1.0
+
+
+def test_worst_case_conversion_is_fast():
+    text = "<b>broken</b> [code]<i>post</i> [img]" * 10_000
+    start = time.perf_counter()
+    html_to_bbcode(text)
+    assert time.perf_counter() - start < 5.0
@@ -0,0 +1,52 @@
+from md2bbcode.html2bbcode import html_to_bbcode
+from md2bbcode.html2bbcode import main as html2bbcode_main
+from md2bbcode.main import main, process_readme
+from md2bbcode.profiling import ConversionProfile
+
+
+def test_profile_records_every_stage_without_changing_output():
+    markdown = "# Title\n\n<b>html</b> and `[code]` with a [link](x.md)\n"
+    profile = ConversionProfile()
+
+    result = process_readme(markdown, domain="https://example.com/", profile=profile)
+
+    assert result == process_readme(markdown, domain="https://example.com/")
+    names = [stage.name for stage in profile.stages]
+    assert names == ["block_parse", "inline_parse", "render", "stash", "find_islands", "soup_build", "html_convert", "restore"]
+    by_name = {stage.name: stage for stage in profile.stages}
+    assert by_name["block_parse"].input_size == len(markdown)
+    assert by_name["block_parse"].count >= 2
+    assert by_name["inline_parse"].count > 5
+    assert by_name["soup_build"].count > 0
+    assert by_name["restore"].output_size == len(result)
+    assert profile.total_seconds >= 0
+    assert "soup_build" in profile.report()
+
+
+def test_profile_notes_skipped_html_pass_and_calls_hook():
+    seen = []
+    profile = ConversionProfile(on_stage=seen.append)
+
+    process_readme("plain *text*\n", profile=profile)
+
+    assert [stage.name for stage in seen] == ["block_parse", "inline_parse", "render", "html_skipped"]
+    assert profile.as_dict()["stages"][-1]["name"] == "html_skipped"
+
+
+def test_html_to_bbcode_profile():
+    profile = ConversionProfile()
+    assert html_to_bbcode("<i>x</i>", profile=profile) == "[I]x[/I]"
+    assert [stage.name for stage in profile.stages] == ["stash", "soup_build", "html_convert", "restore"]
+
+
+def test_cli_profile_flags(tmp_path, capsys):
+    md_path = tmp_path / "in.md"
+    md_path.write_text("<b>x</b>\n", encoding="utf-8")
+    main([str(md_path), "--profile", "-o", str(tmp_path / "out.bbcode")])
+    assert "soup_build" in capsys.readouterr().err
+
+    html_path = tmp_path / "in.html"
+    html_path.write_text("<b>x</b>", encoding="utf-8")
+    html2bbcode_main([str(html_path), "--profile", "-o", str(tmp_path / "out2.bbcode")])
+    err = capsys.readouterr().err
+    assert "html_convert" in err and "total" in err
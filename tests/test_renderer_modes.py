@@ -0,0 +1,131 @@
+import time
+
+import mistune
+import pytest
+
+from md2bbcode.main import Converter, default_plugins
+from md2bbcode.renderers.bbcode import BBCodeRenderer
+from tests.corpus import MARKDOWN_CORPUS
+
+
+def _markdown(renderer):
+    return mistune.create_markdown(renderer=renderer, plugins=default_plugins())
+
+
+@pytest.mark.parametrize("mode", ["buffered", "iterative"])
+@pytest.mark.parametrize("markdown", MARKDOWN_CORPUS)
+def test_render_mode_matches_recursive(markdown, mode):
+    recursive = _markdown(BBCodeRenderer(domain="https://example.com/"))
+    other = _markdown(BBCodeRenderer(domain="https://example.com/", mode=mode))
+    assert other(markdown) == recursive(markdown)
+
+
+@pytest.mark.parametrize("mode", ["buffered", "iterative"])
+def test_render_mode_on_nested_quotes_and_admonitions(mode):
+    markdown = "".join("> " * level + "- **item** *at* level\n" for level in range(1, 60))
+    markdown += "\n> [!NOTE]\n> > [!TIP]\n> > inner\n> > > plain\n> outer\n\n>\n>   [!warning] spaced\n"
+    recursive = _markdown(BBCodeRenderer())
+    other = _markdown(BBCodeRenderer(mode=mode))
+    assert other(markdown) == recursive(markdown)
+
+
+@pytest.mark.parametrize("mode", ["buffered", "iterative"])
+def test_render_mode_calls_subclass_overrides(mode):
+    class LoudRenderer(BBCodeRenderer):
+        def strong(self, text):
+            return "[B]" + text.upper() + "[/B]"
+
+        def block_quote(self, text):
+            return "[Q]" + text + "[/Q]"
+
+    result = _markdown(LoudRenderer(mode=mode))("**bold** and *it*\n\n> quoted\n")
+    assert result == "[B]BOLD[/B] and [i]it[/i]\n\n[Q]quoted\n\n[/Q]"
+
+
+def _deep_tokens(depth):
+    token = {"type": "paragraph", "children": [{"type": "text", "raw": "leaf"}]}
+    for level in range(depth):
+        kind = level % 4
+        if kind == 0:
+            token = {"type": "block_quote", "children": [token]}
+        elif kind == 1:
+            token = {"type": "list_item", "children": [token]}
+        elif kind == 2:
+            token = {"type": "list", "children": [token], "attrs": {"ordered": False, "depth": 0}}
+        else:
+            token = {"type": "link", "children": [token], "attrs": {"url": "https://example.com/"}}
+    return [token]
+
+
+def _best_render_time(renderer, tokens):
+    from mistune.core import BlockState
+
+    timings = []
+    for _ in range(3):
+        start = time.perf_counter()
+        result = renderer(tokens, BlockState())
+        timings.append(time.perf_counter() - start)
+    return min(timings), result
+
+
+def test_iterative_mode_renders_deep_trees_in_linear_time():
+    renderer = BBCodeRenderer(mode="iterative")
+    small, result = _best_render_time(renderer, _deep_tokens(10_000))
+    assert result.startswith("[url=https://example.com/][list][*][QUOTE]\n[url=https://example.com/]")
+    assert result.count("[QUOTE]") == result.count("[/QUOTE]") == 2_500
+    assert "leaf\n\n" in result
+
+    large, result = _best_render_time(renderer, _deep_tokens(40_000))
+    assert result.count("[/list]") == 10_000
+    # Four times the depth should cost about four times as much, not sixteen.
+    assert large < small * 8 + 0.01
+
+
+def test_recursive_mode_hits_the_recursion_limit_on_deep_trees():
+    from mistune.core import BlockState
+
+    with pytest.raises(RecursionError):
+        BBCodeRenderer()(_deep_tokens(10_000), BlockState())
+
+
+def test_converter_render_modes_agree():
+    markdown = MARKDOWN_CORPUS[0]
+    expected = Converter(render_mode="recursive").convert(markdown)
+    assert Converter(render_mode="buffered").convert(markdown) == expected
+    assert Converter().convert(markdown) == expected
+
+
+def test_unknown_render_mode():
+    with pytest.raises(ValueError):
+        BBCodeRenderer(mode="fast")
+
+
+class _GenericRenderer(BBCodeRenderer):
+    render_token = BBCodeRenderer._render_token_generic
+
+
+@pytest.mark.parametrize("markdown", MARKDOWN_CORPUS)
+def test_compiled_dispatch_matches_generic(markdown):
+    for mode in ("recursive", "buffered", "iterative"):
+        generic = _markdown(_GenericRenderer(domain="https://example.com/", mode=mode))
+        compiled = _markdown(BBCodeRenderer(domain="https://example.com/", mode=mode))
+        assert compiled(markdown) == generic(markdown)
+
+
+def test_dispatch_table_is_per_class():
+    class CodeRenderer(BBCodeRenderer):
+        def codespan(self, text):
+            return "[c]" + text + "[/c]"
+
+    assert CodeRenderer._dispatch_table() is not BBCodeRenderer._dispatch_table()
+    assert _markdown(CodeRenderer())("`x`\n") == "[c]x[/c]\n\n"
+    assert _markdown(BBCodeRenderer())("`x`\n") == "[icode]x[/icode]\n\n"
+
+
+def test_unknown_and_registered_tokens_use_generic_path():
+    from mistune.core import BlockState
+
+    renderer = BBCodeRenderer()
+    renderer.register("wiki", lambda r, text, key: f"[wiki={key}]{text}[/wiki]")
+    token = {"type": "wiki", "children": [{"type": "text", "raw": "Page"}], "attrs": {"key": "p"}}
+    assert renderer([token], BlockState()) == "[wiki=p]Page[/wiki]"
@@ -0,0 +1,158 @@
+import http.client
+import json
+import socket
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from md2bbcode.main import process_readme
+from md2bbcode.server import make_server
+
+
+@pytest.fixture
+def tcp_server():
+    server = make_server("127.0.0.1", 0)
+    thread = threading.Thread(target=server.serve_forever, args=(0.05,), daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def _request(server, method, path, body=None, headers=None):
+    host, port = server.server_address[:2]
+    conn = http.client.HTTPConnection(host, port, timeout=10)
+    try:
+        conn.request(method, path, body=body, headers=headers or {})
+        response = conn.getresponse()
+        return response.status, response.read().decode("utf-8")
+    finally:
+        conn.close()
+
+
+def test_convert_json_request(tcp_server):
+    body = json.dumps({"markdown": "![x](x.png) **hi**", "domain": "https://example.com/"})
+    status, text = _request(tcp_server, "POST", "/convert", body, {"Content-Type": "application/json"})
+
+    assert status == 200
+    assert json.loads(text)["bbcode"] == process_readme("![x](x.png) **hi**", "https://example.com/")
+
+
+def test_convert_raw_body_with_domain_query(tcp_server):
+    status, text = _request(tcp_server, "POST", "/convert?domain=https://d.example/", "[a](b.md)")
+
+    assert status == 200
+    assert text == process_readme("[a](b.md)", "https://d.example/")
+
+
+def test_bad_request_and_health_stats(tcp_server):
+    status, _ = _request(tcp_server, "POST", "/convert", "{}", {"Content-Type": "application/json"})
+    assert status == 400
+    _request(tcp_server, "POST", "/convert", "*ok*")
+
+    status, text = _request(tcp_server, "GET", "/health")
+    stats = json.loads(text)
+    assert status == 200
+    assert stats["status"] == "ok"
+    assert stats["requests"] == 2
+    assert stats["errors"] == 1
+
+
+def test_concurrent_clients(tcp_server):
+    def convert(i):
+        return _request(tcp_server, "POST", "/convert", f"**post {i}**")[1]
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        results = list(pool.map(convert, range(32)))
+
+    assert results == [process_readme(f"**post {i}**") for i in range(32)]
+
+
+def _raw_request(server, request):
+    client = socket.create_connection(server.server_address[:2], timeout=10)
+    try:
+        client.sendall(request)
+        response = b""
+        while True:
+            chunk = client.recv(65536)
+            if not chunk:
+                return response
+            response += chunk
+    finally:
+        client.close()
+
+
+@pytest.mark.parametrize(
+    "length_header, status",
+    [(b"", b"411"), (b"Content-Length: -1\r\n", b"400"), (b"Content-Length: abc\r\n", b"400")],
+)
+def test_missing_or_invalid_content_length_is_rejected(tcp_server, length_header, status):
+    # The connection stays open with part of a body unsent; the server must answer
+    # rather than wait for it.
+    response = _raw_request(tcp_server, b"POST /convert HTTP/1.1\r\nHost: localhost\r\n" + length_header + b"\r\n*hi*")
+    assert response.startswith(b"HTTP/1.1 " + status)
+
+
+@pytest.mark.skipif(not hasattr(socket, "AF_UNIX"), reason="Unix domain sockets not available")
+def test_unix_socket_server(tmp_path):
+    path = str(tmp_path / "md2bbcode.sock")
+    server = make_server(unix_socket=path)
+    thread = threading.Thread(target=server.serve_forever, args=(0.05,), daemon=True)
+    thread.start()
+    try:
+        client = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        client.connect(path)
+        body = b"*hi*"
+        client.sendall(
+            b"POST /convert HTTP/1.1\r\nHost: localhost\r\nConnection: close\r\n"
+            b"Content-Length: " + str(len(body)).encode() + b"\r\n\r\n" + body
+        )
+        response = b""
+        while True:
+            chunk = client.recv(65536)
+            if not chunk:
+                break
+            response += chunk
+        client.close()
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    assert response.startswith(b"HTTP/1.1 200")
+    assert response.split(b"\r\n\r\n", 1)[1].decode("utf-8") == process_readme("*hi*")
+
+
+def test_health_reports_cache_stats():
+    from md2bbcode.cache import ResultCache
+    from md2bbcode.main import Converter
+
+    server = make_server("127.0.0.1", 0, converter=Converter(cache=ResultCache()))
+    thread = threading.Thread(target=server.serve_forever, args=(0.05,), daemon=True)
+    thread.start()
+    try:
+        _request(server, "POST", "/convert", "*same*")
+        _request(server, "POST", "/convert", "*same*")
+        stats = json.loads(_request(server, "GET", "/health")[1])
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    assert stats["cache"]["memory_hits"] == 1
+    assert stats["cache"]["misses"] == 1
+
+
+@pytest.mark.skipif(not hasattr(socket, "AF_UNIX"), reason="Unix domain sockets not available")
+def test_unix_socket_path_must_not_be_a_regular_file(tmp_path):
+    path = tmp_path / "notes.txt"
+    path.write_text("keep me", encoding="utf-8")
+    with pytest.raises(FileExistsError):
+        make_server(unix_socket=str(path))
+    assert path.read_text(encoding="utf-8") == "keep me"
+
+    # A stale socket from an earlier run is replaced.
+    stale = str(tmp_path / "stale.sock")
+    leftover = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    leftover.bind(stale)
+    leftover.close()
+    make_server(unix_socket=stale).server_close()
@@ -0,0 +1,130 @@
+import io
+import os
+
+from md2bbcode.main import main, process_readme
+from md2bbcode.stream import iter_chunks, iter_convert
+
+README_PATH = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "README.md"))
+
+CROSS_CHUNK_MARKDOWN = """Intro with a [reference link][r1] and a footnote.[^a] The HTML spec.
+
+1. one
+2. two
+
+```
+attached to the list
+```
+
+3. three
+
+<details>
+<summary>Spoiler</summary>
+
+Hidden **text** spanning blocks.
+
+</details>
+
+More text with another note[^b] and the first one again[^a].
+
+*[HTML]: Hyper Text Markup Language
+
+[r1]: https://example.com "Title"
+
+[^a]: First note.
+
+    Second paragraph of the first note.
+
+[^b]: Second note.
+"""
+
+
+def _read_readme():
+    with open(README_PATH, "r", encoding="utf-8") as file:
+        return file.read()
+
+
+def test_chunks_split_at_block_boundaries():
+    chunks = list(iter_chunks(io.StringIO(CROSS_CHUNK_MARKDOWN), chunk_size=1))
+
+    assert "".join(chunks) == CROSS_CHUNK_MARKDOWN
+    assert len(chunks) > 3
+    # Ordered lists and the fenced block merge_ordered_lists attaches to them stay together,
+    # as does the <details> element spanning several Markdown blocks.
+    assert any("1. one" in c and "3. three" in c for c in chunks)
+    assert any("<details>" in c and "</details>" in c for c in chunks)
+
+
+def test_streaming_matches_whole_document_conversion():
+    documents = (
+        CROSS_CHUNK_MARKDOWN,
+        _read_readme(),
+        _read_readme() * 3,
+        # Unclosed HTML at the end keeps its trailing whitespace in the last chunk.
+        "<details>\n<summary>x\n\n<b>body</b>\n",
+        "intro\n\n<b>x</b>\n\n<i>unclosed\n\n",
+        # A literal ">" ending a chunk isn't a tag; the blank line after it stays put.
+        "Click Next ->\n\n<b>Done</b>\n",
+        "if x > y\n\n<b>Done</b>\n",
+        "Escaped \\>\n\n<b>Done</b>\n",
+        "<i>tag</i> ->\n\n<b>Done</b>\n",
+        "<b>tag</b>\n\n<!-- note -->\n\n<i>Done</i>\n",
+        # Definitions leave no token, so the blocks around them still join.
+        "1. one\n\n*[API]: App\n\n2. two\n\n[r]: https://example.com\n\n    code\n",
+    )
+    for markdown in documents:
+        for chunk_size in (1, 1 << 20):
+            streamed = "".join(iter_convert(io.StringIO(markdown), chunk_size=chunk_size))
+            assert streamed == process_readme(markdown), markdown
+
+
+def test_definition_list_items_stay_in_one_chunk():
+    markdown = (
+        "Term\n: one\n\nOther\n: two\n\n"
+        "Para\n\n[^a]: Note.\n\n: loose\n\n"
+        "Plain paragraph.\n\nNext\n: three\n\n# Heading\n"
+    )
+    chunks = list(iter_chunks(io.StringIO(markdown), chunk_size=1))
+
+    assert "".join(chunks) == markdown
+    assert any("Term" in c and "Other" in c for c in chunks)
+    assert any("Para" in c and ": loose" in c for c in chunks)
+    # A paragraph after a definition list that isn't a term ends the list.
+    assert any(c.startswith("Next") for c in chunks)
+    streamed = "".join(iter_convert(io.StringIO(markdown), chunk_size=1))
+    assert streamed == process_readme(markdown)
+
+
+def test_last_abbreviation_definition_wins():
+    markdown = "*[API]: Changed\n\nAn API here.\n\n*[API]: App\n"
+    streamed = "".join(iter_convert(io.StringIO(markdown), domain="", chunk_size=1))
+    assert streamed == process_readme(markdown, domain="")
+    assert "[abbr=App]API[/abbr]" in streamed
+
+
+def test_cross_chunk_references_resolve():
+    streamed = "".join(iter_convert(io.StringIO(CROSS_CHUNK_MARKDOWN), domain="", chunk_size=1))
+
+    assert "[url=https://example.com]reference link[/url]" in streamed
+    assert "[abbr=Hyper Text Markup Language]HTML[/abbr]" in streamed
+    assert streamed.count("[JUMPTO=fn-1]") == 2
+    assert "[JUMPTO=fn-2]" in streamed
+    assert streamed.count("[b]Footnotes:[/b]") == 1
+
+
+def test_non_seekable_source_is_spooled():
+    class Unseekable(io.StringIO):
+        def seekable(self):
+            return False
+
+    streamed = "".join(iter_convert(Unseekable(CROSS_CHUNK_MARKDOWN), chunk_size=1))
+    assert streamed == process_readme(CROSS_CHUNK_MARKDOWN)
+
+
+def test_cli_stream_mode(tmp_path):
+    src = tmp_path / "big.md"
+    out = tmp_path / "big.bbcode"
+    src.write_text(CROSS_CHUNK_MARKDOWN, encoding="utf-8")
+
+    main([str(src), "--stream", "--chunk-size", "1", "-o", str(out)])
+
+    assert out.read_text(encoding="utf-8") == process_readme(CROSS_CHUNK_MARKDOWN)
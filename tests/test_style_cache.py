@@ -0,0 +1,46 @@
+from md2bbcode.html2bbcode import (
+    STYLE_CACHE_SIZE,
+    ResolvedStyle,
+    clear_style_cache,
+    html_to_bbcode,
+    resolve_style,
+    style_cache_stats,
+)
+
+STYLE = "color: #f00; font-size: 12px; font-family: 'Arial', sans-serif; font-weight: 700; text-align: Center"
+
+
+def test_resolve_style():
+    assert resolve_style(STYLE) == ResolvedStyle(
+        (("COLOR", "#f00"), ("SIZE", "12px"), ("FONT", "Arial"), ("B", None)), "center"
+    )
+    assert resolve_style(STYLE, {"b"}, {"color"}).wrappers == (
+        ("SIZE", "12px"),
+        ("FONT", "Arial"),
+    )
+    assert resolve_style("font-family: ;;nonsense") == ResolvedStyle((), None)
+
+
+def test_repeated_styles_are_resolved_once():
+    clear_style_cache()
+    html = "".join(
+        f'<div style="{STYLE}"><span style="{STYLE}">x</span><b style="{STYLE}">y</b></div>' for _ in range(200)
+    )
+    result = html_to_bbcode(html)
+    assert result.count("[CENTER][COLOR=#f00][SIZE=12px][FONT=Arial][B]") == 200
+    stats = style_cache_stats()
+    # One entry each for plain (div, span) and skip_tags={"B"} (b); the div's
+    # alignment shares the plain entry.
+    assert stats["misses"] == 2
+    assert stats["size"] == 2
+    assert stats["hits"] == 200 * 4 - 2
+    assert stats["maxsize"] == STYLE_CACHE_SIZE
+    clear_style_cache()
+    assert style_cache_stats()["size"] == 0
+
+
+def test_cache_is_bounded():
+    clear_style_cache()
+    for index in range(STYLE_CACHE_SIZE + 50):
+        resolve_style(f"color: #{index:06x}")
+    assert style_cache_stats()["size"] == STYLE_CACHE_SIZE
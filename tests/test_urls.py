@@ -0,0 +1,36 @@
+from md2bbcode.main import process_readme
+from md2bbcode.urls import URL_CACHE_SIZE, clear_url_caches, image_url, resolve_url, url_cache_stats
+
+
+def test_resolve_url():
+    assert resolve_url("javascript:alert(1)", "https://example.com/") == "#harmful-link"
+    assert resolve_url("docs/a.md", "https://example.com/repo/") == "https://example.com/repo/docs/a.md"
+    assert resolve_url("docs/a.md", None) == "docs/a.md"
+    assert resolve_url("docs/a.md", "") == "docs/a.md"
+    assert resolve_url("https://other.example/x", "https://example.com/") == "https://other.example/x"
+
+
+def test_image_url():
+    assert image_url("https://example.com/logo.png") == "https://example.com/logo.png"
+    assert image_url("https://example.com/logo.svg").startswith("https://images.weserv.nl/?url=")
+    assert image_url("https://github.com/o/r/actions/workflows/ci.yml/badge.svg?branch=main") == (
+        "https://raster.shields.io/github/actions/workflow/status/o/r/ci.yml.png?branch=main"
+    )
+    assert image_url("") == ""
+
+
+def test_repeated_urls_hit_the_cache_in_both_passes():
+    clear_url_caches()
+    markdown = "".join(
+        f"![badge](https://img.example/badge.svg) [home](index.md) <a href=\"index.md\">html {i}</a>\n\n" for i in range(20)
+    )
+    result = process_readme(markdown, domain="https://example.com/")
+    assert result.count("[url=https://example.com/index.md]") == 20
+    assert result.count("[URL=https://example.com/index.md]") == 20
+
+    stats = url_cache_stats()
+    # One miss for each distinct (url, domain): the badge and index.md, shared by both passes.
+    assert stats["resolve"]["misses"] == 2
+    assert stats["resolve"]["hits"] == 58
+    assert stats["image"]["misses"] == 1
+    assert stats["resolve"]["maxsize"] == URL_CACHE_SIZE